@@ -1,3 +1,6 @@
+import { createHash } from 'crypto'
+import { promises as fs } from 'fs'
+import path from 'path'
 import { NextResponse } from 'next/server'
 
 import dataset from '@/src/data/dataset'
@@ -27,6 +30,52 @@ const ollamaSystemPrompt =
   process.env.OLLAMA_SYSTEM_PROMPT?.trim() ||
   'You are CS Mentor, an AI assistant specialized in computer science education and career guidance. You provide clear, concise, and accurate information about programming concepts, interview preparation, and career development in the tech industry.';
 
+// Inverted index over the knowledge base, built offline by gui/build_chat_index.py.
+const chatIndexPath =
+  process.env.CHAT_INDEX_PATH?.trim() || path.join(process.cwd(), 'gui', 'chat_index.json');
+
+type ChatIndexFile = {
+  version: number;
+  documents: { sizes: number[]; outputs: string[] };
+  postings: Record<string, number[]>;
+};
+
+type ChatIndex = {
+  sizes: number[];
+  outputs: string[];
+  postings: Map<string, number[]>;
+};
+
+let chatIndexPromise: Promise<ChatIndex | null> | null = null;
+
+// Pre-generated answers to common questions, built offline by gui/warm_answer_cache.py.
+const answerCachePath =
+  process.env.ANSWER_CACHE_PATH?.trim() || path.join(process.cwd(), 'gui', 'answer_cache.json');
+const ANSWER_CACHE_VERSION = 2;
+const ANSWER_CACHE_KEY_CHARS = 16;
+// How often to check whether the warmer has rewritten the cache file.
+const ANSWER_CACHE_RECHECK_MS = 60_000;
+
+// Optional JSON-lines log of incoming questions, fed back into the cache warmer.
+const queryLogPath = process.env.CHAT_QUERY_LOG?.trim();
+
+type AnswerCacheFile = {
+  version: number;
+  model: string;
+  systemPrompt: string | null;
+  options: Record<string, unknown>;
+  answers: { answer: string; expiresAt: number }[];
+  keys: Record<string, number>;
+};
+
+type AnswerCache = {
+  mtimeMs: number;
+  checkedAt: number;
+  file: AnswerCacheFile | null;
+};
+
+let answerCachePromise: Promise<AnswerCache> | null = null;
+
 function tokenize(text: string): string[] {
   return text
     .toLowerCase()
@@ -75,8 +124,134 @@ function findDatasetAnswer(question: string): string | null {
   return bestScore > 0 ? bestAnswer : null;
 }
 
-function buildFallbackAnswer(question: string) {
-  const datasetAnswer = findDatasetAnswer(question);
+async function loadChatIndex(): Promise<ChatIndex | null> {
+  try {
+    const raw: ChatIndexFile = JSON.parse(await fs.readFile(chatIndexPath, 'utf8'));
+    return {
+      sizes: raw.documents.sizes,
+      outputs: raw.documents.outputs,
+      postings: new Map(Object.entries(raw.postings)),
+    };
+  } catch (error) {
+    if ((error as NodeJS.ErrnoException).code !== 'ENOENT') {
+      console.error('Unable to load chat index:', error);
+    }
+    return null;
+  }
+}
+
+function getChatIndex(): Promise<ChatIndex | null> {
+  if (!chatIndexPromise) {
+    chatIndexPromise = loadChatIndex();
+  }
+  return chatIndexPromise;
+}
+
+// Same ranking as findDatasetAnswer, but only documents sharing a token with the
+// question are visited: Jaccard = overlap / (|question| + |document| - overlap).
+function findIndexedAnswer(index: ChatIndex, question: string): string | null {
+  const questionTokens = new Set(tokenize(question));
+  if (questionTokens.size === 0) {
+    return null;
+  }
+
+  const overlaps = new Map<number, number>();
+  questionTokens.forEach((token) => {
+    index.postings.get(token)?.forEach((docId) => {
+      overlaps.set(docId, (overlaps.get(docId) ?? 0) + 1);
+    });
+  });
+
+  let bestScore = 0;
+  let bestDoc = -1;
+
+  overlaps.forEach((overlap, docId) => {
+    const score = overlap / (questionTokens.size + index.sizes[docId] - overlap);
+    if (score > bestScore || (score === bestScore && docId < bestDoc)) {
+      bestScore = score;
+      bestDoc = docId;
+    }
+  });
+
+  return bestDoc >= 0 ? index.outputs[bestDoc] : null;
+}
+
+// Same key as cache_key() in gui/warm_answer_cache.py: the normalized question's sha1 prefix.
+function answerCacheKey(question: string): string | null {
+  const normalized = tokenize(question).join(' ');
+  if (!normalized) {
+    return null;
+  }
+  return createHash('sha1').update(normalized).digest('hex').slice(0, ANSWER_CACHE_KEY_CHARS);
+}
+
+async function loadAnswerCache(previous: AnswerCache | null): Promise<AnswerCache> {
+  const checkedAt = Date.now();
+  try {
+    const { mtimeMs } = await fs.stat(answerCachePath);
+    if (previous && previous.mtimeMs === mtimeMs) {
+      return { ...previous, checkedAt };
+    }
+    const file: AnswerCacheFile = JSON.parse(await fs.readFile(answerCachePath, 'utf8'));
+    // '*' marks a cache of reference answers, which is not tied to a model build or prompt.
+    // Model answers must come from this route's model and system prompt, with no options
+    // (the route sends none).
+    const usable =
+      file.version === ANSWER_CACHE_VERSION &&
+      (file.model === '*' ||
+        (file.model === ollamaModel &&
+          file.systemPrompt === ollamaSystemPrompt &&
+          Object.keys(file.options ?? {}).length === 0));
+    return { mtimeMs, checkedAt, file: usable ? file : null };
+  } catch (error) {
+    if ((error as NodeJS.ErrnoException).code !== 'ENOENT') {
+      console.error('Unable to load answer cache:', error);
+    }
+    return { mtimeMs: 0, checkedAt, file: null };
+  }
+}
+
+async function getAnswerCache(): Promise<AnswerCacheFile | null> {
+  if (!answerCachePromise) {
+    answerCachePromise = loadAnswerCache(null);
+  }
+  const cache = await answerCachePromise;
+  if (Date.now() - cache.checkedAt > ANSWER_CACHE_RECHECK_MS) {
+    answerCachePromise = loadAnswerCache(cache);
+  }
+  return cache.file;
+}
+
+async function findCachedAnswer(question: string) {
+  const key = answerCacheKey(question);
+  const cache = key ? await getAnswerCache() : null;
+  if (!key || !cache || !Object.prototype.hasOwnProperty.call(cache.keys, key)) {
+    return null;
+  }
+
+  const entry = cache.answers[cache.keys[key]];
+  if (!entry || entry.expiresAt * 1000 <= Date.now()) {
+    return null;
+  }
+  return {
+    answer: entry.answer,
+    source: cache.model === '*' ? FALLBACK_SOURCE : ollamaModel,
+  };
+}
+
+function logQuery(question: string) {
+  if (!queryLogPath) {
+    return;
+  }
+  const line = JSON.stringify({ question, time: Date.now() / 1000 });
+  fs.appendFile(queryLogPath, `${line}\n`).catch((error) => {
+    console.error('Unable to log chat query:', error);
+  });
+}
+
+async function buildFallbackAnswer(question: string) {
+  const index = await getChatIndex();
+  const datasetAnswer = index ? findIndexedAnswer(index, question) : findDatasetAnswer(question);
 
   if (datasetAnswer) {
     return {
@@ -115,6 +290,16 @@ export async function POST(request: Request) {
       );
     }
 
+    logQuery(question);
+
+    // Cached answers ignore conversation history, so they only serve standalone questions
+    if (context.length === 0) {
+      const cached = await findCachedAnswer(question);
+      if (cached) {
+        return NextResponse.json(cached);
+      }
+    }
+
     const messages = buildMessages(question, context);
 
     let answer: string | undefined;
@@ -152,7 +337,7 @@ export async function POST(request: Request) {
     }
 
     if (!answer) {
-      const fallback = buildFallbackAnswer(question);
+      const fallback = await buildFallbackAnswer(question);
       answer = fallback.answer;
       source = fallback.source;
     }
@@ -0,0 +1,228 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: fall back to tracemalloc for peak memory
+    resource = None
+
+import mcq_index  # noqa: F401  (registers the "index" output format)
+import mcq_pack  # noqa: F401  (registers the "pack" output format)
+import mcq_sqlite  # noqa: F401  (registers the "sqlite" output format)
+from mcq_writers import WRITERS
+
+# Generator benchmarks
+#
+# Runs generate_mcqs_complete.py over a matrix of bank sizes, domain counts,
+# output formats and engines. Every configuration runs in a fresh child
+# process so peak memory is not polluted by earlier runs. The report records
+# questions/sec, peak RSS, bytes written and the time to parse the combined
+# bank back, and can be compared against a stored baseline:
+#
+#   python bench_generators.py --sizes 1000 10000 --save-baseline bench/baseline.json
+#   python bench_generators.py --sizes 1000 10000 --baseline bench/baseline.json
+
+GUI_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_DOMAIN_COUNTS = [1, 10]
+DEFAULT_FORMATS = ["json", "jsonl", "pack"]
+
+# Timings shorter than this are too noisy to flag as regressions
+MIN_TIMED_SECONDS = 0.25
+
+# Metric -> True when larger is better
+METRICS = {
+    "questionsPerSec": True,
+    "peakRssMB": False,
+    "bytesWritten": False,
+    "parseSeconds": False,
+}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process and its finished children."""
+    if resource is None:
+        import tracemalloc
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB elsewhere
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * scale / 2**20
+
+
+def parse_combined(output_dir: str, fmt: str) -> int:
+    """Read the combined bank back the way a consumer would; returns the question count."""
+    path = WRITERS[fmt].output_path(output_dir, "all_mcqs")
+    if fmt == "json":
+        with open(path, 'r', encoding='utf-8') as f:
+            return len(json.load(f)["questions"])
+    if fmt == "jsonl":
+        with open(path, 'r', encoding='utf-8') as f:
+            return sum(1 for line in f if json.loads(line))
+    if fmt == "index":
+        # An index holds posting lists, not questions; loading it is what a consumer does
+        return mcq_index.load_index(path)["metadata"]["totalQuestions"]
+    return sum(1 for _ in WRITERS[fmt].read(path))
+
+
+def run_child(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one configuration in this process (invoked via --child)."""
+    sys.path.insert(0, GUI_DIR)
+    if resource is None:
+        import tracemalloc
+        tracemalloc.start()
+    import generate_mcqs_complete as generator
+    from domain_registry import REGISTRY
+
+    domains = REGISTRY.names()[:config["domains"]]
+    per_domain = max(1, config["size"] // len(domains))
+    output_dir = tempfile.mkdtemp(prefix="mcq-bench-")
+    try:
+        args = [
+            "--questions-per-domain", str(per_domain),
+            "--workers", str(config["workers"]),
+            "--engine", config["engine"],
+            "--format", config["format"],
+            "--output-dir", output_dir,
+            "--force",
+        ]
+        if len(domains) < len(REGISTRY.names()):
+            args += ["--domains", *domains]
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            generator.main(args)
+        seconds = time.perf_counter() - start
+        peak = peak_rss_mb()
+
+        if len(domains) < len(REGISTRY.names()):
+            # Partial builds have no combined bank; stand the first domain in for it
+            stem = generator.domain_stem(domains[0])
+            for name in os.listdir(output_dir):
+                if name.startswith(stem + "."):
+                    os.replace(os.path.join(output_dir, name),
+                               os.path.join(output_dir, "all_mcqs" + name[len(stem):]))
+
+        bytes_written = sum(os.path.getsize(os.path.join(output_dir, name)) for name in os.listdir(output_dir))
+        start = time.perf_counter()
+        questions = parse_combined(output_dir, config["format"])
+        parse_seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    return {
+        **config,
+        "questions": questions,
+        "seconds": round(seconds, 4),
+        "questionsPerSec": round(questions / seconds, 1) if seconds else None,
+        "peakRssMB": round(peak, 1),
+        "bytesWritten": bytes_written,
+        "parseSeconds": round(parse_seconds, 4),
+    }
+
+
+def config_name(config: Dict[str, Any]) -> str:
+    return f"{config['size']}q-{config['domains']}d-{config['format']}-{config['engine']}"
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    results = []
+    for size in args.sizes:
+        for domain_count in args.domain_counts:
+            for fmt in args.formats:
+                for engine in args.engines:
+                    config = {"size": size, "domains": domain_count, "format": fmt,
+                              "engine": engine, "workers": args.workers}
+                    name = config_name(config)
+                    print(f"⏱️  {name}...", end=" ", flush=True)
+                    child = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), "--child", json.dumps(config)],
+                        capture_output=True, text=True, cwd=GUI_DIR,
+                    )
+                    if child.returncode != 0:
+                        print("failed")
+                        print(child.stderr.strip()[-2000:])
+                        results.append({**config, "name": name, "error": child.stderr.strip()[-500:]})
+                        continue
+                    result = {"name": name, **json.loads(child.stdout.strip().splitlines()[-1])}
+                    results.append(result)
+                    print(f"{result['questionsPerSec']:,.0f} q/s, {result['peakRssMB']} MB peak, "
+                          f"{result['bytesWritten']:,} bytes, parse {result['parseSeconds']}s")
+
+    return {
+        "generatedOn": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """List metrics that regressed by more than ``tolerance`` (a fraction) against the baseline."""
+    previous = {result["name"]: result for result in baseline.get("results", []) if "error" not in result}
+    regressions = []
+    for result in report["results"]:
+        if "error" in result:
+            regressions.append(f"{result['name']}: run failed")
+            continue
+        before = previous.get(result["name"])
+        if before is None:
+            continue
+        timed = {"questionsPerSec": before.get("seconds", 0), "parseSeconds": before.get("parseSeconds", 0)}
+        for metric, higher_is_better in METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None or timed.get(metric, MIN_TIMED_SECONDS) < MIN_TIMED_SECONDS:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{result['name']}: {metric} {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the MCQ generators.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="total questions per run")
+    parser.add_argument("--domain-counts", nargs="+", type=int, default=DEFAULT_DOMAIN_COUNTS)
+    parser.add_argument("--formats", nargs="+", choices=sorted(WRITERS), default=DEFAULT_FORMATS)
+    parser.add_argument("--engines", nargs="+", default=["python"], choices=["python", "numpy"])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--report", default=os.path.join(GUI_DIR, "bench_report.json"))
+    parser.add_argument("--baseline", help="fail if any metric regresses against this report")
+    parser.add_argument("--save-baseline", metavar="PATH", help="also write this run's report to PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression fraction (default 0.2)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child))))
+        return 0
+
+    report = run_benchmarks(args)
+    for path in filter(None, [args.report, args.save_baseline]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    print(f"📄 Report saved as: {args.report}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            return 1
+        print(f"✅ No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Dict, List, Optional
+
+from chat_datasets import DEFAULT_DATASETS, GUI_DIR, iter_datasets
+
+# Retrieval index for the chat fallback (gui/chat_index.json)
+#
+# app/api/chat/route.ts answers from the knowledge base when the model is
+# unavailable, picking the entry whose "instruction input" tokens have the
+# highest Jaccard similarity with the question. This script tokenizes the
+# datasets once, offline, into:
+#
+#   documents.sizes    number of distinct tokens per document
+#   documents.outputs  the answer to return for each document
+#   postings           token -> ids of the documents containing it
+#
+# The route then only visits documents sharing a token with the question and
+# gets Jaccard from the overlap count: |q & d| / (|q| + |d| - |q & d|).
+# Ties go to the lowest document id, i.e. the earliest entry, as in the scan.
+
+INDEX_VERSION = 1
+DEFAULT_OUTPUT = os.path.join(GUI_DIR, "chat_index.json")
+
+_NON_ALNUM = re.compile(r"[^a-z0-9\s]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Same tokenizer as tokenize() in app/api/chat/route.ts."""
+    return _NON_ALNUM.sub(" ", text.lower()).split()
+
+
+def build_index(paths: List[str]) -> Dict[str, object]:
+    sizes: List[int] = []
+    outputs: List[str] = []
+    postings: Dict[str, List[int]] = {}
+    seen = set()
+    skipped = 0
+
+    for pair in iter_datasets(paths):
+        tokens = frozenset(tokenize(f"{pair['instruction']} {pair['input']}"))
+        if not tokens:
+            continue
+        # An entry whose token set was already indexed can never win: scores
+        # would tie and ties go to the earlier entry.
+        if tokens in seen:
+            skipped += 1
+            continue
+        seen.add(tokens)
+
+        doc_id = len(sizes)
+        sizes.append(len(tokens))
+        outputs.append(pair["output"].strip())
+        for token in sorted(tokens):
+            postings.setdefault(token, []).append(doc_id)
+
+    print(f"  Indexed {len(sizes)} documents, {len(postings)} tokens ({skipped} shadowed duplicates dropped)")
+    return {
+        "version": INDEX_VERSION,
+        "sources": [os.path.basename(path) for path in paths],
+        "documents": {"sizes": sizes, "outputs": outputs},
+        "postings": dict(sorted(postings.items())),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the chat fallback retrieval index.")
+    parser.add_argument("datasets", nargs="*", default=DEFAULT_DATASETS,
+                        help="instruction or chat-format JSONL datasets, in priority order")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    print(f"Indexing {len(args.datasets)} datasets...")
+    index = build_index(args.datasets)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    print(f"✅ Saved chat index to {args.output} ({os.path.getsize(args.output):,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import json
+import os
+from typing import Any, Dict, Iterator, List
+
+# Readers for the chat / fine-tuning datasets
+#
+# The datasets come in two line-oriented shapes (one JSON object per line,
+# whatever the file extension says):
+#
+#   instruction form   {"instruction", "input", "output", "_tag"?}
+#                      combined_final_dataset.json, combined_cse_placement_dataset.json
+#   chat form          {"messages": [{"role", "content"}, ...]}
+#                      training_data_chat.jsonl
+#
+# iter_pairs() flattens both into instruction/input/output records, one per
+# user -> assistant exchange, tagged with the file and line they came from.
+
+GUI_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATASETS = [
+    os.path.join(GUI_DIR, "combined_final_dataset.json"),
+    os.path.join(GUI_DIR, "training_data_chat.jsonl"),
+]
+ALL_DATASETS = DEFAULT_DATASETS + [
+    os.path.join(GUI_DIR, "combined_cse_placement_dataset.json"),
+]
+
+
+def iter_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield raw JSON objects from a JSON-lines file, or from a file holding one JSON array."""
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == "[":
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def row_text(row: Dict[str, Any]) -> str:
+    """The prompt and answer text of a raw row, whichever shape it has (system prompts excluded)."""
+    if "messages" in row:
+        return "\n".join(m.get("content", "") for m in row["messages"] if m.get("role") != "system")
+    return "\n".join(filter(None, (row.get("instruction", ""), row.get("input", ""), row.get("output", ""))))
+
+
+def row_messages(row: Dict[str, Any]) -> List[Dict[str, str]]:
+    """A raw row as a chat message list; instruction-form rows become one user/assistant exchange."""
+    if "messages" in row:
+        return [{"role": m["role"], "content": m.get("content", "")} for m in row["messages"]]
+    prompt = "\n\n".join(filter(None, (row.get("instruction", ""), row.get("input", ""))))
+    return [{"role": "user", "content": prompt}, {"role": "assistant", "content": row.get("output", "")}]
+
+
+def iter_pairs(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield ``{"instruction", "input", "output", "system", "source", "line"}`` records."""
+    source = os.path.basename(path)
+    for line, row in enumerate(iter_rows(path), 1):
+        if "messages" in row:
+            system = ""
+            pending = None
+            for message in row["messages"]:
+                role, content = message.get("role"), message.get("content", "")
+                if role == "system":
+                    system = content
+                elif role == "user":
+                    pending = content
+                elif role == "assistant" and pending is not None:
+                    yield {"instruction": pending, "input": "", "output": content,
+                           "system": system, "source": source, "line": line}
+                    pending = None
+        elif "instruction" in row:
+            yield {"instruction": row["instruction"], "input": row.get("input", ""), "output": row.get("output", ""),
+                   "system": "", "source": source, "line": line}
+
+
+def iter_datasets(paths: List[str]) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        yield from iter_pairs(path)
@@ -0,0 +1,194 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pure Python signatures are identical, just slower
+    np = None
+
+from chat_datasets import ALL_DATASETS, GUI_DIR, iter_rows, row_text
+
+# Near-duplicate removal for the fine-tuning datasets
+#
+# Every row (instruction form or chat form) is reduced to the set of word
+# shingles of its prompt + answer text and summarised by a MinHash signature.
+# Signatures are split into LSH bands; rows only get compared when they share
+# a band bucket with an already kept row, so the pass stays sub-quadratic.
+#
+# Rows are streamed in file order. A row is dropped when its estimated Jaccard
+# similarity with a kept row reaches --threshold, so the earliest variant of
+# each cluster survives. Datasets are read with chat_datasets.iter_rows, so
+# JSON-lines files and JSON arrays both work; kept rows are written to
+# --output-dir as JSON lines under their original file names, and the
+# clusters (with 1-based row numbers) go to the report:
+#
+#   python dedup_datasets.py --threshold 0.8 --output-dir deduped
+
+DEFAULT_OUTPUT_DIR = os.path.join(GUI_DIR, "deduped")
+REPORT_FILE = "dedup_report.json"
+
+NUM_PERM = 128
+BANDS = 32
+SHINGLE_SIZE = 3
+PRIME = (1 << 32) - 5  # largest 32-bit prime; a * h + b stays below 2**64
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> List[int]:
+    """32-bit hashes of the distinct word ``size``-grams of ``text``."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        grams = {" ".join(words)}
+    else:
+        grams = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return sorted(zlib.crc32(gram.encode("utf-8")) for gram in grams)
+
+
+class MinHasher:
+    """Universal hash family h(x) = (a * x + b) mod PRIME, one (a, b) pair per permutation."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = random.Random(seed)
+        self.a = [rng.randrange(1, PRIME) for _ in range(num_perm)]
+        self.b = [rng.randrange(0, PRIME) for _ in range(num_perm)]
+        if np is not None:
+            self._a = np.array(self.a, dtype=np.uint64)
+            self._b = np.array(self.b, dtype=np.uint64)
+
+    def signature(self, hashes: Sequence[int]) -> Tuple[int, ...]:
+        if np is not None:
+            values = np.array(hashes, dtype=np.uint64)[:, None] * self._a + self._b
+            return tuple((values % PRIME).min(axis=0).tolist())
+        return tuple(min((a * h + b) % PRIME for h in hashes) for a, b in zip(self.a, self.b))
+
+
+def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity: the fraction of matching signature slots."""
+    return sum(x == y for x, y in zip(left, right)) / len(left)
+
+
+class LSHIndex:
+    """Band buckets over the signatures of kept rows."""
+
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = BANDS):
+        if num_perm % bands:
+            raise ValueError(f"--bands must divide the number of permutations ({num_perm})")
+        self.rows = num_perm // bands
+        self.bands = bands
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        self.signatures: List[Tuple[int, ...]] = []
+
+    def _keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def best_match(self, signature: Tuple[int, ...]) -> Tuple[int, float]:
+        """(kept row, similarity) of the closest candidate, or (-1, 0.0)."""
+        best, best_score = -1, 0.0
+        seen = set()
+        for key in self._keys(signature):
+            for candidate in self.buckets.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                score = similarity(signature, self.signatures[candidate])
+                if score > best_score:
+                    best, best_score = candidate, score
+        return best, best_score
+
+    def add(self, signature: Tuple[int, ...]) -> int:
+        doc = len(self.signatures)
+        self.signatures.append(signature)
+        for key in self._keys(signature):
+            self.buckets.setdefault(key, []).append(doc)
+        return doc
+
+
+def preview(text: str, width: int = 80) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+
+def dedup(paths: List[str], output_dir: str, threshold: float, num_perm: int = NUM_PERM,
+          bands: int = BANDS, shingle_size: int = SHINGLE_SIZE) -> Dict[str, Any]:
+    hasher = MinHasher(num_perm)
+    index = LSHIndex(num_perm, bands)
+    exact: Dict[bytes, int] = {}
+    kept: List[Dict[str, Any]] = []  # kept row -> {"source", "line", "text"}
+    clusters: Dict[int, List[Dict[str, Any]]] = {}
+    files: Dict[str, Dict[str, int]] = {}
+
+    os.makedirs(output_dir, exist_ok=True)
+    for path in paths:
+        source = os.path.basename(path)
+        stats = files.setdefault(source, {"rows": 0, "kept": 0, "dropped": 0})
+        with open(os.path.join(output_dir, source), 'w', encoding='utf-8') as dst:
+            for row_number, row in enumerate(iter_rows(path), 1):
+                stats["rows"] += 1
+                text = row_text(row)
+
+                # Identical text skips the MinHash work entirely
+                digest = hashlib.blake2b(" ".join(_WORD.findall(text.lower())).encode("utf-8"), digest_size=16).digest()
+                match, score = exact.get(digest, -1), 1.0
+                if match < 0:
+                    signature = hasher.signature(shingle_hashes(text, shingle_size))
+                    match, score = index.best_match(signature)
+
+                if match >= 0 and score >= threshold:
+                    stats["dropped"] += 1
+                    clusters.setdefault(match, []).append(
+                        {"source": source, "line": row_number, "similarity": round(score, 3)})
+                    continue
+
+                exact[digest] = index.add(signature)
+                kept.append({"source": source, "line": row_number, "text": preview(text)})
+                stats["kept"] += 1
+                dst.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    report = {
+        "threshold": threshold,
+        "numPerm": num_perm,
+        "bands": bands,
+        "shingleSize": shingle_size,
+        "files": files,
+        "clusters": [
+            {"representative": kept[doc], "duplicates": members}
+            for doc, members in sorted(clusters.items(), key=lambda item: (-len(item[1]), item[0]))
+        ],
+    }
+    with open(os.path.join(output_dir, REPORT_FILE), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Remove near-duplicate rows from the fine-tuning datasets.")
+    parser.add_argument("datasets", nargs="*", default=ALL_DATASETS,
+                        help="JSONL or JSON-array datasets, in priority order (earlier rows win)")
+    parser.add_argument("--threshold", type=float, default=0.8, help="estimated Jaccard similarity to drop at")
+    parser.add_argument("--num-perm", type=int, default=NUM_PERM)
+    parser.add_argument("--bands", type=int, default=BANDS)
+    parser.add_argument("--shingle-size", type=int, default=SHINGLE_SIZE)
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    args = parser.parse_args(argv)
+    if not 0 < args.threshold <= 1:
+        parser.error("--threshold must be in (0, 1]")
+
+    print(f"Deduplicating {len(args.datasets)} datasets (threshold {args.threshold})...")
+    report = dedup(args.datasets, args.output_dir, args.threshold, args.num_perm, args.bands, args.shingle_size)
+    for source, stats in report["files"].items():
+        print(f"📄 {source}: kept {stats['kept']} of {stats['rows']} rows ({stats['dropped']} near-duplicates)")
+    print(f"✅ {len(report['clusters'])} clusters written to {os.path.join(args.output_dir, REPORT_FILE)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
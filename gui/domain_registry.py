@@ -0,0 +1,165 @@
+import json
+import os
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import yaml
+except ImportError:  # YAML template packs are optional; JSON packs need nothing extra
+    yaml = None
+
+# Domain template packs
+#
+# Each domain lives in its own data file under gui/domains/, named after the
+# domain's slug (e.g. "system_design.json" for "System Design"):
+#
+#   {
+#     "domain": "System Design",
+#     "order": 9,                # position in the combined bank (optional)
+#     "categories": [...],
+#     "difficulty": {"Easy": 0.3, ...},
+#     "templates": [{"question", "variations", "distractors", "explanation"}]
+#   }
+#
+# .yaml/.yml packs with the same structure are read when PyYAML is installed.
+# Packs are only parsed when a domain is requested, validated once, and cached.
+
+DOMAINS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "domains")
+PACK_EXTENSIONS = (".json", ".yaml", ".yml")
+
+
+class DomainConfigError(ValueError):
+    """A domain template pack is missing or malformed."""
+
+
+def domain_slug(domain: str) -> str:
+    return domain.lower().replace(' ', '_')
+
+
+def _check(condition: bool, path: str, message: str) -> None:
+    if not condition:
+        raise DomainConfigError(f"{path}: {message}")
+
+
+def validate_pack(pack: Any, path: str) -> None:
+    """Raise DomainConfigError unless ``pack`` has the template pack structure."""
+    _check(isinstance(pack, dict), path, "expected an object at the top level")
+    _check(isinstance(pack.get("domain"), str) and pack["domain"], path, "'domain' must be a non-empty string")
+    _check(isinstance(pack.get("order", 0), int), path, "'order' must be an integer")
+
+    categories = pack.get("categories")
+    _check(isinstance(categories, list) and categories and all(isinstance(c, str) for c in categories),
+           path, "'categories' must be a non-empty list of strings")
+
+    difficulty = pack.get("difficulty")
+    _check(isinstance(difficulty, dict) and difficulty, path, "'difficulty' must be a non-empty object")
+    for label, weight in difficulty.items():
+        _check(isinstance(weight, (int, float)) and weight >= 0, path, f"difficulty weight for {label!r} must be >= 0")
+    _check(sum(difficulty.values()) > 0, path, "difficulty weights must not all be zero")
+
+    templates = pack.get("templates")
+    _check(isinstance(templates, list) and templates, path, "'templates' must be a non-empty list")
+    for i, template in enumerate(templates):
+        where = f"template {i}"
+        _check(isinstance(template, dict), path, f"{where} must be an object")
+        _check(isinstance(template.get("question"), str), path, f"{where} needs a 'question' string")
+        _check(isinstance(template.get("explanation", ""), str), path, f"{where} 'explanation' must be a string")
+        distractors = template.get("distractors")
+        _check(isinstance(distractors, list) and all(isinstance(d, str) for d in distractors),
+               path, f"{where} 'distractors' must be a list of strings")
+        variations = template.get("variations")
+        _check(isinstance(variations, list) and variations, path, f"{where} needs a non-empty 'variations' list")
+        for j, variation in enumerate(variations):
+            _check(isinstance(variation, dict) and isinstance(variation.get("answer"), str),
+                   path, f"{where} variation {j} needs an 'answer' string")
+
+
+class DomainRegistry(Mapping):
+    """Lazily loaded mapping of domain name -> generator config.
+
+    Configs have the same shape the generators always used (categories,
+    difficulty, templates); the pack's "domain" and "order" keys are
+    registry bookkeeping and are left out.
+    """
+
+    def __init__(self, directory: str = DOMAINS_DIR):
+        self.directory = directory
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self._order: Dict[str, int] = {}
+        self._discovered = False
+
+    def _pack_path(self, slug: str) -> Optional[str]:
+        for extension in PACK_EXTENSIONS:
+            path = os.path.join(self.directory, slug + extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _load(self, path: str) -> Dict[str, Any]:
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.endswith(".json"):
+                pack = json.load(f)
+            elif yaml is None:
+                raise DomainConfigError(f"{path}: reading YAML template packs requires PyYAML (pip install pyyaml)")
+            else:
+                pack = yaml.safe_load(f)
+        validate_pack(pack, path)
+
+        domain = pack["domain"]
+        _check(domain_slug(domain) == os.path.splitext(os.path.basename(path))[0],
+               path, f"file name must be {domain_slug(domain)!r} for domain {domain!r}")
+        self._order[domain] = pack.get("order", 0)
+        self._configs[domain] = {key: value for key, value in pack.items() if key not in ("domain", "order")}
+        return self._configs[domain]
+
+    def __getitem__(self, domain: str) -> Dict[str, Any]:
+        config = self._configs.get(domain)
+        if config is not None:
+            return config
+        path = self._pack_path(domain_slug(domain))
+        if path is None:
+            raise KeyError(domain)
+        self._load(path)
+        if domain not in self._configs:
+            raise KeyError(domain)
+        return self._configs[domain]
+
+    def _discover(self) -> None:
+        if self._discovered:
+            return
+        for name in sorted(os.listdir(self.directory)):
+            slug, extension = os.path.splitext(name)
+            if extension in PACK_EXTENSIONS and self._pack_path(slug) == os.path.join(self.directory, name):
+                path = os.path.join(self.directory, name)
+                if not any(domain_slug(domain) == slug for domain in self._configs):
+                    self._load(path)
+        self._discovered = True
+
+    def names(self) -> List[str]:
+        """Every available domain, in pack order."""
+        self._discover()
+        return sorted(self._configs, key=lambda domain: (self._order[domain], domain))
+
+    def resolve(self, requested: List[str]) -> List[str]:
+        """Map command-line domain names or slugs to domain names, loading only those packs."""
+        domains = []
+        for name in requested:
+            path = self._pack_path(domain_slug(name))
+            if path is None:
+                raise DomainConfigError(f"No template pack for domain {name!r} in {self.directory}")
+            slug = os.path.splitext(os.path.basename(path))[0]
+            domain = next((d for d in self._configs if domain_slug(d) == slug), None)
+            if domain is None:
+                self._load(path)
+                domain = next(d for d in self._configs if domain_slug(d) == slug)
+            domains.append(domain)
+        return sorted(domains, key=lambda domain: (self._order[domain], domain))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names())
+
+    def __len__(self) -> int:
+        return len(self.names())
+
+
+REGISTRY = DomainRegistry()
@@ -0,0 +1,599 @@
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from chat_datasets import DEFAULT_DATASETS, iter_datasets
+
+# Evaluation harness for the cs-mentor model (or any Ollama-compatible server)
+#
+# Dataset prompts are replayed against POST /api/chat with "stream": true
+# from a fixed number of asyncio workers sharing a pool of keep-alive HTTP
+# connections (standard library only). Per request it records:
+#
+#   ttft           seconds until the first content chunk
+#   latency        seconds until the final ("done": true) chunk
+#   tokens         eval_count from the server, else the number of chunks
+#   tokensPerSec   eval_count / eval_duration from the server, else measured
+#   scores         token F1, ROUGE-L F and exact match against the reference
+#
+# and reports p50/p95/p99 of latency and TTFT, aggregate throughput and mean
+# scores. Reports from runs with different --num-ctx / --temperature or
+# model builds are compared side by side with the compare command:
+#
+#   python eval_model.py run --limit 200 --concurrency 4 --report runs/t07.json
+#   python eval_model.py run --temperature 0.2 --report runs/t02.json
+#   python eval_model.py compare runs/t07.json runs/t02.json
+#
+# The stub command serves the dataset's own answers token by token with a
+# configurable delay, for exercising the harness without a model:
+#
+#   python eval_model.py stub --port 11500 --token-delay 0.01
+#   python eval_model.py run --url http://127.0.0.1:11500 --limit 50
+
+DEFAULT_URL = os.environ.get("OLLAMA_BASE_URL", "").strip() or "http://127.0.0.1:11434"
+DEFAULT_MODEL = os.environ.get("OLLAMA_MODEL", "").strip() or "cs-mentor"
+PERCENTILES = (50, 95, 99)
+MAX_LINE = 1 << 20
+
+
+class HttpError(Exception):
+    pass
+
+
+# --- pooled HTTP/1.1 client -------------------------------------------------
+
+class Response:
+    """Status, headers and a line iterator over the (possibly chunked) body of one response."""
+
+    def __init__(self, reader: asyncio.StreamReader, status: int, headers: Dict[str, str]):
+        self.reader = reader
+        self.status = status
+        self.headers = headers
+        self.complete = False
+
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        if self.headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass  # trailers
+                    break
+                data = await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+                yield data
+        elif "content-length" in self.headers:
+            remaining = int(self.headers["content-length"])
+            while remaining:
+                data = await self.reader.read(min(remaining, 65536))
+                if not data:
+                    raise HttpError("connection closed mid-body")
+                remaining -= len(data)
+                yield data
+        else:
+            while True:
+                data = await self.reader.read(65536)
+                if not data:
+                    break
+                yield data
+        self.complete = True
+
+    async def lines(self) -> AsyncIterator[bytes]:
+        buffer = b""
+        async for data in self._chunks():
+            buffer += data
+            *complete, buffer = buffer.split(b"\n")
+            for line in complete:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+
+    async def read(self) -> bytes:
+        return b"".join([data async for data in self._chunks()])
+
+
+class HttpPool:
+    """Up to ``size`` keep-alive connections to one host, reused across requests."""
+
+    def __init__(self, url: str, size: int):
+        parts = urlsplit(url)
+        if parts.scheme != "http":
+            raise ValueError(f"Only http:// endpoints are supported, got {url}")
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.base_path = parts.path.rstrip("/")
+        self.slots = asyncio.Semaphore(size)
+        self.idle: Deque[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = deque()
+        self.opened = 0
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        self.opened += 1
+        return await asyncio.open_connection(self.host, self.port, limit=MAX_LINE)
+
+    async def _send(self, connection, method: str, path: str, body: bytes) -> Response:
+        reader, writer = connection
+        writer.write((f"{method} {self.base_path}{path} HTTP/1.1\r\n"
+                      f"Host: {self.host}:{self.port}\r\n"
+                      "Content-Type: application/json\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      "Connection: keep-alive\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before the response")
+        status = int(status_line.split()[1])
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return Response(reader, status, headers)
+
+    @contextlib.asynccontextmanager
+    async def request(self, method: str, path: str, payload: Any = None) -> AsyncIterator[Response]:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        async with self.slots:
+            connection = self.idle.popleft() if self.idle else None
+            try:
+                response = await self._send(connection, method, path, body) if connection else None
+            except (ConnectionError, asyncio.IncompleteReadError):
+                connection[1].close()  # the server dropped an idle connection; retry once on a fresh one
+                response = None
+            except BaseException:
+                connection[1].close()  # cancelled (e.g. by wait_for) mid-request; the stream is unusable
+                raise
+            if response is None:
+                connection = await self._connect()
+                try:
+                    response = await self._send(connection, method, path, body)
+                except BaseException:
+                    connection[1].close()
+                    raise
+            try:
+                yield response
+            finally:
+                reusable = (response.complete and response.headers.get("connection", "").lower() != "close")
+                if reusable:
+                    self.idle.append(connection)
+                else:
+                    connection[1].close()
+
+    async def close(self) -> None:
+        while self.idle:
+            _, writer = self.idle.popleft()
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+
+# --- scoring -----------------------------------------------------------------
+
+def tokens_of(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def token_f1(prediction: List[str], reference: List[str]) -> float:
+    if not prediction or not reference:
+        return float(prediction == reference)
+    remaining: Dict[str, int] = {}
+    for token in reference:
+        remaining[token] = remaining.get(token, 0) + 1
+    common = 0
+    for token in prediction:
+        if remaining.get(token, 0) > 0:
+            remaining[token] -= 1
+            common += 1
+    if not common:
+        return 0.0
+    precision, recall = common / len(prediction), common / len(reference)
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_l(prediction: List[str], reference: List[str]) -> float:
+    """ROUGE-L F1: longest common subsequence over tokens, O(len(prediction) * len(reference))."""
+    if not prediction or not reference:
+        return float(prediction == reference)
+    previous = [0] * (len(reference) + 1)
+    for token in prediction:
+        current = [0]
+        for j, other in enumerate(reference):
+            current.append(previous[j] + 1 if token == other else max(previous[j + 1], current[j]))
+        previous = current
+    lcs = previous[-1]
+    if not lcs:
+        return 0.0
+    precision, recall = lcs / len(prediction), lcs / len(reference)
+    return 2 * precision * recall / (precision + recall)
+
+
+def score(answer: str, reference: str) -> Dict[str, float]:
+    prediction, expected = tokens_of(answer), tokens_of(reference)
+    return {
+        "f1": round(token_f1(prediction, expected), 4),
+        "rougeL": round(rouge_l(prediction, expected), 4),
+        "exact": float(prediction == expected),
+    }
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Linear-interpolation percentile of ``values`` (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+# --- harness -----------------------------------------------------------------
+
+def prompt_of(pair: Dict[str, Any]) -> str:
+    return "\n\n".join(filter(None, (pair["instruction"], pair["input"])))
+
+
+def build_messages(pair: Dict[str, Any]) -> List[Dict[str, str]]:
+    # Without a system message the model's own SYSTEM prompt (cs_mentor_modelfile) applies
+    messages = [{"role": "system", "content": pair["system"]}] if pair.get("system") else []
+    messages.append({"role": "user", "content": prompt_of(pair)})
+    return messages
+
+
+def select_pairs(datasets: List[str], limit: Optional[int], sample: Optional[int], seed: int) -> Iterator[Dict[str, Any]]:
+    pairs = iter_datasets(datasets)
+    if sample:
+        population = list(pairs)
+        yield from random.Random(seed).sample(population, min(sample, len(population)))
+        return
+    for i, pair in enumerate(pairs):
+        if limit is not None and i >= limit:
+            return
+        yield pair
+
+
+async def evaluate_one(pool: HttpPool, model: str, options: Dict[str, Any], pair: Dict[str, Any]) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"source": pair["source"], "line": pair["line"]}
+    payload = {"model": model, "messages": build_messages(pair), "stream": True}
+    if options:
+        payload["options"] = options
+    start = time.perf_counter()
+    first = None
+    pieces: List[str] = []
+    chunks = 0
+    final: Dict[str, Any] = {}
+    async with pool.request("POST", "/api/chat", payload) as response:
+        if response.status != 200:
+            raise HttpError(f"HTTP {response.status}: {(await response.read())[:200].decode('utf-8', 'replace')}")
+        async for line in response.lines():
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                raise HttpError(chunk["error"])
+            content = (chunk.get("message") or {}).get("content", "")
+            if content:
+                if first is None:
+                    first = time.perf_counter()
+                pieces.append(content)
+                chunks += 1
+            if chunk.get("done"):
+                final = chunk
+    end = time.perf_counter()
+
+    answer = "".join(pieces)
+    tokens = final.get("eval_count") or chunks
+    if final.get("eval_count") and final.get("eval_duration"):
+        rate = final["eval_count"] / (final["eval_duration"] / 1e9)
+    elif first is not None and end > first and tokens > 1:
+        rate = (tokens - 1) / (end - first)  # the first token's time is TTFT
+    else:
+        rate = None
+    record.update({
+        "ok": True,
+        "ttft": round(first - start, 6) if first is not None else None,
+        "latency": round(end - start, 6),
+        "tokens": tokens,
+        "promptTokens": final.get("prompt_eval_count"),
+        "tokensPerSec": round(rate, 3) if rate is not None else None,
+        "scores": score(answer, pair["output"]),
+        "answer": answer,
+    })
+    return record
+
+
+async def run_eval(pairs: Iterable[Dict[str, Any]], url: str, model: str, options: Dict[str, Any],
+                   concurrency: int, timeout: float, warmup: int = 0,
+                   on_record=None) -> Tuple[List[Dict[str, Any]], float]:
+    """Replay ``pairs`` with ``concurrency`` workers; returns the records and the wall time."""
+    pool = HttpPool(url, concurrency)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * concurrency)
+    records: List[Dict[str, Any]] = []
+
+    async def attempt(pair: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return await asyncio.wait_for(evaluate_one(pool, model, options, pair), timeout)
+        except (asyncio.TimeoutError, OSError, HttpError, ValueError, asyncio.IncompleteReadError) as e:
+            error = "timeout" if isinstance(e, asyncio.TimeoutError) else f"{type(e).__name__}: {e}"
+            return {"source": pair["source"], "line": pair["line"], "ok": False, "error": error}
+
+    async def worker() -> None:
+        while True:
+            pair = await queue.get()
+            if pair is None:
+                return
+            record = await attempt(pair)
+            records.append(record)
+            if on_record:
+                on_record(record)
+
+    pairs = iter(pairs)
+    try:
+        # Warm-up requests load the model and open connections. They replay the first
+        # prompts, which are still scored afterwards, so warm-up never changes the prompt set.
+        warm = [pair for _, pair in zip(range(warmup), pairs)]
+        await asyncio.gather(*(attempt(pair) for pair in warm))
+        pairs = itertools.chain(warm, pairs)
+
+        start = time.perf_counter()
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        for pair in pairs:
+            await queue.put(pair)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+        return records, time.perf_counter() - start
+    finally:
+        await pool.close()
+
+
+def summarize(records: List[Dict[str, Any]], wall: float) -> Dict[str, Any]:
+    ok = [r for r in records if r["ok"]]
+    latencies = [r["latency"] for r in ok]
+    ttfts = [r["ttft"] for r in ok if r["ttft"] is not None]
+    rates = [r["tokensPerSec"] for r in ok if r["tokensPerSec"] is not None]
+    tokens = sum(r["tokens"] for r in ok)
+
+    def spread(values: List[float]) -> Dict[str, Optional[float]]:
+        return {f"p{p}": round(percentile(values, p), 4) if values else None for p in PERCENTILES}
+
+    errors: Dict[str, int] = {}
+    for record in records:
+        if not record["ok"]:
+            errors[record["error"]] = errors.get(record["error"], 0) + 1
+    return {
+        "requests": len(records),
+        "succeeded": len(ok),
+        "errors": dict(sorted(errors.items(), key=lambda item: -item[1])),
+        "wallSeconds": round(wall, 3),
+        "requestsPerSec": round(len(ok) / wall, 3) if wall else None,
+        "throughputTokensPerSec": round(tokens / wall, 2) if wall else None,
+        "latency": spread(latencies),
+        "ttft": spread(ttfts),
+        "tokensPerSec": spread(rates),
+        "scores": {metric: round(sum(r["scores"][metric] for r in ok) / len(ok), 4) if ok else None
+                   for metric in ("f1", "rougeL", "exact")},
+    }
+
+
+def command_run(args: argparse.Namespace) -> int:
+    options: Dict[str, Any] = json.loads(args.options) if args.options else {}
+    if args.num_ctx is not None:
+        options["num_ctx"] = args.num_ctx
+    if args.temperature is not None:
+        options["temperature"] = args.temperature
+    if args.seed is not None:
+        options["seed"] = args.seed
+
+    datasets = args.datasets or DEFAULT_DATASETS
+    pairs = select_pairs(datasets, args.limit, args.sample, args.seed or 0)
+
+    for path in filter(None, (args.output, args.report)):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    results = open(args.output, 'w', encoding='utf-8') if args.output else None
+    done = 0
+
+    def on_record(record: Dict[str, Any]) -> None:
+        nonlocal done
+        done += 1
+        if results:
+            results.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if not record["ok"] and done <= 5:
+            print(f"⚠️  {record['source']}:{record['line']}: {record['error']}")
+        elif done % 50 == 0:
+            print(f"⏱️  {done} prompts evaluated")
+
+    print(f"🧠 Evaluating {args.model} at {args.url} with {args.concurrency} concurrent requests")
+    try:
+        records, wall = asyncio.run(run_eval(pairs, args.url, args.model, options, args.concurrency,
+                                             args.timeout, args.warmup, on_record))
+    finally:
+        if results:
+            results.close()
+
+    summary = summarize(records, wall)
+    report = {
+        "label": args.label or f"{args.model} {json.dumps(options, sort_keys=True)}",
+        "config": {"url": args.url, "model": args.model, "options": options, "concurrency": args.concurrency,
+                   "datasets": [os.path.basename(path) for path in datasets]},
+        "summary": summary,
+    }
+    print_summary(report)
+    if args.output:
+        print(f"📄 Per-prompt results saved as: {args.output}")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📊 Report saved as: {args.report}")
+    return 0 if summary["succeeded"] else 1
+
+
+def print_summary(report: Dict[str, Any]) -> None:
+    s = report["summary"]
+    print(f"\n✅ {s['succeeded']}/{s['requests']} prompts answered in {s['wallSeconds']}s "
+          f"({s['requestsPerSec']} req/s, {s['throughputTokensPerSec']} tok/s overall)")
+    for name in ("latency", "ttft", "tokensPerSec"):
+        print(f"   {name:<13}" + "  ".join(f"{key} {value}" for key, value in s[name].items()))
+    print("   scores       " + "  ".join(f"{key} {value}" for key, value in s["scores"].items()))
+    for error, count in s["errors"].items():
+        print(f"❌ {error} ({count}x)")
+
+
+def command_compare(args: argparse.Namespace) -> int:
+    rows = [("run", "ok", "req/s", "tok/s", "p50", "p95", "p99", "ttft p50", "f1", "rougeL")]
+    for path in args.reports:
+        with open(path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        s = report["summary"]
+        rows.append((report["label"], f"{s['succeeded']}/{s['requests']}", s["requestsPerSec"],
+                     s["throughputTokensPerSec"], s["latency"]["p50"], s["latency"]["p95"], s["latency"]["p99"],
+                     s["ttft"]["p50"], s["scores"]["f1"], s["scores"]["rougeL"]))
+    widths = [max(len(str(row[i])) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
+    return 0
+
+
+# --- stub server ---------------------------------------------------------------
+
+class StubModel:
+    """Minimal Ollama /api/chat stand-in that streams the dataset's reference answers."""
+
+    def __init__(self, datasets: List[str], model: str, first_token_delay: float, token_delay: float):
+        self.answers = {prompt_of(pair): pair["output"] for pair in iter_datasets(datasets)}
+        self.model = model
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                if method == "POST" and path == "/api/chat":
+                    await self.chat(json.loads(body or b"{}"), writer)
+                elif method == "GET" and path == "/api/tags":
+                    self.send_json(writer, 200, {"models": [{"name": self.model}]})
+                else:
+                    self.send_json(writer, 404, {"error": f"{method} {path} not found"})
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def send_json(writer: asyncio.StreamWriter, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                     f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+
+    async def chat(self, request: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        prompt = next((m["content"] for m in reversed(request.get("messages", [])) if m.get("role") == "user"), "")
+        answer = self.answers.get(prompt, "I'm not sure about that one.")
+        pieces = re.findall(r"\S+\s*", answer) or [answer]
+        start = time.perf_counter()
+        await asyncio.sleep(self.first_token_delay)
+        if not request.get("stream", True):
+            await asyncio.sleep(self.token_delay * (len(pieces) - 1))
+            self.send_json(writer, 200, {"model": self.model, "message": {"role": "assistant", "content": answer},
+                                         "done": True, "eval_count": len(pieces)})
+            return
+
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n\r\n")
+
+        def send(chunk: Dict[str, Any]) -> None:
+            data = json.dumps(chunk).encode("utf-8") + b"\n"
+            writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+        eval_start = time.perf_counter()
+        for i, piece in enumerate(pieces):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            send({"model": self.model, "message": {"role": "assistant", "content": piece}, "done": False})
+            await writer.drain()
+        now = time.perf_counter()
+        send({"model": self.model, "message": {"role": "assistant", "content": ""}, "done": True,
+              "total_duration": int((now - start) * 1e9), "prompt_eval_count": len(prompt.split()),
+              "eval_count": len(pieces), "eval_duration": max(int((now - eval_start) * 1e9), 1)})
+        writer.write(b"0\r\n\r\n")
+
+
+def command_stub(args: argparse.Namespace) -> int:
+    stub = StubModel(args.datasets or DEFAULT_DATASETS, args.model, args.first_token_delay, args.token_delay)
+
+    async def serve() -> None:
+        server = await asyncio.start_server(stub.handle, args.host, args.port, limit=MAX_LINE)
+        print(f"🧪 Stub model {args.model} serving {len(stub.answers)} answers on http://{args.host}:{args.port}")
+        async with server:
+            await server.serve_forever()
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve())
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure latency, throughput and answer quality of a chat model.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="replay dataset prompts against the model")
+    run.add_argument("datasets", nargs="*", help="chat datasets (default: combined_final_dataset.json, training_data_chat.jsonl)")
+    run.add_argument("--url", default=DEFAULT_URL, help="Ollama base URL (default: $OLLAMA_BASE_URL or %(default)s)")
+    run.add_argument("--model", default=DEFAULT_MODEL)
+    run.add_argument("--concurrency", type=int, default=4, help="requests in flight (and pooled connections)")
+    run.add_argument("--limit", type=int, help="evaluate the first N prompts")
+    run.add_argument("--sample", type=int, help="evaluate N prompts chosen at random (see --seed)")
+    run.add_argument("--seed", type=int, help="sampling seed, also sent to the model")
+    run.add_argument("--num-ctx", type=int, help="override the model's num_ctx")
+    run.add_argument("--temperature", type=float, help="override the model's temperature")
+    run.add_argument("--options", help='extra Ollama options as JSON, e.g. \'{"top_p": 0.9}\'')
+    run.add_argument("--warmup", type=int, default=1, help="unrecorded requests sent first (default: %(default)s)")
+    run.add_argument("--timeout", type=float, default=300.0, help="seconds per request")
+    run.add_argument("--label", help="name of this run in reports (default: model and options)")
+    run.add_argument("--output", help="write one JSON line per prompt here")
+    run.add_argument("--report", help="write the summary JSON here")
+
+    compare = commands.add_parser("compare", help="compare saved run reports")
+    compare.add_argument("reports", nargs="+")
+
+    stub = commands.add_parser("stub", help="serve reference answers as a stand-in model")
+    stub.add_argument("datasets", nargs="*")
+    stub.add_argument("--host", default="127.0.0.1")
+    stub.add_argument("--port", type=int, default=11500)
+    stub.add_argument("--model", default=DEFAULT_MODEL)
+    stub.add_argument("--first-token-delay", type=float, default=0.05, help="seconds before the first token")
+    stub.add_argument("--token-delay", type=float, default=0.005, help="seconds between tokens")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        if args.concurrency < 1:
+            parser.error("--concurrency must be at least 1")
+        return command_run(args)
+    if args.command == "compare":
+        return command_compare(args)
+    return command_stub(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
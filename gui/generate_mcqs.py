@@ -4,40 +4,12 @@ from datetime import datetime
 from typing import List, Dict, Any
 import os
 
+from domain_registry import REGISTRY
+
 # Configuration
 TOTAL_QUESTIONS = 1000  # Per domain
-DOMAINS = [
-    "DSA", "Python", "JavaScript", "React.js", "Java", 
-    "SQL", "MongoDB", "CSS", "System Design", "CS Fundamentals"
-]
-
-# Domain-specific configurations
-DOMAIN_CONFIGS = {
-    "DSA": {
-        "categories": ["Arrays", "Linked Lists", "Stacks/Queues", "Trees", "Graphs", "Sorting", "Searching", "Dynamic Programming"],
-        "difficulty": {"Easy": 0.3, "Medium": 0.5, "Hard": 0.2},
-        "templates": [
-            {
-                "question": "What is the time complexity of {operation} in {data_structure}?",
-                "variations": [
-                    {"operation": "accessing an element", "data_structure": "an array", "answer": "O(1)"},
-                    {"operation": "searching for an element", "data_structure": "a linked list", "answer": "O(n)"},
-                    # More variations...
-                ],
-                "distractors": ["O(1)", "O(log n)", "O(n)", "O(n log n)", "O(n²)", "O(2ⁿ)"]
-            },
-            # More templates...
-        ]
-    },
-    "Python": {
-        "categories": ["Basics", "Data Types", "OOP", "Functions", "Modules", "File Handling"],
-        "difficulty": {"Easy": 0.4, "Medium": 0.4, "Hard": 0.2},
-        "templates": [
-            # Question templates for Python...
-        ]
-    },
-    # Configurations for other domains...
-}
+# Domain template packs live in gui/domains/ and are loaded on first use
+DOMAIN_CONFIGS = REGISTRY
 
 def generate_question(domain: str, question_id: int) -> Dict[str, Any]:
     """Generate a single MCQ question."""
@@ -116,7 +88,7 @@ def main():
     os.makedirs(output_dir, exist_ok=True)
     
     # Generate MCQs for each domain
-    for domain in DOMAINS:
+    for domain in REGISTRY.names():
         generate_domain_mcqs(domain, output_dir)
     
     print("\n🎉 All MCQs generated successfully!")
@@ -1,302 +1,636 @@
+import argparse
+import functools
+import hashlib
+import itertools
 import json
 import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for --engine numpy
+    np = None
+
+import mcq_artifacts
+import mcq_index  # noqa: F401  (registers the "index" output format)
+import mcq_pack  # noqa: F401  (registers the "pack" output format)
+import mcq_sqlite  # noqa: F401  (registers the "sqlite" output format)
+from domain_registry import REGISTRY, DomainConfigError
+from mcq_manifest import BuildManifest, fingerprint
+from mcq_profile import PROFILER, RunProfile, init_worker
+from mcq_records import Question, available_encoders, use_encoder
+from mcq_writers import BANK_VERSION, WRITERS, BankWriter, open_writers
 
 # Configuration
 QUESTIONS_PER_DOMAIN = 1000  # 1,000 questions per domain
-DOMAINS = [
-    "DSA", "Python", "JavaScript", "React.js", "Java",
-    "SQL", "MongoDB", "CSS", "System Design", "Computer Science"
-]
-
-# Domain-specific configurations
-DOMAIN_CONFIGS = {
-    "DSA": {
-        "categories": ["Arrays", "Linked Lists", "Trees", "Graphs", "Sorting", "Searching", "Dynamic Programming"],
-        "difficulty": {"Easy": 0.4, "Medium": 0.4, "Hard": 0.2},
-        "templates": [
-            {
-                "question": "What is the time complexity of {operation} in {data_structure}?",
-                "variations": [
-                    {"operation": "accessing an element", "data_structure": "an array", "answer": "O(1)"},
-                    {"operation": "searching for an element", "data_structure": "a linked list", "answer": "O(n)"},
-                    {"operation": "inserting an element at the beginning", "data_structure": "a linked list", "answer": "O(1)"},
-                    {"operation": "searching", "data_structure": "a balanced binary search tree", "answer": "O(log n)"},
-                    {"operation": "sorting", "data_structure": "an array using merge sort", "answer": "O(n log n)"},
-                ],
-                "distractors": ["O(1)", "O(log n)", "O(n)", "O(n log n)", "O(n²)", "O(2ⁿ)"],
-                "explanation": "The time complexity is {answer} because {reason}"
-            },
-            {
-                "question": "Which data structure uses {principle}?",
-                "variations": [
-                    {"principle": "LIFO (Last In First Out)", "answer": "Stack", "reason": "it follows the last-in-first-out principle"},
-                    {"principle": "FIFO (First In First Out)", "answer": "Queue", "reason": "it follows the first-in-first-out principle"},
-                    {"principle": "hashing with chaining", "answer": "Hash Table", "reason": "it uses hashing with chaining to handle collisions"},
-                ],
-                "distractors": ["Array", "Linked List", "Tree", "Graph", "Heap"],
-                "explanation": "{answer} uses {principle} {reason}."
-            }
-        ]
-    },
-    "Python": {
-        "categories": ["Basics", "Data Types", "OOP", "Functions", "Modules", "File Handling", "Decorators"],
-        "difficulty": {"Easy": 0.5, "Medium": 0.4, "Hard": 0.1},
-        "templates": [
-            {
-                "question": "What is the output of: {code}",
-                "variations": [
-                    {"code": "print(2 ** 3 ** 2)", "answer": "512", "reason": "exponentiation is right-associative in Python"},
-                    {"code": "'Hello' + 3 * '!'", "answer": "'Hello!!!'", "reason": "string multiplication repeats the string"},
-                    {"code": "[i for i in range(5) if i % 2 == 0]", "answer": "[0, 2, 4]", "reason": "list comprehension filters even numbers"},
-                ],
-                "distractors": ["Error", "None", "True", "False", "0", "1"],
-                "explanation": "The output is {answer} because {reason}."
-            }
-        ]
-    },
-    "JavaScript": {
-        "categories": ["Basics", "ES6+", "DOM", "Async/Await", "Closures", "Prototypes"],
-        "difficulty": {"Easy": 0.4, "Medium": 0.4, "Hard": 0.2},
-        "templates": [
-            {
-                "question": "What is the output of: {code}",
-                "variations": [
-                    {"code": "console.log(1 + '2' + '2')", "answer": "'122'", "reason": "string concatenation occurs with the + operator"},
-                    {"code": "console.log(1 - '1')", "answer": "0", "reason": "- operator converts strings to numbers"},
-                ],
-                "distractors": ["Error", "undefined", "null", "NaN", "'12'"],
-                "explanation": "The output is {answer} because {reason}."
-            }
-        ]
-    },
-    "React.js": {
-        "categories": ["Components", "Hooks", "State", "Props", "Context", "Routing"],
-        "difficulty": {"Easy": 0.4, "Medium": 0.4, "Hard": 0.2},
-        "templates": [
-            {
-                "question": "In React, {question}",
-                "variations": [
-                    {"question": "what hook is used for side effects?", "answer": "useEffect", "reason": "it's designed to handle side effects in function components"},
-                    {"question": "how do you update state in a functional component?", "answer": "Using the setState function from useState", "reason": "useState provides the state and setter function"},
-                ],
-                "distractors": ["useState", "useContext", "useReducer", "setState", "this.setState"],
-                "explanation": "{answer} is the correct answer because {reason}."
-            }
-        ]
-    },
-    "Java": {
-        "categories": ["Basics", "OOP", "Collections", "Multithreading", "Streams", "Exceptions"],
-        "difficulty": {"Easy": 0.4, "Medium": 0.4, "Hard": 0.2},
-        "templates": [
-            {
-                "question": "In Java, {question}",
-                "variations": [
-                    {"question": "what is the default value of an int?", "answer": "0", "reason": "primitive integers default to 0"},
-                    {"question": "which collection maintains insertion order?", "answer": "LinkedHashMap", "reason": "it maintains a doubly-linked list of entries"},
-                ],
-                "distractors": ["null", "1", "-1", "false", "undefined"],
-                "explanation": "{answer} is correct because {reason}."
-            }
-        ]
-    },
-    "SQL": {
-        "categories": ["Queries", "Joins", "Indexes", "Transactions", "Optimization", "Security"],
-        "difficulty": {"Easy": 0.4, "Medium": 0.4, "Hard": 0.2},
-        "templates": [
-            {
-                "question": "Which SQL statement is used to {action}?",
-                "variations": [
-                    {"action": "retrieve data from a database", "answer": "SELECT", "reason": "SELECT is used to query data from a database"},
-                    {"action": "update existing records", "answer": "UPDATE", "reason": "UPDATE modifies existing records in a table"},
-                ],
-                "distractors": ["GET", "FIND", "MODIFY", "CHANGE", "RETRIEVE"],
-                "explanation": "{answer} is used to {action} {reason}."
-            }
-        ]
-    },
-    "MongoDB": {
-        "categories": ["CRUD", "Indexes", "Aggregation", "Sharding", "Performance", "Schema Design"],
-        "difficulty": {"Easy": 0.4, "Medium": 0.4, "Hard": 0.2},
-        "templates": [
-            {
-                "question": "In MongoDB, {question}",
-                "variations": [
-                    {"question": "which operator is used for equality?", "answer": "$eq", "reason": "$eq matches values that are equal to a specified value"},
-                    {"question": "what is the default port?", "answer": "27017", "reason": "27017 is the default port for MongoDB"},
-                ],
-                "distractors": ["$equal", "==", "=", "27018", "3306"],
-                "explanation": "{answer} is correct because {reason}."
-            }
-        ]
-    },
-    "CSS": {
-        "categories": ["Selectors", "Box Model", "Flexbox", "Grid", "Animations", "Responsive"],
-        "difficulty": {"Easy": 0.5, "Medium": 0.4, "Hard": 0.1},
-        "templates": [
-            {
-                "question": "Which CSS property is used to {action}?",
-                "variations": [
-                    {"action": "change the text color", "answer": "color", "reason": "the color property sets the text color"},
-                    {"action": "add space between elements", "answer": "margin", "reason": "margin creates space around elements"},
-                ],
-                "distractors": ["font-color", "text-color", "spacing", "padding", "border"],
-                "explanation": "{answer} is used to {action} {reason}."
-            }
-        ]
-    },
-    "System Design": {
-        "categories": ["Scalability", "Load Balancing", "Caching", "Databases", "APIs", "Security"],
-        "difficulty": {"Easy": 0.3, "Medium": 0.5, "Hard": 0.2},
-        "templates": [
-            {
-                "question": "In system design, what is the purpose of {component}?",
-                "variations": [
-                    {"component": "a load balancer", "answer": "Distribute traffic across servers", "reason": "it helps distribute incoming network traffic"},
-                    {"component": "a CDN", "answer": "Deliver content faster", "reason": "it caches content closer to users"},
-                ],
-                "distractors": [
-                    "Store session data",
-                    "Process background jobs",
-                    "Handle database queries",
-                    "Manage user authentication",
-                    "Encrypt data"
-                ],
-                "explanation": "{answer} is the purpose of {component} {reason}."
-            }
-        ]
-    },
-    "Computer Science": {
-        "categories": ["Algorithms", "Data Structures", "OS", "Networking", "Databases", "Security"],
-        "difficulty": {"Easy": 0.3, "Medium": 0.5, "Hard": 0.2},
-        "templates": [
-            {
-                "question": "In computer science, what is {concept}?",
-                "variations": [
-                    {"concept": "Big O notation", "answer": "A measure of algorithm efficiency", "reason": "it describes the performance of an algorithm"},
-                    {"concept": "a binary tree", "answer": "A tree data structure with at most two children per node", "reason": "each node has at most two children"},
-                ],
-                "distractors": [
-                    "A programming language",
-                    "A type of computer",
-                    "A sorting algorithm",
-                    "A database model",
-                    "A network protocol"
-                ],
-                "explanation": "{answer} {reason}."
-            }
-        ]
-    }
-}
+SHARD_SIZE = 1000  # Questions per worker task; fixed so output never depends on worker count
+DEFAULT_SEED = 42
+# Bump whenever a code change alters either engine's output. The engines draw
+# from different random streams, so --engine is fingerprinted per domain too.
+GENERATOR_VERSION = "1.2.0"
+
+# Domain template packs live in gui/domains/ and are loaded on first use
+DOMAIN_CONFIGS = REGISTRY
+
+# What str.format() raises for a template that does not match its variation
+RENDER_ERRORS = (KeyError, IndexError, ValueError, AttributeError)
 
-def generate_question(domain: str, question_id: int) -> Dict[str, Any]:
-    """Generate a single MCQ question."""
+class CompiledVariant(NamedTuple):
+    """One template x variation, rendered once.
+
+    ``question`` or ``explanation`` is None when that template failed to
+    render; ``error`` then holds the exception to report for it.
+    """
+    question: Optional[str]
+    explanation: Optional[str]
+    answer: str
+    distractors: Tuple[str, ...]
+    error: Optional[Exception]
+
+class CompiledDomain(NamedTuple):
+    templates: Tuple[Tuple[CompiledVariant, ...], ...]
+    difficulty_labels: Tuple[str, ...]
+    difficulty_cum_weights: Tuple[float, ...]
+    difficulty_tags: Tuple[str, ...]
+    categories: Tuple[str, ...]
+    category_tags: Tuple[str, ...]
+    id_prefix: str
+    domain_tag: str
+
+@functools.lru_cache(maxsize=None)
+def compile_domain(domain: str) -> CompiledDomain:
+    """Pre-render every template x variation of a domain and freeze its lookup tables."""
     config = DOMAIN_CONFIGS[domain]
-    template = random.choice(config["templates"])
-    variation = random.choice(template["variations"])
+    templates = []
+    with PROFILER.stage("template_formatting"):
+        for template in config["templates"]:
+            variants = []
+            for variation in template["variations"]:
+                question = explanation = error = None
+                try:
+                    question = template["question"].format(**variation)
+                    explanation = format_explanation(template, variation)
+                except RENDER_ERRORS as e:
+                    error = e
+                variants.append(CompiledVariant(
+                    question, explanation, variation["answer"],
+                    tuple(d for d in template["distractors"] if d != variation["answer"]), error
+                ))
+            templates.append(tuple(variants))
     
-    # Format the question
-    question = template["question"].format(**variation)
+    return CompiledDomain(
+        templates=tuple(templates),
+        difficulty_labels=tuple(config["difficulty"].keys()),
+        difficulty_cum_weights=tuple(itertools.accumulate(config["difficulty"].values())),
+        difficulty_tags=tuple(label.lower() for label in config["difficulty"]),
+        categories=tuple(config["categories"]),
+        category_tags=tuple(category.lower() for category in config["categories"]),
+        id_prefix=domain[:3].upper(),
+        domain_tag=domain.lower()
+    )
+
+def generate_question(domain: str, question_id: int, rng: Any = random) -> Question:
+    """Generate a single MCQ question.
+
+    ``rng`` may be a seeded ``random.Random`` so that shards are reproducible;
+    it defaults to the module-level generator.
+    """
+    compiled = compile_domain(domain)
+    clock = PROFILER.clock()
+    variant = rng.choice(rng.choice(compiled.templates))
+    if clock:
+        clock.lap("template_selection")
+    if variant.question is None:
+        raise variant.error.with_traceback(None)
     
     # Generate options
-    correct_answer = variation["answer"]
+    correct_answer = variant.answer
     options = [correct_answer]
     
     # Add distractors (wrong answers)
-    distractors = [d for d in template["distractors"] if d != correct_answer]
-    options.extend(random.sample(distractors, min(4, len(distractors))))
+    options.extend(rng.sample(variant.distractors, min(4, len(variant.distractors))))
     
     # Ensure we have at least 2 options
     while len(options) < 2:
         options.append(f"Option {len(options) + 1}")
     
-    random.shuffle(options)
+    rng.shuffle(options)
     
     # Get the index of the correct answer
     correct_idx = options.index(correct_answer)
+    if clock:
+        clock.lap("option_shuffling")
     
-    # Format explanation
+    if variant.explanation is None:
+        raise variant.error.with_traceback(None)
+    question = build_question(domain, question_id, variant.question, options, correct_idx, variant.explanation, rng)
+    if clock:
+        clock.lap("question_assembly")
+    return question
+
+def format_explanation(template: Dict[str, Any], variation: Dict[str, Any]) -> str:
+    """Render a template's explanation for one variation."""
+    correct_answer = variation["answer"]
     explanation_template = template.get("explanation", "The correct answer is {answer}.")
     # Create a safe dictionary with all variables, avoiding duplicates
     format_vars = {**variation, "answer": correct_answer}
     # Remove any duplicate keys to avoid the 'multiple values' error
     safe_vars = {k: v for k, v in format_vars.items() if k not in ('answer',) or k not in variation}
     safe_vars.update({"answer": correct_answer})  # Ensure answer is always included
-    explanation = explanation_template.format(**safe_vars)
+    return explanation_template.format(**safe_vars)
+
+def build_question(domain: str, question_id: int, question: str, options: List[str], correct_idx: int,
+                   explanation: str, rng: Any = random) -> Question:
+    """Assemble the question record, drawing difficulty, category and tags from ``rng``."""
+    compiled = compile_domain(domain)
     
     # Determine difficulty based on configuration
-    difficulty = random.choices(
-        list(config["difficulty"].keys()),
-        weights=config["difficulty"].values()
-    )[0]
+    difficulty_idx = rng.choices(range(len(compiled.difficulty_labels)),
+                                 cum_weights=compiled.difficulty_cum_weights)[0]
+    difficulty = compiled.difficulty_labels[difficulty_idx]
+    
+    return Question(
+        f"{compiled.id_prefix}{question_id:04d}",
+        question,
+        options,
+        correct_idx,
+        explanation,
+        rng.choice(compiled.categories),
+        difficulty,
+        (compiled.domain_tag, compiled.difficulty_tags[difficulty_idx], rng.choice(compiled.category_tags))
+    )
+
+def question_key(question: str, options: List[str], correct_answer: str) -> str:
+    """Hash of a question's canonical content; option order does not make a question new."""
+    canonical = json.dumps([question, sorted(options), correct_answer], ensure_ascii=False)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+def enumerate_unique(domain: str, limit: int, rng: Any = random) -> Iterator[Question]:
+    """Yield up to ``limit`` distinct questions for a domain.
+
+    The space is templates x variations x distractor subsets; each subset is
+    emitted once, in an ``rng``-chosen option order. Variations are visited
+    round-robin so a short bank still covers every variation. Generation stops
+    early, without padding, once the domain's unique space is exhausted.
+    """
+    streams = []
+    for variants in compile_domain(domain).templates:
+        for variant in variants:
+            if variant.error is not None:
+                PROFILER.error(domain, variant.error)  # once per variation; there are no draws to count
+                continue
+            subsets = itertools.combinations(variant.distractors, min(4, len(variant.distractors)))
+            streams.append((variant, subsets))
+    
+    seen = set()
+    question_id = 0
+    while streams and question_id < limit:
+        active = []
+        for variant, subsets in streams:
+            subset = next(subsets, None)
+            if subset is None:
+                continue
+            active.append((variant, subsets))
+            
+            options = [variant.answer, *subset]
+            while len(options) < 2:
+                options.append(f"Option {len(options) + 1}")
+            
+            key = question_key(variant.question, options, variant.answer)
+            if key in seen:
+                PROFILER.count("deduplicated")
+                continue
+            seen.add(key)
+            
+            rng.shuffle(options)
+            question_id += 1
+            yield build_question(domain, question_id, variant.question, options,
+                                 options.index(variant.answer), variant.explanation, rng)
+            
+            if question_id >= limit:
+                return
+        streams = active
+
+class QuestionBatch:
+    """A batch of questions held as index arrays; strings are only built on iteration.
+
+    Row ``i`` is question ``first_id + i``. ``options`` holds indices into
+    ``strings`` (-1 marks an unused slot), ``variants`` indexes ``questions``
+    and ``explanations``, and the label columns index the domain's
+    difficulty and category lists. Rows whose variant failed to render are
+    masked out by ``valid``.
+    """
+
+    def __init__(self, domain: str, first_id: int, strings: List[str], questions: List[str],
+                 explanations: List[str], variants, options, correct, difficulty, category, tag_category, valid):
+        self.domain = domain
+        self.first_id = first_id
+        self.strings = strings
+        self.questions = questions
+        self.explanations = explanations
+        self.variants = variants
+        self.options = options
+        self.correct = correct
+        self.difficulty = difficulty
+        self.category = category
+        self.tag_category = tag_category
+        self.valid = valid
+
+    def __len__(self) -> int:
+        return int(self.valid.sum())
+
+    def __iter__(self) -> Iterator[Question]:
+        compiled = compile_domain(self.domain)
+        difficulties = compiled.difficulty_labels
+        difficulty_tags = compiled.difficulty_tags
+        categories = compiled.categories
+        category_tags = compiled.category_tags
+        prefix = compiled.id_prefix
+        domain_tag = compiled.domain_tag
+        strings = self.strings
+        
+        # Convert each column to Python lists once; per-row NumPy scalar access is slow
+        variants = self.variants.tolist()
+        options = self.options.tolist()
+        correct = self.correct.tolist()
+        difficulty_idx = self.difficulty.tolist()
+        category_idx = self.category.tolist()
+        tag_idx = self.tag_category.tolist()
+        
+        for row in self.valid.nonzero()[0].tolist():
+            variant = variants[row]
+            difficulty = difficulty_idx[row]
+            yield Question(
+                f"{prefix}{self.first_id + row:04d}",
+                self.questions[variant],
+                [strings[i] for i in options[row] if i >= 0],
+                correct[row],
+                self.explanations[variant],
+                categories[category_idx[row]],
+                difficulties[difficulty],
+                (domain_tag, difficulty_tags[difficulty], category_tags[tag_idx[row]])
+            )
+
+def generate_batch(domain: str, n: int, seed: int, first_id: int = 1) -> QuestionBatch:
+    """Generate ``n`` questions with NumPy, drawing every random choice for the batch at once.
+
+    Templates and variations are picked with the same two-stage uniform choice
+    as generate_question(), but the results differ: the same seed gives the
+    same batch, not the same questions as the random-module engine.
+    """
+    if np is None:
+        raise RuntimeError("generate_batch() requires NumPy (pip install numpy)")
+    
+    compiled = compile_domain(domain)
+    rng = np.random.default_rng(seed)
+    
+    # Intern the option strings of every compiled variant
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+    def intern(value: str) -> int:
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+    
+    questions, explanations, answers, pools, ok = [], [], [], [], []
+    variation_errors: List[Optional[BaseException]] = []
+    variation_counts, variation_offsets = [], []
+    for variants in compiled.templates:
+        variation_offsets.append(len(questions))
+        variation_counts.append(len(variants))
+        for variant in variants:
+            pool = list(variant.distractors)
+            while len(pool) < 1:  # Ensure we have at least 2 options
+                pool.append(f"Option {len(pool) + 2}")
+            questions.append(variant.question or "")
+            explanations.append(variant.explanation or "")
+            ok.append(variant.error is None)
+            variation_errors.append(variant.error)
+            answers.append(intern(variant.answer))
+            pools.append(np.array([intern(d) for d in pool], dtype=np.int32))
+    
+    # Template, then variation within the template
+    template_idx = rng.integers(0, len(compiled.templates), n)
+    counts = np.array(variation_counts)[template_idx]
+    variants = np.array(variation_offsets)[template_idx] + (rng.random(n) * counts).astype(np.int64)
+    
+    # Distractor subsets and answer positions, one vectorized draw per variant
+    max_options = 1 + max(min(4, len(pool)) for pool in pools)
+    options = np.full((n, max_options), -1, dtype=np.int32)
+    correct = np.zeros(n, dtype=np.int64)
+    for variant, pool in enumerate(pools):
+        rows = np.nonzero(variants == variant)[0]
+        if not len(rows):
+            continue
+        k = min(4, len(pool))
+        picks = pool[np.argsort(rng.random((len(rows), len(pool))), axis=1)[:, :k]]
+        position = rng.integers(0, k + 1, len(rows))
+        is_answer = np.arange(k + 1)[None, :] == position[:, None]
+        chosen = np.empty((len(rows), k + 1), dtype=np.int32)
+        chosen[is_answer] = answers[variant]
+        chosen[~is_answer] = picks.reshape(-1)  # row-major fill keeps each row's distractors in order
+        options[rows, :k + 1] = chosen
+        correct[rows] = position
+    
+    weights = np.diff(compiled.difficulty_cum_weights, prepend=0.0)
+    difficulty = rng.choice(len(weights), n, p=weights / weights.sum())
+    category = rng.integers(0, len(compiled.categories), n)
+    tag_category = rng.integers(0, len(compiled.categories), n)
+    valid = np.array(ok)[variants]
     
+    # Failed variants are reported once per drawn row, like the random-module engine
+    drawn = np.bincount(variants, minlength=len(ok)).tolist()
+    for error, count in zip(variation_errors, drawn):
+        if error is not None and count:
+            PROFILER.error(domain, error, count)
+    
+    return QuestionBatch(domain, first_id, strings, questions, explanations, variants, options,
+                         correct, difficulty, category, tag_category, valid)
+
+# A shard is (domain, shard_index, first_id, last_id, seed); IDs are 1-based and inclusive.
+Shard = Tuple[str, int, int, int, int]
+
+def shard_seed(seed: int, domain: str, shard_index: int) -> int:
+    """Derive a stable per-shard seed from the run seed, domain and shard index."""
+    digest = hashlib.sha256(f"{seed}:{domain}:{shard_index}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+def plan_shards(domains: List[str], questions_per_domain: int, shard_size: int, seed: int) -> List[Shard]:
+    """Split every domain into fixed-size shards, in domain order."""
+    shards = []
+    for domain in domains:
+        for shard_index, first_id in enumerate(range(1, questions_per_domain + 1, shard_size)):
+            last_id = min(first_id + shard_size - 1, questions_per_domain)
+            shards.append((domain, shard_index, first_id, last_id, seed))
+    return shards
+
+# Workers return (domain, shard_index, questions, profiler snapshot)
+ShardResult = Tuple[str, int, Iterable[Question], Dict[str, Any]]
+
+def shard_progress(domain: str, first_id: int, last_id: int, generated: int) -> str:
+    failed = last_id - first_id + 1 - generated
+    return f"  {domain}: generated questions {first_id}-{last_id}" + (f" ({failed} failed)" if failed > 0 else "")
+
+def generate_shard(shard: Shard) -> ShardResult:
+    """Generate one shard of questions with its own seeded RNG (runs in a worker process)."""
+    domain, shard_index, first_id, last_id, seed = shard
+    rng = random.Random(shard_seed(seed, domain, shard_index))
+    questions = []
+    
+    for i in range(first_id, last_id + 1):
+        try:
+            questions.append(generate_question(domain, i, rng))
+        except RENDER_ERRORS as e:
+            PROFILER.error(domain, e)
+    
+    PROFILER.count("generated", len(questions))
+    print(shard_progress(domain, first_id, last_id, len(questions)))
+    return domain, shard_index, questions, PROFILER.take()
+
+def generate_batch_shard(shard: Shard) -> ShardResult:
+    """NumPy engine: return the shard as a QuestionBatch, materialized when it is written."""
+    domain, shard_index, first_id, last_id, seed = shard
+    n = last_id - first_id + 1
+    with PROFILER.stage("numpy_draw"):
+        batch = generate_batch(domain, n, shard_seed(seed, domain, shard_index), first_id)
+    PROFILER.count("generated", len(batch))
+    print(shard_progress(domain, first_id, last_id, len(batch)))
+    return domain, shard_index, batch, PROFILER.take()
+
+def generate_unique_shard(shard: Shard) -> ShardResult:
+    """Enumerate a whole domain's unique questions; deduplication needs the domain in one shard."""
+    domain, shard_index, first_id, last_id, seed = shard
+    rng = random.Random(shard_seed(seed, domain, shard_index))
+    limit = last_id - first_id + 1
+    with PROFILER.stage("unique_enumeration"):
+        questions = list(enumerate_unique(domain, limit, rng))
+    PROFILER.count("generated", len(questions))
+    
+    if len(questions) < limit:
+        print(f"  {domain}: unique space exhausted after {len(questions)}/{limit} questions")
+    else:
+        print(f"  {domain}: generated {len(questions)} unique questions")
+    return domain, shard_index, questions, PROFILER.take()
+
+def run_shards(shards: List[Shard], workers: int,
+               worker: Callable[[Shard], ShardResult] = generate_shard) -> Iterator[ShardResult]:
+    """Yield shard results in plan order, fanning out over a process pool when workers > 1."""
+    if workers <= 1:
+        yield from map(worker, shards)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(PROFILER.enabled,)) as executor:
+        yield from executor.map(worker, shards)
+
+def domain_stem(domain: str) -> str:
+    return f"{domain.lower().replace(' ', '_')}_mcqs"
+
+def domain_metadata(domain: str, version: str = BANK_VERSION) -> Dict[str, Any]:
     return {
-        "id": f"{domain[:3].upper()}{question_id:04d}",
-        "question": question,
-        "options": options,
-        "correctAnswer": correct_idx,
-        "explanation": explanation,
-        "category": random.choice(config["categories"]),
-        "difficulty": difficulty,
-        "tags": [domain.lower(), difficulty.lower()] + [random.choice(config["categories"]).lower()]
+        "domain": domain,
+        "totalQuestions": None,  # filled in by the writer on close
+        "categories": DOMAIN_CONFIGS[domain]["categories"],
+        "difficultyDistribution": DOMAIN_CONFIGS[domain]["difficulty"],
+        "generatedOn": datetime.now().isoformat(),
+        "version": version
     }
 
-def main():
-    output_dir = os.path.join(os.path.dirname(__file__), "mcqs")
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate MCQ banks for every domain.")
+    parser.add_argument("--domains", nargs="+", metavar="DOMAIN",
+                        help="only build these domains (names or file slugs, e.g. python system_design); "
+                             "the combined all_mcqs bank is left untouched")
+    parser.add_argument("--questions-per-domain", type=int, default=QUESTIONS_PER_DOMAIN)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (output is identical for any value)")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--engine", choices=["python", "numpy"], default="python",
+                        help="numpy draws each shard's random choices as arrays (faster, different output)")
+    parser.add_argument("--unique", action="store_true",
+                        help="emit only distinct questions, stopping when a domain's unique space is exhausted")
+    parser.add_argument("--format", nargs="+", choices=sorted(WRITERS), default=["json"], dest="formats",
+                        help="output formats; jsonl streams one question per line with a .meta.json sidecar, "
+                             "pack writes an indexed binary .mcqpack, index writes filter posting lists")
+    parser.add_argument("--version", default=BANK_VERSION, dest="bank_version",
+                        help="release version written into the banks' metadata; mcq_delta.py chains bundles by it "
+                             "(default: %(default)s)")
+    parser.add_argument("--force", action="store_true", help="rebuild every domain even if its inputs are unchanged")
+    parser.add_argument("--artifacts", nargs="?", const="artifacts", metavar="DIR",
+                        help="also publish content-addressed .json/.gz/.br copies of the banks "
+                             "(default DIR: artifacts/ inside the output directory)")
+    parser.add_argument("--encoder", choices=["auto", *available_encoders()], default="auto",
+                        help="JSON encoder for the json/jsonl banks (output is identical for every choice); "
+                             "auto uses orjson when it is installed")
+    parser.add_argument("--output-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcqs"))
+    parser.add_argument("--stats", metavar="PATH",
+                        help="write per-stage timings, counters and render errors as JSON")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write a cProfile (pstats) profile of the main process; use with --workers 1")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="trace allocations with tracemalloc (peak and top sites are printed and go into --stats)")
+    args = parser.parse_args(argv)
+    if args.engine == "numpy" and np is None:
+        parser.error("--engine numpy requires NumPy (pip install numpy)")
+    if args.artifacts and not {"json", "jsonl"} & set(args.formats):
+        parser.error("--artifacts publishes the json or jsonl banks; add one of them to --format")
+    return args
+
+def domain_fingerprint(domain: str, args: argparse.Namespace, shard_size: int) -> str:
+    """Hash of every input that determines a domain's output files."""
+    return fingerprint({
+        "generatorVersion": GENERATOR_VERSION,
+        "bankVersion": args.bank_version,
+        "domain": domain,
+        "config": DOMAIN_CONFIGS[domain],
+        "seed": args.seed,
+        "questionsPerDomain": args.questions_per_domain,
+        "shardSize": shard_size,
+        "unique": args.unique,
+        "engine": args.engine,
+        "formats": sorted(args.formats)
+    })
+
+def output_files(formats: List[str], output_dir: str, stem: str) -> List[str]:
+    return [path for fmt in formats for path in WRITERS[fmt].output_files(output_dir, stem)]
+
+def publish_artifacts(args: argparse.Namespace, stems: List[str]) -> None:
+    """Publish the banks behind ``stems`` when --artifacts was given."""
+    if not args.artifacts:
+        return
+    fmt = "json" if "json" in args.formats else "jsonl"
+    artifacts_dir = os.path.join(args.output_dir, args.artifacts)
+    with PROFILER.stage("artifacts"):
+        mcq_artifacts.publish([WRITERS[fmt].output_path(args.output_dir, stem) for stem in stems], artifacts_dir)
+    print(f"📦 Published {len(stems)} compressed artifacts to: {os.path.abspath(artifacts_dir)}")
+
+def report_failures() -> None:
+    failed = PROFILER.counters["failed"]
+    if not failed:
+        return
+    print(f"\n⚠️  {failed} questions failed to render and were skipped:")
+    for (domain, error), count in PROFILER.errors.most_common():
+        print(f"   {domain}: {error} ({count}x)")
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if args.profile and args.workers > 1:
+        print("⚠️  --profile only sees the main process; pass --workers 1 to profile generation itself")
+    with RunProfile(args.stats, args.profile, args.trace_memory):
+        build(args)
+        report_failures()
+
+def build(args: argparse.Namespace):
+    output_dir = args.output_dir
     os.makedirs(output_dir, exist_ok=True)
+    use_encoder(args.encoder)
     
-    all_questions = []
+    # Unique enumeration deduplicates across the whole domain, so it runs one shard per domain
+    shard_size = args.questions_per_domain if args.unique else args.shard_size
+    if args.unique:
+        worker = generate_unique_shard
+    elif args.engine == "numpy":
+        worker = generate_batch_shard
+    else:
+        worker = generate_shard
+    
+    try:
+        domains = REGISTRY.resolve(args.domains) if args.domains else REGISTRY.names()
+    except DomainConfigError as e:
+        raise SystemExit(f"❌ {e}")
+    
+    # Only rebuild domains whose inputs changed since the last run
+    manifest = BuildManifest(output_dir)
+    fingerprints = {domain: domain_fingerprint(domain, args, shard_size) for domain in domains}
+    stale = [domain for domain in domains
+             if args.force or not manifest.is_current(domain_stem(domain), fingerprints[domain])]
+    for domain in domains:
+        if domain not in stale:
+            print(f"⏭️  {domain} is up to date, skipping")
+    
+    shards = plan_shards(stale, args.questions_per_domain, shard_size, args.seed)
+    print(f"\nGenerating {args.questions_per_domain} MCQs for {len(stale)} domains "
+          f"({len(shards)} shards, {args.workers} workers)...")
+    
+    domain_writers: List[BankWriter] = []
+    current_domain = None
+    
+    def finish_domain():
+        with PROFILER.stage("disk_write"):
+            for writer in domain_writers:
+                writer.close()
+        stem = domain_stem(current_domain)
+        count = domain_writers[0].count
+        manifest.record(stem, fingerprints[current_domain], output_files(args.formats, output_dir, stem),
+                        totalQuestions=count, generatedOn=domain_writers[0].metadata["generatedOn"])
+        manifest.save()
+        files = ", ".join(writer.path for writer in domain_writers)
+        print(f"✅ Saved {count} {current_domain} MCQs to {files}")
+    
+    for domain, _, questions, stats in run_shards(shards, args.workers, worker):
+        PROFILER.merge(stats)
+        if domain != current_domain:
+            if current_domain is not None:
+                finish_domain()
+            current_domain = domain
+            domain_writers = open_writers(args.formats, output_dir, domain_stem(domain), domain_metadata(domain, args.bank_version))
+        clock = PROFILER.clock()
+        for question in questions:
+            if clock:
+                clock.lap("materialize")  # lazy NumPy batches build each dict here
+            for writer in domain_writers:
+                writer.write(question)
+            if clock:
+                clock.lap("serialization")
+    
+    if current_domain is not None:
+        finish_domain()
+    
+    if args.domains:
+        publish_artifacts(args, [domain_stem(domain) for domain in domains])
+        print(f"\n🎉 Built {len(stale)} of {len(domains)} requested domains")
+        print(f"📁 Individual domain files saved in: {os.path.abspath(output_dir)}")
+        return
+    
+    # Splice the per-domain outputs into a single file. The combined bank
+    # carries the newest domain timestamp, so an unchanged build stays byte-identical.
+    stems = [domain_stem(domain) for domain in domains]
+    combined_fingerprint = fingerprint({
+        "domains": [fingerprints[domain] for domain in domains],
+        "formats": sorted(args.formats)
+    })
+    combined_files = output_files(args.formats, output_dir, "all_mcqs")
+    total = sum(manifest.get(stem)["totalQuestions"] for stem in stems)
+    
+    if stale or not manifest.is_current("all_mcqs", combined_fingerprint):
+        generated_on = max(manifest.get(stem)["generatedOn"] for stem in stems)
+        metadata = {
+            "totalQuestions": total,
+            "domains": domains,
+            "generatedOn": generated_on,
+            "version": args.bank_version
+        }
+        with PROFILER.stage("combine"):
+            for fmt in args.formats:
+                writer = WRITERS[fmt]
+                parts = [writer.output_path(output_dir, stem) for stem in stems]
+                writer.combine(output_dir, "all_mcqs", metadata, parts)
+        manifest.record("all_mcqs", combined_fingerprint, combined_files,
+                        totalQuestions=total, generatedOn=generated_on)
+        manifest.save()
+        print(f"\n🎉 Generated {total} MCQs in total!")
+    else:
+        print(f"\n🎉 All {total} MCQs are up to date!")
+    
+    publish_artifacts(args, stems + ["all_mcqs"])
     
-    for domain in DOMAINS:
-        print(f"\nGenerating {QUESTIONS_PER_DOMAIN} {domain} MCQs...")
-        domain_questions = []
-        
-        for i in range(1, QUESTIONS_PER_DOMAIN + 1):
-            try:
-                question = generate_question(domain, i)
-                domain_questions.append(question)
-                if i % 100 == 0:
-                    print(f"  Generated {i}/{QUESTIONS_PER_DOMAIN} questions")
-            except Exception as e:
-                print(f"Error generating question {i}: {str(e)}")
-                continue
-        
-        # Save domain-specific questions
-        domain_file = os.path.join(output_dir, f"{domain.lower().replace(' ', '_')}_mcqs.json")
-        with open(domain_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "metadata": {
-                    "domain": domain,
-                    "totalQuestions": len(domain_questions),
-                    "categories": DOMAIN_CONFIGS[domain]["categories"],
-                    "difficultyDistribution": DOMAIN_CONFIGS[domain]["difficulty"],
-                    "generatedOn": datetime.now().isoformat(),
-                    "version": "1.0.0"
-                },
-                "questions": domain_questions
-            }, f, indent=2)
-        
-        all_questions.extend(domain_questions)
-        print(f"✅ Saved {len(domain_questions)} {domain} MCQs to {domain_file}")
-    
-    # Save all questions to a single file
-    all_questions_file = os.path.join(output_dir, "all_mcqs.json")
-    with open(all_questions_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            "metadata": {
-                "totalQuestions": len(all_questions),
-                "domains": DOMAINS,
-                "generatedOn": datetime.now().isoformat(),
-                "version": "1.0.0"
-            },
-            "questions": all_questions
-        }, f, indent=2)
-    
-    print(f"\n🎉 Generated {len(all_questions)} MCQs in total!")
     print(f"📁 Individual domain files saved in: {os.path.abspath(output_dir)}")
-    print(f"📄 Combined file saved as: {os.path.abspath(all_questions_file)}")
+    print(f"📄 Combined file saved as: {', '.join(os.path.abspath(path) for path in combined_files)}")
 
 if __name__ == "__main__":
     main()
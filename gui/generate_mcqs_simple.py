@@ -1,56 +1,21 @@
-import json
+import argparse
 import random
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import os
 
+import mcq_index  # noqa: F401  (registers the "index" output format)
+import mcq_pack  # noqa: F401  (registers the "pack" output format)
+import mcq_sqlite  # noqa: F401  (registers the "sqlite" output format)
+from domain_registry import REGISTRY, domain_slug
+from mcq_writers import WRITERS, open_writers
+
 # Configuration
 QUESTIONS_PER_DOMAIN = 100  # Reduced for testing
 TOTAL_QUESTIONS = 10 * QUESTIONS_PER_DOMAIN  # 10 domains
 
-# Domain configurations with templates
-DOMAINS = {
-    "DSA": {
-        "categories": ["Arrays", "Linked Lists", "Trees", "Graphs", "Sorting"],
-        "templates": [
-            {
-                "question": "What is the time complexity of {operation} in {data_structure}?",
-                "variations": [
-                    {"operation": "accessing an element", "data_structure": "an array", "answer": "O(1)"},
-                    {"operation": "searching for an element", "data_structure": "a linked list", "answer": "O(n)"},
-                    {"operation": "inserting an element at the beginning", "data_structure": "a linked list", "answer": "O(1)"},
-                    {"operation": "searching", "data_structure": "a balanced binary search tree", "answer": "O(log n)"},
-                    {"operation": "sorting", "data_structure": "an array using merge sort", "answer": "O(n log n)"},
-                ],
-                "distractors": ["O(1)", "O(log n)", "O(n)", "O(n log n)", "O(n²)", "O(2ⁿ)"]
-            },
-            {
-                "question": "Which data structure uses {principle}?",
-                "variations": [
-                    {"principle": "LIFO (Last In First Out)", "answer": "Stack"},
-                    {"principle": "FIFO (First In First Out)", "answer": "Queue"},
-                    {"principle": "hashing with chaining", "answer": "Hash Table"},
-                ],
-                "distractors": ["Array", "Linked List", "Tree", "Graph", "Heap"]
-            }
-        ]
-    },
-    "Python": {
-        "categories": ["Basics", "Data Types", "OOP", "Functions", "Modules"],
-        "templates": [
-            {
-                "question": "What is the output of: {code}",
-                "variations": [
-                    {"code": "print(2 ** 3 ** 2)", "answer": "512"},
-                    {"code": "print('Hello' + 3 * '!')", "answer": "Hello!!!"},
-                    {"code": "print([i for i in range(5) if i % 2 == 0])", "answer": "[0, 2, 4]"},
-                ],
-                "distractors": ["Error", "None", "True", "False", "0", "1"]
-            }
-        ]
-    },
-    # Similar templates for other domains...
-}
+# Domain template packs live in gui/domains/ and are loaded on first use
+DOMAINS = REGISTRY
 
 def generate_question(domain: str, question_id: int) -> Dict[str, Any]:
     """Generate a single MCQ question."""
@@ -84,50 +49,57 @@ def generate_question(domain: str, question_id: int) -> Dict[str, Any]:
         "tags": [domain.lower()]
     }
 
-def main():
-    output_dir = os.path.join(os.path.dirname(__file__), "mcqs")
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate a small MCQ bank for testing.")
+    parser.add_argument("--format", nargs="+", choices=sorted(WRITERS), default=["json"], dest="formats")
+    parser.add_argument("--domains", nargs="+", metavar="DOMAIN", help="only build these domains")
+    # Test banks go to their own directory so they never replace the production
+    # banks that generate_mcqs_complete.py tracks in mcqs/build_manifest.json
+    parser.add_argument("--output-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcqs", "simple"))
+    args = parser.parse_args(argv)
+    domains = REGISTRY.resolve(args.domains) if args.domains else REGISTRY.names()
+    
+    output_dir = args.output_dir
     os.makedirs(output_dir, exist_ok=True)
     
-    all_questions = []
+    # A --domains run only rebuilds those banks and leaves all_mcqs untouched
+    combined_writers = [] if args.domains else open_writers(args.formats, output_dir, "all_mcqs", {
+        "totalQuestions": None,
+        "domains": domains,
+        "generatedOn": datetime.now().isoformat()
+    })
     
-    for domain in DOMAINS:
+    for domain in domains:
         print(f"Generating {QUESTIONS_PER_DOMAIN} {domain} MCQs...")
-        domain_questions = []
         
+        # Save domain-specific questions as they are generated
+        domain_writers = open_writers(args.formats, output_dir, f"{domain_slug(domain)}_mcqs", {
+            "domain": domain,
+            "totalQuestions": None,
+            "categories": DOMAINS[domain]["categories"],
+            "generatedOn": datetime.now().isoformat()
+        })
         for i in range(1, QUESTIONS_PER_DOMAIN + 1):
-            domain_questions.append(generate_question(domain, i))
-            
-        # Save domain-specific questions
-        domain_file = os.path.join(output_dir, f"{domain.lower()}_mcqs.json")
-        with open(domain_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "metadata": {
-                    "domain": domain,
-                    "totalQuestions": len(domain_questions),
-                    "categories": DOMAINS[domain]["categories"],
-                    "generatedOn": datetime.now().isoformat()
-                },
-                "questions": domain_questions
-            }, f, indent=2)
-            
-        all_questions.extend(domain_questions)
-        print(f"✅ Saved {len(domain_questions)} {domain} MCQs to {domain_file}")
+            question = generate_question(domain, i)
+            for writer in domain_writers + combined_writers:
+                writer.write(question)
+        
+        for writer in domain_writers:
+            writer.close()
+        print(f"✅ Saved {domain_writers[0].count} {domain} MCQs to {domain_writers[0].path}")
+    
+    if args.domains:
+        print(f"\n🎉 Generated MCQs for {len(domains)} requested domains")
+        print(f"📁 Individual domain files saved in: {output_dir}")
+        return
     
     # Save all questions to a single file
-    all_questions_file = os.path.join(output_dir, "all_mcqs.json")
-    with open(all_questions_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            "metadata": {
-                "totalQuestions": len(all_questions),
-                "domains": list(DOMAINS.keys()),
-                "generatedOn": datetime.now().isoformat()
-            },
-            "questions": all_questions
-        }, f, indent=2)
+    for writer in combined_writers:
+        writer.close()
     
-    print(f"\n🎉 Generated {len(all_questions)} MCQs in total!")
+    print(f"\n🎉 Generated {combined_writers[0].count} MCQs in total!")
     print(f"📁 Individual domain files saved in: {output_dir}")
-    print(f"📄 Combined file saved as: {all_questions_file}")
+    print(f"📄 Combined file saved as: {combined_writers[0].path}")
 
 if __name__ == "__main__":
     main()
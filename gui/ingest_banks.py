@@ -0,0 +1,359 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import mcq_index  # noqa: F401  (registers the "index" format)
+import mcq_pack  # noqa: F401  (registers the "pack" format)
+import mcq_sqlite  # noqa: F401  (registers the "sqlite" format)
+from domain_registry import REGISTRY, DomainConfigError, domain_slug
+from mcq_writers import BANK_VERSION, WRITERS, BankWriter, open_writers
+
+# Canonical question store (mcqs/question_bank.jsonl)
+#
+# Question banks exist in several shapes: the generated per-domain banks
+# ({"metadata", "questions"} with "PYT0001"-style ids), the hand-written
+# dsa.json / html.json ("dsa-1" ids, no metadata) and
+# syncin_mcq_master_5000.json (integer ids, a "domain" per question, and
+# // comments that no JSON loader accepts). This tool streams every source
+# through a lenient reader, normalizes each question to one schema:
+#
+#   {"id", "domain", "question", "options", "correctAnswer", "explanation",
+#    "category", "difficulty", "tags", "source", "sourceId"}
+#
+# validates it and writes the result through the bank writers. "id" is a
+# global ID derived from the question's content ("python-3fa2b9c01d"), so it
+# is stable across re-ingests and re-orderings; identical questions found in
+# several sources are stored once.
+#
+# Next to the combined store, every domain's questions are also written to
+# store/<domain key>.jsonl ("System Design" -> store/systemdesign.jsonl), so
+# a reader that wants one domain reads only that file. /api/mcqs/[category]
+# serves from these files when MCQ_STORE_DIR points at the store directory;
+# without it the route keeps serving the per-domain banks. The store is a
+# build output and is not committed.
+#
+#   python ingest_banks.py                      # default sources -> mcqs/question_bank.jsonl, mcqs/store/
+#   python ingest_banks.py extra.json --format jsonl pack
+
+GUI_DIR = os.path.dirname(os.path.abspath(__file__))
+MCQS_DIR = os.path.join(GUI_DIR, "mcqs")
+STORE_STEM = "question_bank"
+DOMAIN_STORE_DIR = "store"
+DEFAULT_SOURCES = [os.path.join(GUI_DIR, "syncin_mcq_master_5000.json")]
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+
+# Outputs of this tool and the generators that are not source banks
+_NOT_SOURCES = re.compile(r"^(all_mcqs|question_bank)\.|\.(meta|index)\.json$|^build_manifest\.json$")
+
+
+class IngestError(ValueError):
+    """A source file cannot be parsed, even leniently."""
+
+
+# -- Lenient reading ---------------------------------------------------------
+
+# Strings are matched first so comment markers inside them are left alone.
+_STRING_OR_COMMENT = re.compile(r'"(?:[^"\\\n]|\\.)*"|//[^\n]*|/\*.*?(?:\*/|$)')
+_TRAILING_COMMA = re.compile(r'("(?:[^"\\\n]|\\.)*")|,(\s*[\]}])')
+
+
+def clean_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Strip // and /* */ comments and trailing commas from JSON text, line by line.
+
+    JSON strings cannot span lines, so every line is tokenized on its own;
+    only an open block comment and a comma awaiting its next token carry over.
+    """
+    in_block = False
+    pending_comma = False
+    for line in lines:
+        if in_block:
+            end = line.find("*/")
+            if end < 0:
+                continue
+            line, in_block = line[end + 2:], False
+
+        parts, pos = [], 0
+        for match in _STRING_OR_COMMENT.finditer(line):
+            parts.append(line[pos:match.start()])
+            token = match.group()
+            if token.startswith('"'):
+                parts.append(token)
+            elif token.startswith("/*") and not token.endswith("*/"):
+                in_block = True
+            pos = match.end()
+        if not in_block:
+            parts.append(line[pos:])
+        text = _TRAILING_COMMA.sub(lambda m: m.group(1) or m.group(2), "".join(parts))
+
+        stripped = text.strip()
+        if not stripped:
+            continue
+        if pending_comma and stripped[0] not in "]}":
+            text = "," + text
+        pending_comma = stripped.endswith(",")
+        if pending_comma:
+            text = text[:text.rindex(",")]
+        yield text + "\n"
+
+
+class _Scanner:
+    """Incremental JSON value reader over cleaned lines."""
+
+    def __init__(self, lines: Iterator[str]):
+        self.lines = lines
+        self.buffer = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def _more(self) -> bool:
+        if self.pos > 1 << 16:
+            self.buffer, self.pos = self.buffer[self.pos:], 0
+        chunk = "".join(line for _, line in zip(range(256), self.lines))
+        self.buffer += chunk
+        return bool(chunk)
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._more():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise IngestError(f"expected {char!r}, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as error:
+                if not self._more():
+                    raise IngestError(str(error)) from None
+                continue
+            # A number at the very end of the buffer may continue on the next line
+            if end == len(self.buffer) and self._more():
+                continue
+            self.pos = end
+            return value
+
+
+class LenientBankReader:
+    """Stream the questions of a bank file, tolerating comments and trailing commas.
+
+    Accepts ``{"metadata", "questions": [...]}`` documents (keys in any order,
+    ``metadata`` is filled in as it is read) and bare arrays of questions.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.metadata: Dict[str, Any] = {}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if self.path.endswith(".jsonl"):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            scanner = _Scanner(clean_lines(f))
+            if scanner.peek() == "[":
+                yield from self._array(scanner)
+                return
+            scanner.expect("{")
+            while scanner.peek() != "}":
+                key = scanner.value()
+                scanner.expect(":")
+                if key == "questions":
+                    yield from self._array(scanner)
+                else:
+                    self.metadata[key] = scanner.value()
+                if scanner.peek() == ",":
+                    scanner.pos += 1
+            scanner.expect("}")
+
+    @staticmethod
+    def _array(scanner: _Scanner) -> Iterator[Any]:
+        scanner.expect("[")
+        while scanner.peek() != "]":
+            yield scanner.value()
+            if scanner.peek() == ",":
+                scanner.pos += 1
+        scanner.expect("]")
+
+
+# -- Normalization -----------------------------------------------------------
+
+def source_domain(path: str) -> Optional[str]:
+    """Domain implied by a source's file name ("python_mcqs.json" -> "Python"), if any."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    stem = stem[:-len("_mcqs")] if stem.endswith("_mcqs") else stem
+    try:
+        return REGISTRY.resolve([stem])[0]
+    except DomainConfigError:
+        return None
+
+
+def global_id(question: Dict[str, Any]) -> str:
+    content = json.dumps([question["domain"], question["question"], question["options"], question["correctAnswer"]],
+                         ensure_ascii=False, separators=(',', ':'))
+    return f"{domain_slug(question['domain'])}-{hashlib.sha1(content.encode('utf-8')).hexdigest()[:10]}"
+
+
+def normalize(record: Any, metadata: Dict[str, Any], default_domain: Optional[str], source: str) -> Dict[str, Any]:
+    """Canonical form of a source record; raises ValueError describing the first problem."""
+    if not isinstance(record, dict):
+        raise ValueError("not an object")
+    question, options = record.get("question"), record.get("options")
+    if not isinstance(question, str) or not question.strip():
+        raise ValueError("missing question text")
+    if not isinstance(options, list) or len(options) < 2 or not all(isinstance(o, str) for o in options):
+        raise ValueError("options must be a list of at least two strings")
+    answer = record.get("correctAnswer")
+    if not isinstance(answer, int) or isinstance(answer, bool) or not 0 <= answer < len(options):
+        raise ValueError(f"correctAnswer {answer!r} is not an option index")
+    difficulty = str(record.get("difficulty", "")).capitalize()
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"unknown difficulty {record.get('difficulty')!r}")
+    tags = record.get("tags", [])
+    if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+        raise ValueError("tags must be a list of strings")
+
+    domain = record.get("domain") or metadata.get("domain") or default_domain or record.get("category")
+    if not isinstance(domain, str) or not domain:
+        raise ValueError("cannot tell which domain the question belongs to")
+
+    normalized = {
+        "id": "",
+        "domain": domain,
+        "question": question.strip(),
+        "options": options,
+        "correctAnswer": answer,
+        "explanation": str(record.get("explanation") or ""),
+        "category": str(record.get("category") or domain),
+        "difficulty": difficulty,
+        "tags": tags,
+        "source": source,
+        "sourceId": str(record.get("id", "")),
+    }
+    normalized["id"] = global_id(normalized)
+    return normalized
+
+
+def domain_key(domain: str) -> str:
+    """Per-domain store file name: lowercase letters and digits ("React.js" -> "reactjs")."""
+    return re.sub(r"[^a-z0-9]", "", domain.lower())
+
+
+def discover_sources(directory: str = MCQS_DIR) -> List[str]:
+    """Bank files in ``directory``, preferring .json over a .jsonl of the same stem."""
+    sources: Dict[str, str] = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.json*"))):
+        name = os.path.basename(path)
+        stem, extension = os.path.splitext(name)
+        if extension not in (".json", ".jsonl") or _NOT_SOURCES.search(name):
+            continue
+        if stem not in sources or extension == ".json":
+            sources[stem] = path
+    return list(sources.values())
+
+
+def ingest(sources: List[str], formats: List[str], output_dir: str) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+    metadata = {
+        "name": STORE_STEM,
+        "sources": [os.path.basename(path) for path in sources],
+        "totalQuestions": None,
+        "generatedOn": datetime.now().isoformat(),
+        "version": BANK_VERSION,
+    }
+    seen = set()
+    report: Dict[str, Dict[str, Any]] = {}
+    writers = open_writers(formats, output_dir, STORE_STEM, metadata)
+    domain_dir = os.path.join(output_dir, DOMAIN_STORE_DIR)
+    domain_writers: Dict[str, List[BankWriter]] = {}
+
+    def writers_for(domain: str) -> List[BankWriter]:
+        key = domain_key(domain)
+        if key not in domain_writers:
+            os.makedirs(domain_dir, exist_ok=True)
+            domain_metadata = dict(metadata, name=key, domain=domain, totalQuestions=None)
+            domain_writers[key] = open_writers(["jsonl"], domain_dir, key, domain_metadata)
+        return domain_writers[key]
+
+    try:
+        for path in sources:
+            source = os.path.basename(path)
+            stats = report[source] = {"read": 0, "written": 0, "duplicates": 0, "invalid": []}
+            reader = LenientBankReader(path)
+            default_domain = source_domain(path)
+            try:
+                for position, record in enumerate(reader):
+                    stats["read"] += 1
+                    try:
+                        question = normalize(record, reader.metadata, default_domain, source)
+                    except ValueError as error:
+                        stats["invalid"].append(f"#{position} (id {record.get('id') if isinstance(record, dict) else '?'}): {error}")
+                        continue
+                    if question["id"] in seen:
+                        stats["duplicates"] += 1
+                        continue
+                    seen.add(question["id"])
+                    for writer in writers + writers_for(question["domain"]):
+                        writer.write(question)
+                    stats["written"] += 1
+            except IngestError as error:
+                stats["invalid"].append(f"unreadable after {stats['read']} questions: {error}")
+    finally:
+        paths = [writer.close() for writer in writers]
+        for group in domain_writers.values():
+            for writer in group:
+                writer.close()
+    if domain_writers:
+        paths.append(f"{domain_dir}{os.sep} ({len(domain_writers)} domains)")
+    return paths, report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Merge every question bank into one canonical, validated store.")
+    parser.add_argument("sources", nargs="*",
+                        help="bank files (default: every bank in mcqs/ plus syncin_mcq_master_5000.json)")
+    parser.add_argument("--format", nargs="+", default=["jsonl"], choices=sorted(WRITERS),
+                        help="store format(s) (default: jsonl)")
+    parser.add_argument("--output-dir", default=MCQS_DIR)
+    parser.add_argument("--strict", action="store_true", help="exit non-zero when any question is rejected")
+    args = parser.parse_args(argv)
+
+    sources = args.sources or discover_sources() + DEFAULT_SOURCES
+    os.makedirs(args.output_dir, exist_ok=True)
+    print(f"Ingesting {len(sources)} question banks...")
+    paths, report = ingest(sources, args.format, args.output_dir)
+
+    rejected = 0
+    for source, stats in report.items():
+        rejected += len(stats["invalid"])
+        print(f"📄 {source}: {stats['written']} of {stats['read']} questions stored "
+              f"({stats['duplicates']} duplicates, {len(stats['invalid'])} rejected)")
+        for problem in stats["invalid"][:5]:
+            print(f"   ⚠️  {problem}")
+        if len(stats["invalid"]) > 5:
+            print(f"   ⚠️  ... and {len(stats['invalid']) - 5} more")
+    for path in paths:
+        print(f"✅ Saved canonical store as: {path}")
+    return 1 if args.strict and rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
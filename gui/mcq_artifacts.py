@@ -0,0 +1,152 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+try:
+    import brotli
+except ImportError:  # .br variants are skipped without the brotli package
+    brotli = None
+
+from mcq_writers import load_bank
+
+# Content-addressed, pre-compressed bank artifacts (mcqs/artifacts/)
+#
+# Each published bank becomes a compact JSON payload named after its content
+# hash, next to gzip (and, with the brotli package, brotli) variants:
+#
+#   python_mcqs.3fa2b9c01d4e5f60.json
+#   python_mcqs.3fa2b9c01d4e5f60.json.gz
+#   python_mcqs.3fa2b9c01d4e5f60.json.br
+#
+# Timestamps are left out of the payload and the gzip header (mtime 0, no
+# file name), so the same questions always produce the same bytes and the
+# same names. manifest.json maps every bank to its current files and ETag;
+# /api/mcqs/artifacts/<file> serves them as immutable, long-cached
+# responses. Files replaced by a newer version of a bank are removed.
+#
+#   python mcq_artifacts.py mcqs/python_mcqs.json mcqs/all_mcqs.json
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+HASH_CHARS = 16
+
+# Build-time metadata that would change the payload without changing the bank
+TIMESTAMP_KEYS = ("generatedOn", "lastUpdated")
+
+
+def artifact_stem(bank: str) -> str:
+    name = os.path.basename(bank)
+    for extension in (".jsonl", ".json"):
+        if name.endswith(extension):
+            return name[:-len(extension)]
+    return os.path.splitext(name)[0]
+
+
+def write_payload(bank: str, output_dir: str) -> Dict[str, Any]:
+    """Stream a bank into a compact, timestamp-free payload; returns its hash and size."""
+    metadata, questions = load_bank(bank)
+    metadata = {key: value for key, value in metadata.items() if key not in TIMESTAMP_KEYS}
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(dir=output_dir, delete=False) as f:
+        def emit(text: str) -> None:
+            nonlocal size
+            data = text.encode("utf-8")
+            digest.update(data)
+            f.write(data)
+            size += len(data)
+
+        emit('{"metadata":' + json.dumps(metadata, ensure_ascii=False, separators=(',', ':')) + ',"questions":[')
+        for i, question in enumerate(questions):
+            emit(("," if i else "") + json.dumps(question, ensure_ascii=False, separators=(',', ':')))
+        emit("]}")
+    return {"temp": f.name, "sha256": digest.hexdigest(), "size": size, "domain": metadata.get("domain")}
+
+
+def compress(path: str, encoding: str) -> bytes:
+    with open(path, 'rb') as f:
+        data = f.read()
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+
+def publish(banks: List[str], output_dir: str) -> Dict[str, Any]:
+    """Publish ``banks`` into ``output_dir`` and update its manifest (other entries are kept)."""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    entries: Dict[str, Any] = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f).get("artifacts", {})
+
+    encodings = {"gzip": ".gz"}
+    if brotli is not None:
+        encodings["br"] = ".br"
+
+    for bank in banks:
+        stem = artifact_stem(bank)
+        payload = write_payload(bank, output_dir)
+        name = f"{stem}.{payload['sha256'][:HASH_CHARS]}.json"
+        path = os.path.join(output_dir, name)
+        if os.path.exists(path):
+            os.remove(payload["temp"])
+        else:
+            os.chmod(payload["temp"], 0o644)  # NamedTemporaryFile creates files readable by the owner only
+            os.replace(payload["temp"], path)
+
+        variants = {}
+        for encoding, suffix in encodings.items():
+            variant = path + suffix
+            if not os.path.exists(variant):
+                data = compress(path, encoding)
+                with open(variant + ".tmp", 'wb') as f:
+                    f.write(data)
+                os.replace(variant + ".tmp", variant)
+            variants[encoding] = {"file": name + suffix, "size": os.path.getsize(variant)}
+
+        previous = entries.get(stem)
+        entries[stem] = {
+            "domain": payload["domain"],
+            "file": name,
+            "etag": f'"{payload["sha256"]}"',
+            "size": payload["size"],
+            "encodings": variants,
+        }
+        if previous and previous["file"] != name:
+            for old in [previous["file"]] + [v["file"] for v in previous.get("encodings", {}).values()]:
+                old_path = os.path.join(output_dir, old)
+                if os.path.exists(old_path):
+                    os.remove(old_path)
+
+    manifest = {"version": MANIFEST_VERSION, "artifacts": dict(sorted(entries.items()))}
+    with open(manifest_path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Publish banks as content-addressed, pre-compressed artifacts.")
+    parser.add_argument("banks", nargs="+", help=".json or .jsonl banks")
+    parser.add_argument("--output-dir",
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcqs", "artifacts"))
+    args = parser.parse_args(argv)
+
+    if brotli is None:
+        print("⚠️  brotli is not installed; publishing gzip variants only (pip install brotli)")
+    manifest = publish(args.banks, args.output_dir)
+    for bank in args.banks:
+        entry = manifest["artifacts"][artifact_stem(bank)]
+        sizes = ", ".join(f"{encoding} {variant['size']:,}" for encoding, variant in entry["encodings"].items())
+        print(f"✅ {entry['file']} ({entry['size']:,} bytes; {sizes})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
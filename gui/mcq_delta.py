@@ -0,0 +1,444 @@
+import argparse
+import bisect
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ingest_banks import LenientBankReader
+from mcq_writers import WRITERS, load_bank
+
+# Delta bundles between question-bank releases
+#
+# diff compares two versions of a bank record by record, keyed by question id
+# (a repeated id gets an occurrence suffix, "JAV0001#2", since Java and
+# JavaScript share a prefix in all_mcqs), using a hash of each record's
+# content. Only what changed goes into the bundle, a gzipped JSON-lines file:
+#
+#   {"format": "mcq-delta", "bank", "from": {version, sha256, count},
+#    "to": {version, sha256, count}, "metadata", "stats"}    header
+#   {"op": "remove", "key"}
+#   {"op": "modify", "key", "set": {field: value}, "unset": [field]}
+#   {"op": "replace", "key", "record"}         field patch would reorder keys
+#   {"op": "add", "key", "after", "record"}    after: preceding key, or null
+#
+# Records present in both banks keep their relative order; diff keeps the
+# longest run of them already in old order and re-sends any other shared
+# record as remove + add, so a moved record costs one of each.
+#
+# Occurrence keys depend on order. Removing the first of a repeated id (say
+# Java's JAV0001) makes JavaScript's "JAV0001#2" the new "JAV0001", so it is
+# diffed against the Java record, and every later occurrence of that id
+# shifts the same way: one removal can show up as a chain of modify ops. The
+# bundle still applies exactly; it is just larger than the change.
+#
+# Versions chain: a bundle takes a bank from OLD's metadata "version" to
+# --version, else NEW's version when it differs, else OLD's version bumped
+# (1.0.0 -> 1.0.1). Generate each release with its own version
+# (generate_mcqs_complete.py --version 1.0.1) so the next diff starts where
+# this one ends; diff --stamp instead writes the bundle's version into NEW
+# in place. diff does not modify either bank otherwise. apply refuses a
+# bundle whose "from" version does not match the bank, streams the bank
+# through one or more bundles into the bank writers, holding only the
+# bundles in memory, and checks the sha256 of the questions before and after
+# each step; the bank is replaced, with the bundle's version, only if every
+# check passes.
+#
+#   python generate_mcqs_complete.py --domains python --version 1.0.1
+#   python mcq_delta.py diff old/python_mcqs.json mcqs/python_mcqs.json
+#   python mcq_delta.py apply client/python_mcqs.json deltas/python_mcqs.1.0.0-1.0.1.delta.jsonl.gz
+#   python mcq_delta.py show deltas/python_mcqs.1.0.0-1.0.1.delta.jsonl.gz
+
+DELTA_FORMAT = "mcq-delta"
+DELTA_VERSION = 1
+DELTA_EXTENSION = ".delta.jsonl.gz"
+
+
+class DeltaError(ValueError):
+    """A bundle does not fit the bank it is applied to."""
+
+
+def bank_stem(path: str) -> str:
+    name = os.path.basename(path)
+    for extension in (".jsonl", ".json"):
+        if name.endswith(extension):
+            return name[:-len(extension)]
+    return os.path.splitext(name)[0]
+
+
+class BankStream:
+    """Questions of a .json or .jsonl bank, read incrementally; ``metadata`` is complete once iterated."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._metadata: Dict[str, Any] = {}
+        self._reader: Optional[LenientBankReader] = None
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if self._reader is not None:
+            # The reader collects the document's top-level keys as it reaches them
+            return self._reader.metadata.get("metadata", {})
+        return self._metadata
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if self.path.endswith(".jsonl"):
+            self._metadata, questions = load_bank(self.path)
+            return questions
+        self._reader = LenientBankReader(self.path)
+        return iter(self._reader)
+
+
+def canonical(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+
+
+def keyed(records: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """``(key, record)`` pairs: the id, with "#n" on its n-th occurrence."""
+    seen: Dict[str, int] = {}
+    for record in records:
+        question_id = str(record.get("id"))
+        n = seen[question_id] = seen.get(question_id, 0) + 1
+        yield (question_id if n == 1 else f"{question_id}#{n}"), record
+
+
+def next_version(version: Optional[str]) -> str:
+    """Bump the last numeric component: "1.0.0" -> "1.0.1"."""
+    parts = str(version or "0").split(".")
+    if not parts[-1].isdigit():
+        parts.append("0")
+    parts[-1] = str(int(parts[-1]) + 1)
+    return ".".join(parts)
+
+
+def field_patch(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """modify op turning ``old`` into ``new``, or a replace op when a field patch would change key order."""
+    changed = {field: value for field, value in new.items() if field not in old or old[field] != value}
+    removed = [field for field in old if field not in new]
+    patched = {**{k: v for k, v in old.items() if k not in removed}, **changed}
+    if list(patched) != list(new):
+        return {"op": "replace", "record": new}
+    op: Dict[str, Any] = {"op": "modify", "set": changed}
+    if removed:
+        op["unset"] = removed
+    return op
+
+
+def longest_increasing(values: List[int]) -> List[int]:
+    """Indices of a longest strictly increasing subsequence of ``values`` (patience sorting, O(n log n))."""
+    tails: List[int] = []  # tails[k]: index ending the best run of length k + 1
+    tail_values: List[int] = []
+    previous: List[int] = [-1] * len(values)
+    for i, value in enumerate(values):
+        k = bisect.bisect_left(tail_values, value)
+        if k:
+            previous[i] = tails[k - 1]
+        if k == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[k] = i
+            tail_values[k] = value
+    run: List[int] = []
+    i = tails[-1] if tails else -1
+    while i >= 0:
+        run.append(i)
+        i = previous[i]
+    run.reverse()
+    return run
+
+
+def diff(old_path: str, new_path: str, version: Optional[str] = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """``(header, ops)`` of the bundle taking the bank at ``old_path`` to the one at ``new_path``."""
+    # Pass 1: where every old record is and what it hashes to
+    old_bank = BankStream(old_path)
+    old_index: Dict[str, Tuple[int, bytes]] = {}
+    old_digest = hashlib.sha256()
+    for position, (key, record) in enumerate(keyed(old_bank)):
+        line = canonical(record)
+        old_digest.update(line + b"\n")
+        old_index[key] = (position, hashlib.sha1(line).digest())
+
+    # Pass 2: where every new record was in the old bank and whether it changed
+    new_bank = BankStream(new_path)
+    new_digest = hashlib.sha256()
+    matches: List[Tuple[str, int, bool]] = []
+    count = 0
+    for key, record in keyed(new_bank):
+        count += 1
+        line = canonical(record)
+        new_digest.update(line + b"\n")
+        match = old_index.get(key)
+        if match is not None:
+            matches.append((key, match[0], match[1] != hashlib.sha1(line).digest()))
+
+    # Records shared with the old bank keep their relative order. The largest
+    # such set is the longest increasing run of old positions; anything outside
+    # it really moved and is re-sent as remove + add.
+    kept = {matches[i][0] for i in longest_increasing([position for _, position, _ in matches])}
+    changed = {key for key, _, differs in matches if differs and key in kept}
+
+    # Pass 3: the added records with their anchors, and the new versions of modified ones
+    adds: List[Dict[str, Any]] = []
+    modified: Dict[str, Dict[str, Any]] = {}
+    previous: Optional[str] = None
+    for key, record in keyed(BankStream(new_path)):
+        if key not in kept:
+            adds.append({"op": "add", "key": key, "after": previous, "record": record})
+        elif key in changed:
+            modified[key] = record
+        previous = key
+
+    # Pass 4, only when something changed in place: the old versions of modified records
+    ops: List[Dict[str, Any]] = [{"op": "remove", "key": key} for key in old_index if key not in kept]
+    if modified:
+        for key, record in keyed(BankStream(old_path)):
+            if key in modified:
+                ops.append({"key": key, **field_patch(record, modified[key])})
+    ops.extend(adds)
+
+    from_version = old_bank.metadata.get("version")
+    if version is None:
+        new_version = new_bank.metadata.get("version")
+        version = new_version if new_version is not None and new_version != from_version else next_version(from_version)
+    header = {
+        "format": DELTA_FORMAT,
+        "formatVersion": DELTA_VERSION,
+        "bank": bank_stem(new_path),
+        "from": {"version": from_version, "sha256": old_digest.hexdigest(), "count": len(old_index)},
+        "to": {"version": version, "sha256": new_digest.hexdigest(), "count": count},
+        "metadata": new_bank.metadata,
+        "stats": {
+            "added": len(adds),
+            "removed": len(old_index) - len(kept),
+            "modified": len(modified),
+            "unchanged": len(kept) - len(modified),
+        },
+    }
+    return header, ops
+
+
+def write_bundle(path: str, header: Dict[str, Any], ops: List[Dict[str, Any]]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # mtime 0 keeps the bundle's bytes a function of its content
+    with open(path + ".tmp", 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0, filename="") as f:
+        for entry in [header, *ops]:
+            f.write(canonical(entry) + b"\n")
+    os.replace(path + ".tmp", path)
+
+
+def read_bundle(path: str) -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]:
+    def lines() -> Iterator[Dict[str, Any]]:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            next(f)
+            for line in f:
+                yield json.loads(line)
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+    if header.get("format") != DELTA_FORMAT or header.get("formatVersion") != DELTA_VERSION:
+        raise DeltaError(f"{path} is not a version {DELTA_VERSION} {DELTA_FORMAT} bundle")
+    return header, lines()
+
+
+class Patch:
+    """One bundle applied to a stream of records; check() verifies both ends once the stream is consumed."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.header, ops = read_bundle(path)
+        self.removed: Set[str] = set()
+        self.changes: Dict[str, Dict[str, Any]] = {}
+        self.adds: Dict[Optional[str], List[Tuple[str, Dict[str, Any]]]] = {}
+        for op in ops:
+            if op["op"] == "remove":
+                self.removed.add(op["key"])
+            elif op["op"] == "add":
+                self.adds.setdefault(op["after"], []).append((op["key"], op["record"]))
+            else:
+                self.changes[op["key"]] = op
+        self.input_digest = hashlib.sha256()
+        self.output_digest = hashlib.sha256()
+        self.input_count = self.output_count = 0
+
+    def _emit(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        self.output_digest.update(canonical(record) + b"\n")
+        self.output_count += 1
+        return record
+
+    def _added_after(self, key: Optional[str]) -> Iterator[Dict[str, Any]]:
+        # Each added record is anchored to the one before it, which may itself be
+        # added; walk the chain with a stack, since appended runs can be long
+        pending = [iter(self.adds.get(key, ()))]
+        while pending:
+            entry = next(pending[-1], None)
+            if entry is None:
+                pending.pop()
+                continue
+            added_key, record = entry
+            yield self._emit(record)
+            pending.append(iter(self.adds.get(added_key, ())))
+
+    def apply(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        yield from self._added_after(None)
+        for key, record in keyed(records):
+            self.input_digest.update(canonical(record) + b"\n")
+            self.input_count += 1
+            if key in self.removed:
+                continue
+            change = self.changes.get(key)
+            if change is not None:
+                if change["op"] == "replace":
+                    record = change["record"]
+                else:
+                    record = {k: v for k, v in record.items() if k not in change.get("unset", ())}
+                    record.update(change["set"])
+            yield self._emit(record)
+            yield from self._added_after(key)
+
+    def check(self) -> None:
+        source, target = self.header["from"], self.header["to"]
+        if self.input_digest.hexdigest() != source["sha256"] or self.input_count != source["count"]:
+            raise DeltaError(f"{os.path.basename(self.path)}: the bank's questions are not version {source['version']}")
+        if self.output_digest.hexdigest() != target["sha256"] or self.output_count != target["count"]:
+            raise DeltaError(f"{os.path.basename(self.path)}: patched questions do not match version {target['version']}")
+
+
+def chain(bundles: List[str], version: Optional[str]) -> List[str]:
+    """Order ``bundles`` into the chain starting at ``version``."""
+    by_version = {}
+    for path in bundles:
+        header, _ = read_bundle(path)
+        by_version[header["from"]["version"]] = path
+    ordered = []
+    while by_version:
+        if version not in by_version:
+            raise DeltaError(f"No bundle starts at version {version} "
+                             f"(bundles start at: {', '.join(map(str, by_version))})")
+        path = by_version.pop(version)
+        ordered.append(path)
+        version = read_bundle(path)[0]["to"]["version"]
+    return ordered
+
+
+def rewrite(bank: str, records: Iterable[Dict[str, Any]], metadata: Dict[str, Any], output: str,
+            checks: Iterable[Patch] = ()) -> None:
+    """Write ``records`` as the bank at ``output`` (which may be ``bank`` itself) once ``checks`` pass."""
+    writer_class = next((writer for writer in WRITERS.values()
+                         if writer.extension and output.endswith(writer.extension)), None)
+    if writer_class is None:
+        raise DeltaError(f"Unknown bank format: {output}")
+
+    output_dir = os.path.dirname(os.path.abspath(output))
+    staging = tempfile.mkdtemp(dir=output_dir, prefix=".delta-")
+    try:
+        with writer_class(staging, bank_stem(output), metadata) as writer:
+            for record in records:
+                writer.write(record)
+        for patch in checks:
+            patch.check()
+        for path in writer_class.output_files(staging, bank_stem(output)):
+            if os.path.exists(path):
+                os.replace(path, os.path.join(output_dir, os.path.basename(path)))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def apply(bank: str, bundles: List[str], output: Optional[str] = None) -> Dict[str, Any]:
+    """Stream ``bank`` through the chain of ``bundles`` into ``output`` (default: in place); returns the last header."""
+    patches = [Patch(path) for path in chain(bundles, bank_version(bank))]
+    records: Iterable[Dict[str, Any]] = BankStream(bank)
+    for patch in patches:
+        records = patch.apply(records)
+    target = patches[-1].header
+    rewrite(bank, records, {**target["metadata"], "version": target["to"]["version"]}, output or bank, patches)
+    return target
+
+
+def stamp(bank: str, version: str) -> None:
+    """Set a bank's metadata version, so the next bundle chains from it."""
+    source = BankStream(bank)
+    records = iter(source)
+    first = next(records, None)  # metadata precedes the questions
+    head = [first] if first is not None else []
+    rewrite(bank, itertools.chain(head, records), {**source.metadata, "version": version}, bank)
+
+
+def bank_version(path: str) -> Optional[str]:
+    """A bank's metadata version, read without parsing its questions."""
+    source = BankStream(path)
+    next(iter(source), None)  # generated banks put metadata before the questions
+    return source.metadata.get("version")
+
+
+def default_bundle_path(new_bank: str, header: Dict[str, Any]) -> str:
+    directory = os.path.join(os.path.dirname(os.path.abspath(new_bank)), "deltas")
+    return os.path.join(directory, f"{header['bank']}.{header['from']['version']}-{header['to']['version']}"
+                                   f"{DELTA_EXTENSION}")
+
+
+def describe(header: Dict[str, Any]) -> str:
+    stats = header["stats"]
+    return (f"{header['bank']} {header['from']['version']} -> {header['to']['version']}: "
+            f"+{stats['added']} -{stats['removed']} ~{stats['modified']} ({stats['unchanged']} unchanged)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Diff and patch question banks with versioned delta bundles.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    diff_parser = commands.add_parser("diff", help="write the bundle taking OLD to NEW")
+    diff_parser.add_argument("old")
+    diff_parser.add_argument("new")
+    diff_parser.add_argument("--output", help=f"bundle path (default: deltas/<bank>.<from>-<to>{DELTA_EXTENSION} "
+                                              "next to NEW)")
+    diff_parser.add_argument("--version", help="version the bundle produces (default: NEW's version if it differs "
+                                               "from OLD's, else OLD's version bumped)")
+    diff_parser.add_argument("--stamp", action="store_true",
+                             help="also rewrite NEW in place with the bundle's version, so the next bundle chains "
+                                  "from it")
+
+    apply_parser = commands.add_parser("apply", help="patch a bank with one or more chained bundles")
+    apply_parser.add_argument("bank")
+    apply_parser.add_argument("bundles", nargs="+", help="bundles in any order; they are chained by version")
+    apply_parser.add_argument("--output", help="patched bank path (default: replace BANK)")
+
+    show_parser = commands.add_parser("show", help="print a bundle's header")
+    show_parser.add_argument("bundle")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "diff":
+            header, ops = diff(args.old, args.new, args.version)
+            path = args.output or default_bundle_path(args.new, header)
+            write_bundle(path, header, ops)
+            to_version = header["to"]["version"]
+            if args.stamp:
+                stamp(args.new, to_version)
+            print(f"✅ {describe(header)}")
+            print(f"📦 Saved {path} ({os.path.getsize(path):,} bytes; {os.path.getsize(args.new):,} bytes in full)")
+            new_version = header["metadata"].get("version")
+            if not args.stamp and new_version != to_version:
+                print(f"⚠️  {args.new} still says version {new_version}; a bundle diffed from it will not chain "
+                      f"after {to_version} (regenerate it with --version {to_version} or use --stamp)")
+        elif args.command == "apply":
+            header = apply(args.bank, args.bundles, args.output)
+            print(f"✅ Patched {args.output or args.bank} to version {header['to']['version']} "
+                  f"({header['to']['count']} questions)")
+        else:
+            header, _ = read_bundle(args.bundle)
+            print(describe(header))
+            print(json.dumps({key: header[key] for key in ("from", "to", "stats")}, indent=2))
+    except DeltaError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from mcq_writers import BankWriter, load_bank, register_writer
+
+# Filter indexes for question banks (<stem>.index.json)
+#
+# Posting lists map each category, difficulty and tag to the sorted positions
+# of the questions carrying it. Positions are record numbers: the index into
+# the JSON "questions" array, the line number in the .jsonl file and the
+# record number in the .mcqpack file. Category x difficulty is precomputed
+# because it is the most common quiz filter; any other combination is an
+# intersection of small sorted integer lists.
+
+COMBINED_KEY = "category+difficulty"
+
+
+def combined_term(category: str, difficulty: str) -> str:
+    return f"{category}|{difficulty}"
+
+
+class IndexWriter(BankWriter):
+    """Build posting lists while questions stream past."""
+
+    extension = ".index.json"
+
+    def __init__(self, output_dir: str, stem: str, metadata: Dict[str, Any]):
+        super().__init__(output_dir, stem, metadata)
+        self.postings: Dict[str, Dict[str, List[int]]] = {
+            "category": defaultdict(list),
+            "difficulty": defaultdict(list),
+            "tag": defaultdict(list),
+            COMBINED_KEY: defaultdict(list),
+        }
+        self._closed = False
+
+    def write(self, question: Dict[str, Any]) -> None:
+        position = self.count
+        category = question.get("category")
+        difficulty = question.get("difficulty")
+        if category is not None:
+            self.postings["category"][category].append(position)
+        if difficulty is not None:
+            self.postings["difficulty"][difficulty].append(position)
+        if category is not None and difficulty is not None:
+            self.postings[COMBINED_KEY][combined_term(category, difficulty)].append(position)
+        # A question can carry the same tag twice (e.g. the category tag); post it once
+        for tag in dict.fromkeys(question.get("tags") or ()):
+            self.postings["tag"][tag].append(position)
+        self.count += 1
+
+    def close(self) -> str:
+        if self._closed:
+            return self.path
+        self._closed = True
+        self.metadata["totalQuestions"] = self.count
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "metadata": self.metadata,
+                "positions": "record",
+                "postings": {field: dict(sorted(terms.items())) for field, terms in self.postings.items()},
+            }, f, ensure_ascii=False, separators=(',', ':'))
+        return self.path
+
+    @classmethod
+    def combine(cls, output_dir: str, stem: str, metadata: Dict[str, Any], parts: List[str]) -> str:
+        """Merge per-bank indexes, shifting each part's positions past the previous parts."""
+        writer = cls(output_dir, stem, metadata)
+        for part in parts:
+            index = load_index(part)
+            for field, terms in index["postings"].items():
+                merged = writer.postings.setdefault(field, defaultdict(list))
+                for term, positions in terms.items():
+                    merged[term].extend(position + writer.count for position in positions)
+            writer.count += index["metadata"]["totalQuestions"]
+        return writer.close()
+
+
+register_writer("index", IndexWriter)
+
+
+def load_index(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def intersect(*lists: List[int]) -> List[int]:
+    """Intersect sorted posting lists, probing the shortest list against the others."""
+    if not lists:
+        return []
+    ordered = sorted(lists, key=len)
+    result = ordered[0]
+    for other in ordered[1:]:
+        members = set(other)
+        result = [position for position in result if position in members]
+        if not result:
+            break
+    return result
+
+
+def select(index: Dict[str, Any], category: Optional[str] = None, difficulty: Optional[str] = None,
+           tags: Optional[List[str]] = None) -> List[int]:
+    """Return the positions of questions matching every given filter."""
+    postings = index["postings"]
+    lists = []
+    if category is not None and difficulty is not None:
+        lists.append(postings[COMBINED_KEY].get(combined_term(category, difficulty), []))
+    elif category is not None:
+        lists.append(postings["category"].get(category, []))
+    elif difficulty is not None:
+        lists.append(postings["difficulty"].get(difficulty, []))
+    for tag in tags or ():
+        lists.append(postings["tag"].get(tag, []))
+
+    if not lists:
+        return list(range(index["metadata"]["totalQuestions"]))
+    return intersect(*lists)
+
+
+def build_index(source: str, output_dir: Optional[str] = None) -> str:
+    """Write <stem>.index.json for an existing .json/.jsonl bank."""
+    metadata, questions = load_bank(source)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    with IndexWriter(output_dir or os.path.dirname(os.path.abspath(source)), stem, metadata) as writer:
+        for question in questions:
+            writer.write(question)
+    return writer.path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build and query MCQ filter indexes.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="index existing .json/.jsonl banks")
+    build.add_argument("sources", nargs="+")
+
+    query = commands.add_parser("query", help="list question positions matching the filters")
+    query.add_argument("index")
+    query.add_argument("--category")
+    query.add_argument("--difficulty")
+    query.add_argument("--tag", action="append", dest="tags")
+    query.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        for source in args.sources:
+            print(f"✅ Indexed {source} -> {build_index(source)}")
+    else:
+        positions = select(load_index(args.index), args.category, args.difficulty, args.tags)
+        print(json.dumps({"matches": len(positions), "positions": positions[:args.limit]}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
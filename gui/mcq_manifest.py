@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+# Build manifest for incremental regeneration (mcqs/build_manifest.json)
+#
+# Each output bank (keyed by file stem, e.g. "python_mcqs") records a
+# fingerprint of everything that determines its content plus the size,
+# mtime and sha256 of every file it produced. A bank whose fingerprint is
+# unchanged and whose files are all still on disk as written does not need
+# to be rebuilt. The hash is only re-read when a file's mtime moved, so an
+# untouched build costs one stat per file.
+
+MANIFEST_FILE = "build_manifest.json"
+
+
+def fingerprint(inputs: Any) -> str:
+    """Stable hash of JSON-serializable build inputs."""
+    canonical = json.dumps(inputs, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_FILE)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get("entries", {})
+
+    def get(self, stem: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(stem)
+
+    def is_current(self, stem: str, digest: str) -> bool:
+        entry = self.entries.get(stem)
+        if not entry or entry["fingerprint"] != digest:
+            return False
+        if not isinstance(entry["files"], dict):  # older manifests listed names only
+            return False
+        return all(self._unchanged(name, recorded) for name, recorded in entry["files"].items())
+
+    def _unchanged(self, name: str, recorded: Dict[str, Any]) -> bool:
+        """Whether an output file is still the one recorded, not rewritten, truncated or partly written."""
+        try:
+            stat = os.stat(os.path.join(self.output_dir, name))
+        except OSError:
+            return False
+        if stat.st_size != recorded["size"]:
+            return False
+        return stat.st_mtime_ns == recorded["mtimeNs"] or file_sha256(os.path.join(self.output_dir, name)) == recorded["sha256"]
+
+    def record(self, stem: str, digest: str, files: List[str], **details: Any) -> None:
+        recorded = {}
+        for path in files:
+            stat = os.stat(path)
+            recorded[os.path.basename(path)] = {"size": stat.st_size, "mtimeNs": stat.st_mtime_ns,
+                                                "sha256": file_sha256(path)}
+        self.entries[stem] = {
+            "fingerprint": digest,
+            "files": recorded,
+            **details,
+        }
+
+    def save(self) -> None:
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({"entries": dict(sorted(self.entries.items()))}, f, indent=2)
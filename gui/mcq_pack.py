@@ -0,0 +1,326 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from mcq_writers import BankWriter, load_bank, register_writer
+
+# Packed question bank (.mcqpack)
+#
+# A compact, memory-mappable alternative to the JSON banks. All strings
+# (ids, question text, options, categories, tags...) are interned into one
+# string table, every question is a fixed-width record of string indices, and
+# an open-addressing hash table maps question IDs to record numbers. Reading
+# question N is a single seek; reading a question by ID is a hash probe.
+#
+# Layout (little-endian):
+#   header    HEADER struct, see below
+#   metadata  JSON bytes (the bank's metadata block)
+#   strings   (string_count + 1) u32 offsets into the blob, then the UTF-8 blob
+#   records   record_count fixed-width records
+#   index     index_slots u32 entries holding record number + 1 (0 = empty)
+
+MAGIC = b"MCQP"
+FORMAT_VERSION = 1
+MAX_OPTIONS = 8
+MAX_TAGS = 8
+NONE = 0xFFFFFFFF  # string index used for missing fields
+
+# magic, format version, option slots, tag slots, record count, string count,
+# index slots, then offsets of metadata, strings, records and index plus the
+# metadata length.
+HEADER = struct.Struct("<4sHBBIIIQQQQI")
+
+# Record flags
+ID_IS_INT = 1
+HAS_TAGS = 2
+
+PACKED_FIELDS = ("id", "question", "options", "correctAnswer", "explanation", "category", "difficulty", "tags")
+
+
+def record_struct(option_slots: int = MAX_OPTIONS, tag_slots: int = MAX_TAGS) -> struct.Struct:
+    # id, question, explanation, category, difficulty, correctAnswer,
+    # option count, tag count, flags, option slots, tag slots
+    return struct.Struct(f"<5IBBBB{option_slots}I{tag_slots}I")
+
+
+def id_hash(question_id: Any) -> int:
+    return zlib.crc32(str(question_id).encode("utf-8"))
+
+
+class PackWriter(BankWriter):
+    """Stream questions into a .mcqpack file.
+
+    Records are spooled to a temporary file as they arrive; only the interned
+    strings and one hash per question stay in memory until close().
+    """
+
+    extension = ".mcqpack"
+
+    def __init__(self, output_dir: str, stem: str, metadata: Dict[str, Any]):
+        super().__init__(output_dir, stem, metadata)
+        self.record = record_struct()
+        self.strings: Dict[str, int] = {}
+        self.id_hashes = array("I")
+        self._records = tempfile.TemporaryFile(dir=output_dir)
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def write(self, question: Dict[str, Any]) -> None:
+        options = question["options"]
+        tags = question.get("tags")
+        if len(options) > MAX_OPTIONS or len(tags or ()) > MAX_TAGS:
+            raise ValueError(f"Question {question['id']} has more than {MAX_OPTIONS} options or {MAX_TAGS} tags")
+
+        flags = (ID_IS_INT if isinstance(question["id"], int) else 0) | (HAS_TAGS if tags is not None else 0)
+        option_slots = [self.intern(option) for option in options] + [NONE] * (MAX_OPTIONS - len(options))
+        tag_slots = [self.intern(tag) for tag in tags or ()] + [NONE] * (MAX_TAGS - len(tags or ()))
+        self._records.write(self.record.pack(
+            self.intern(str(question["id"])),
+            self.intern(question["question"]),
+            self.intern(question.get("explanation")),
+            self.intern(question.get("category")),
+            self.intern(question.get("difficulty")),
+            question["correctAnswer"],
+            len(options),
+            len(tags or ()),
+            flags,
+            *option_slots,
+            *tag_slots,
+        ))
+        self.id_hashes.append(id_hash(question["id"]))
+        self.count += 1
+
+    def close(self) -> str:
+        if self._records.closed:
+            return self.path
+        self.metadata["totalQuestions"] = self.count
+
+        metadata_bytes = json.dumps(self.metadata, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+        blob = bytearray()
+        offsets = array("I", [0])
+        for value in self.strings:
+            blob += value.encode("utf-8")
+            offsets.append(len(blob))
+
+        index_slots = 1
+        while index_slots < 2 * max(self.count, 1):
+            index_slots *= 2
+        index = array("I", bytes(4 * index_slots))
+        for record_no, value in enumerate(self.id_hashes):
+            slot = value & (index_slots - 1)
+            while index[slot]:
+                slot = (slot + 1) & (index_slots - 1)
+            index[slot] = record_no + 1
+
+        metadata_offset = HEADER.size
+        strings_offset = metadata_offset + len(metadata_bytes)
+        records_offset = strings_offset + 4 * len(offsets) + len(blob)
+        index_offset = records_offset + self.count * self.record.size
+
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(
+                MAGIC, FORMAT_VERSION, MAX_OPTIONS, MAX_TAGS, self.count, len(self.strings), index_slots,
+                metadata_offset, strings_offset, records_offset, index_offset, len(metadata_bytes),
+            ))
+            f.write(metadata_bytes)
+            f.write(offsets.tobytes())
+            f.write(blob)
+            self._records.seek(0)
+            while True:
+                chunk = self._records.read(1 << 20)
+                if not chunk:
+                    break
+                f.write(chunk)
+            f.write(index.tobytes())
+
+        self._records.close()
+        return self.path
+
+    @classmethod
+    def read(cls, path: str) -> Iterator[Dict[str, Any]]:
+        with PackReader(path) as reader:
+            yield from reader
+
+
+class PackReader:
+    """Random access to a .mcqpack file through a read-only memory map."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, option_slots, tag_slots, self.count, string_count, self.index_slots,
+         metadata_offset, strings_offset, self.records_offset, self.index_offset,
+         metadata_length) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} .mcqpack file")
+
+        self.record = record_struct(option_slots, tag_slots)
+        self.option_slots = option_slots
+        self.metadata = json.loads(self._map[metadata_offset:metadata_offset + metadata_length])
+        self._view = memoryview(self._map)
+        self._offsets = self._view[strings_offset:strings_offset + 4 * (string_count + 1)].cast("I")
+        self._blob_offset = strings_offset + 4 * (string_count + 1)
+
+    def string(self, index: int) -> Optional[str]:
+        if index == NONE:
+            return None
+        start = self._blob_offset + self._offsets[index]
+        end = self._blob_offset + self._offsets[index + 1]
+        return self._map[start:end].decode("utf-8")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, record_no: int) -> Dict[str, Any]:
+        if not 0 <= record_no < self.count:
+            raise IndexError(record_no)
+        fields = self.record.unpack_from(self._map, self.records_offset + record_no * self.record.size)
+        id_index, question, explanation, category, difficulty, correct, n_options, n_tags, flags = fields[:9]
+        options = fields[9:9 + n_options]
+        tags = fields[9 + self.option_slots:9 + self.option_slots + n_tags]
+
+        question_id = self.string(id_index)
+        result = {
+            "id": int(question_id) if flags & ID_IS_INT else question_id,
+            "question": self.string(question),
+            "options": [self.string(option) for option in options],
+            "correctAnswer": correct,
+            "explanation": self.string(explanation),
+            "category": self.string(category),
+            "difficulty": self.string(difficulty),
+            "tags": [self.string(tag) for tag in tags] if flags & HAS_TAGS else None,
+        }
+        return {key: value for key, value in result.items() if value is not None}
+
+    def get(self, question_id: Any) -> Optional[Dict[str, Any]]:
+        """Look a question up by ID through the hash index."""
+        mask = self.index_slots - 1
+        slot = id_hash(question_id) & mask
+        while True:
+            (entry,) = struct.unpack_from("<I", self._map, self.index_offset + 4 * slot)
+            if not entry:
+                return None
+            question = self[entry - 1]
+            if str(question["id"]) == str(question_id):
+                return question
+            slot = (slot + 1) & mask
+
+    def page(self, start: int, count: int) -> List[Dict[str, Any]]:
+        return [self[i] for i in range(start, min(start + count, self.count))]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self[i] for i in range(self.count))
+
+    def close(self) -> None:
+        self._offsets.release()
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+register_writer("pack", PackWriter)
+
+
+def pack_bank(source: str, output_dir: Optional[str] = None) -> str:
+    """Convert a .json/.jsonl bank into a .mcqpack next to it."""
+    metadata, questions = load_bank(source)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    with PackWriter(output_dir or os.path.dirname(os.path.abspath(source)), stem, metadata) as writer:
+        for question in questions:
+            writer.write(question)
+    return writer.path
+
+
+def verify(pack_path: str, source: str) -> Tuple[List[str], List[Any]]:
+    """Compare a pack against its JSON/JSONL source.
+
+    Returns ``(problems, duplicate_ids)``. An ID lookup resolves to the first
+    record with that ID, so lookups are only checked for first occurrences and
+    repeated IDs are reported separately.
+    """
+    problems = []
+    seen = set()
+    duplicates = []
+    _, questions = load_bank(source)
+    with PackReader(pack_path) as reader:
+        count = 0
+        for record_no, expected in enumerate(questions):
+            expected = {key: expected[key] for key in PACKED_FIELDS if key in expected}
+            count += 1
+            if record_no >= len(reader):
+                problems.append(f"record {record_no} ({expected['id']}) missing from pack")
+                continue
+            if reader[record_no] != expected:
+                problems.append(f"record {record_no} ({expected['id']}) differs")
+            if expected["id"] in seen:
+                duplicates.append(expected["id"])
+                continue
+            seen.add(expected["id"])
+            if reader.get(expected["id"]) != expected:
+                problems.append(f"id lookup for {expected['id']} failed")
+        if count != len(reader):
+            problems.append(f"pack holds {len(reader)} records, source holds {count}")
+    return problems, duplicates
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build, inspect and verify packed MCQ banks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pack = commands.add_parser("pack", help="convert .json/.jsonl banks to .mcqpack")
+    pack.add_argument("sources", nargs="+")
+
+    check = commands.add_parser("verify", help="round-trip a .mcqpack against its source bank")
+    check.add_argument("pack")
+    check.add_argument("source")
+
+    show = commands.add_parser("show", help="print questions by ID or by page")
+    show.add_argument("pack")
+    show.add_argument("--id")
+    show.add_argument("--start", type=int, default=0)
+    show.add_argument("--count", type=int, default=10)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        for source in args.sources:
+            print(f"✅ Packed {source} -> {pack_bank(source)}")
+    elif args.command == "verify":
+        problems, duplicates = verify(args.pack, args.source)
+        if duplicates:
+            print(f"⚠️  {len(duplicates)} records reuse an earlier ID (e.g. {duplicates[0]}); "
+                  f"ID lookups return the first one")
+        for problem in problems[:20]:
+            print(f"❌ {problem}")
+        if problems:
+            return 1
+        print(f"✅ {args.pack} matches {args.source}")
+    else:
+        with PackReader(args.pack) as reader:
+            questions = [reader.get(args.id)] if args.id else reader.page(args.start, args.count)
+            print(json.dumps(questions, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import contextlib
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional
+
+# Generator instrumentation
+#
+# Counters (generated, failed, deduplicated) and render errors are always
+# collected; they are cheap and replace the per-question error prints. Stage
+# timers only run when enabled (--stats): hot loops take a Lap from clock()
+# and call lap("stage") after each step, which costs nothing when
+# profiling is off because clock() then returns None.
+#
+# Worker processes have their own PROFILER; each shard returns take() and the
+# parent merge()s it, so the report covers the whole run. cProfile and
+# tracemalloc are opt-in on top (--profile, --trace-memory) and cover the
+# main process only, so pair them with --workers 1.
+
+TOP_ALLOCATIONS = 15
+
+
+class Lap:
+    """Attributes the time since the previous lap to a named stage."""
+
+    __slots__ = ("stages", "last")
+
+    def __init__(self, stages: Dict[str, List[float]]):
+        self.stages = stages
+        self.last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        entry = self.stages.get(stage)
+        if entry is None:
+            entry = self.stages[stage] = [0.0, 0]
+        entry[0] += now - self.last
+        entry[1] += 1
+        self.last = now
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self) -> None:
+        self.stages: Dict[str, List[float]] = {}  # stage -> [seconds, calls]
+        self.counters: Counter = Counter()
+        self.errors: Counter = Counter()  # (domain, error) -> occurrences
+
+    def enable(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+
+    def clock(self) -> Optional[Lap]:
+        return Lap(self.stages) if self.enabled else None
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a coarse block (a shard, a file write); no-op when disabled."""
+        if not self.enabled:
+            yield
+            return
+        lap = Lap(self.stages)
+        try:
+            yield
+        finally:
+            lap.lap(name)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+    def error(self, domain: str, error: BaseException, n: int = 1) -> None:
+        self.counters["failed"] += n
+        self.errors[domain, f"{type(error).__name__}: {error}"] += n
+
+    def take(self) -> Dict[str, Any]:
+        """Picklable snapshot of everything recorded so far; resets the profiler."""
+        snapshot = {
+            "stages": {name: list(entry) for name, entry in self.stages.items()},
+            "counters": dict(self.counters),
+            "errors": [[domain, error, count] for (domain, error), count in self.errors.items()],
+        }
+        self.reset()
+        return snapshot
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        for name, (seconds, calls) in snapshot["stages"].items():
+            entry = self.stages.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += calls
+        self.counters.update(snapshot["counters"])
+        for domain, error, count in snapshot["errors"]:
+            self.errors[domain, error] += count
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "stages": {
+                name: {"seconds": round(seconds, 6), "calls": calls,
+                       "microsecondsPerCall": round(seconds / calls * 1e6, 3) if calls else None}
+                for name, (seconds, calls) in sorted(self.stages.items(), key=lambda item: -item[1][0])
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "errors": [{"domain": domain, "error": error, "count": count}
+                       for (domain, error), count in self.errors.most_common()],
+        }
+
+
+PROFILER = Profiler()
+
+
+def init_worker(enabled: bool) -> None:
+    """ProcessPoolExecutor initializer: workers inherit the parent's --stats setting."""
+    PROFILER.reset()
+    PROFILER.enable(enabled)
+
+
+class RunProfile:
+    """Wall time plus optional cProfile and tracemalloc capture for one generator run."""
+
+    def __init__(self, stats_path: Optional[str] = None, profile_path: Optional[str] = None,
+                 trace_memory: bool = False):
+        self.stats_path = stats_path
+        self.profile_path = profile_path
+        self.trace_memory = trace_memory
+        self.profiler = cProfile.Profile() if profile_path else None
+
+    def __enter__(self):
+        PROFILER.enable(bool(self.stats_path))
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profiler is not None:
+            self.profiler.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.start
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profile_path)
+            print(f"🔬 CPU profile saved as: {self.profile_path} (open with snakeviz or flameprof)")
+
+        memory = None
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATIONS]
+            tracemalloc.stop()
+            memory = {
+                "currentMB": round(current / 2**20, 3),
+                "peakMB": round(peak / 2**20, 3),
+                "topAllocations": [{"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                                    "sizeMB": round(stat.size / 2**20, 3), "blocks": stat.count} for stat in top],
+            }
+
+        if self.stats_path:
+            report = {"wallSeconds": round(wall, 6), **PROFILER.report()}
+            if memory is not None:
+                report["memory"] = memory
+            directory = os.path.dirname(os.path.abspath(self.stats_path))
+            os.makedirs(directory, exist_ok=True)
+            with open(self.stats_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"📊 Stage timings saved as: {self.stats_path}")
+        if memory is not None:
+            print(f"🧠 Peak traced memory: {memory['peakMB']} MB; top allocation sites:")
+            for site in memory["topAllocations"]:
+                print(f"   {site['sizeMB']:>9.3f} MB  {site['blocks']:>8,} blocks  {site['site']}")
@@ -0,0 +1,215 @@
+import json
+import sys
+from collections.abc import Mapping
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Any, Callable, Dict, Iterator, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:  # the stdlib encoder is used without the orjson package
+    orjson = None
+
+# Compact question records and their encoders
+#
+# Generated questions are Question objects rather than dicts: one __slots__
+# instance per question holding its options and tags as tuples. Option,
+# category, difficulty and tag strings are shared across questions, and so
+# are whole tag tuples, so a buffered bank costs a fraction of the memory of the
+# equivalent dicts. Question is a read-only Mapping, so writers and other
+# consumers keep using question["options"], question.get("tags"), etc.
+#
+# Encoders turn a question into the exact text json.dumps produces for the
+# same dict, in the two shapes the bank writers use:
+#
+#   line(q)     compact, UTF-8 (separators=(',', ':'), ensure_ascii=False)
+#   pretty(q)   one element of a json.dump(indent=2) bank's questions array
+#
+# For Question objects the stdlib encoder fills a fixed layout using the C
+# string escapers directly instead of json's generic (and, with indent,
+# pure-Python) encoder. The orjson encoder serializes compact lines with
+# orjson when it is installed. Plain dicts (banks read back from disk,
+# ingested questions) always take the json module path, so every encoder
+# writes byte-identical banks.
+
+FIELDS = ("id", "question", "options", "correctAnswer", "explanation", "category", "difficulty", "tags")
+_FIELD_SET = frozenset(FIELDS)
+_TAGS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def intern_tags(tags: Sequence[str]) -> Tuple[str, ...]:
+    """The shared tuple for a tag combination; generated banks only have a few dozen."""
+    key = tuple(tags)
+    shared = _TAGS.get(key)
+    if shared is None:
+        shared = _TAGS[key] = tuple(sys.intern(tag) if type(tag) is str else tag for tag in key)
+    return shared
+
+
+class Question(Mapping):
+    __slots__ = FIELDS
+
+    def __init__(self, id: Any, question: str, options: Sequence[str], correctAnswer: int, explanation: str,
+                 category: str, difficulty: str, tags: Sequence[str]):
+        self.id = id
+        self.question = question
+        # Options repeat across a bank's questions (answers and distractors); share one copy of each
+        try:
+            self.options = tuple(map(sys.intern, options))
+        except TypeError:  # a non-string option; keep the values as given
+            self.options = tuple(options)
+        self.correctAnswer = correctAnswer
+        self.explanation = explanation
+        self.category = category
+        self.difficulty = difficulty
+        self.tags = intern_tags(tags)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __eq__(self, other: Any) -> bool:
+        # Equal to the dict json.loads gives back, whose options and tags are lists
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self.to_dict() == (other.to_dict() if type(other) is Question else dict(other.items()))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Question({self.to_dict()!r})"
+
+    def __reduce__(self):
+        # Shard results are pickled back from worker processes
+        return _restore, (tuple(getattr(self, field) for field in FIELDS),)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "question": self.question,
+            "options": list(self.options),
+            "correctAnswer": self.correctAnswer,
+            "explanation": self.explanation,
+            "category": self.category,
+            "difficulty": self.difficulty,
+            "tags": list(self.tags),
+        }
+
+
+def _restore(fields: tuple) -> Question:
+    question = Question(*fields)
+    # Unpickled strings are fresh copies; share the repetitive ones again
+    if type(question.category) is str:
+        question.category = sys.intern(question.category)
+    if type(question.difficulty) is str:
+        question.difficulty = sys.intern(question.difficulty)
+    return question
+
+
+def compact(question: Mapping) -> Mapping:
+    """A Question for a dict with exactly the generated schema; anything else is returned as is."""
+    if type(question) is not dict or question.keys() != _FIELD_SET:
+        return question
+    category, difficulty = question["category"], question["difficulty"]
+    return Question(question["id"], question["question"], question["options"], question["correctAnswer"],
+                    question["explanation"], sys.intern(category) if type(category) is str else category,
+                    sys.intern(difficulty) if type(difficulty) is str else difficulty, question["tags"])
+
+
+class StdlibEncoder:
+    name = "stdlib"
+
+    @staticmethod
+    def _value(value: Any, escape: Callable[[str], str], ensure_ascii: bool) -> str:
+        if type(value) is str:
+            return escape(value)
+        if type(value) is int:
+            return int.__repr__(value)
+        return json.dumps(value, ensure_ascii=ensure_ascii)
+
+    def line(self, question: Mapping) -> str:
+        if type(question) is not Question:
+            return json.dumps(question, ensure_ascii=False, separators=(',', ':'))
+        value = self._value
+        esc = encode_basestring
+        return "".join((
+            '{"id":', value(question.id, esc, False),
+            ',"question":', value(question.question, esc, False),
+            ',"options":[', ",".join([value(option, esc, False) for option in question.options]),
+            '],"correctAnswer":', value(question.correctAnswer, esc, False),
+            ',"explanation":', value(question.explanation, esc, False),
+            ',"category":', value(question.category, esc, False),
+            ',"difficulty":', value(question.difficulty, esc, False),
+            ',"tags":[', ",".join([value(tag, esc, False) for tag in question.tags]),
+            ']}',
+        ))
+
+    def pretty(self, question: Mapping) -> str:
+        """The question as nested two levels deep in a json.dump(indent=2) document."""
+        if type(question) is not Question:
+            return json.dumps(question, indent=2).replace("\n", "\n    ")
+        value = self._value
+        esc = encode_basestring_ascii
+
+        def array(items: Tuple[Any, ...]) -> str:
+            if not items:
+                return "[]"
+            return "[\n        " + ",\n        ".join([value(item, esc, True) for item in items]) + "\n      ]"
+
+        return "".join((
+            '{\n      "id": ', value(question.id, esc, True),
+            ',\n      "question": ', value(question.question, esc, True),
+            ',\n      "options": ', array(question.options),
+            ',\n      "correctAnswer": ', value(question.correctAnswer, esc, True),
+            ',\n      "explanation": ', value(question.explanation, esc, True),
+            ',\n      "category": ', value(question.category, esc, True),
+            ',\n      "difficulty": ', value(question.difficulty, esc, True),
+            ',\n      "tags": ', array(question.tags),
+            '\n    }',
+        ))
+
+
+class OrjsonEncoder(StdlibEncoder):
+    """orjson for compact lines; pretty banks are ASCII-escaped, which orjson cannot do, so they stay stdlib."""
+
+    name = "orjson"
+
+    def line(self, question: Mapping) -> str:
+        if type(question) is not Question:
+            return super().line(question)
+        return orjson.dumps(question.to_dict()).decode("utf-8")
+
+
+ENCODERS: Dict[str, Callable[[], StdlibEncoder]] = {
+    "stdlib": StdlibEncoder,
+    "orjson": OrjsonEncoder,
+}
+
+
+def register_encoder(name: str, encoder: Callable[[], StdlibEncoder]) -> None:
+    """Make an encoder available to use_encoder() and the generator's --encoder flag."""
+    ENCODERS[name] = encoder
+
+
+def available_encoders() -> Dict[str, Callable[[], StdlibEncoder]]:
+    return {name: encoder for name, encoder in ENCODERS.items() if name != "orjson" or orjson is not None}
+
+
+def use_encoder(name: str = "auto") -> StdlibEncoder:
+    """Select the encoder writers opened from now on use; "auto" prefers orjson when installed."""
+    global ENCODER
+    if name == "auto":
+        name = "orjson" if orjson is not None else "stdlib"
+    if name not in available_encoders():
+        raise ValueError(f"Encoder {name!r} is not available (have: {', '.join(available_encoders())})")
+    ENCODER = ENCODERS[name]()
+    return ENCODER
+
+
+ENCODER = use_encoder()
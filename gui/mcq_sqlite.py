@@ -0,0 +1,247 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from typing import Any, Dict, Iterator, List, Optional
+
+import mcq_records
+from mcq_writers import BankWriter, load_bank, register_writer
+
+# SQLite question banks (<stem>.sqlite)
+#
+#   metadata(key, value)          bank metadata, values JSON-encoded
+#   questions(pos, id, domain, category, difficulty, question, options,
+#             correct_answer, explanation, tags, data)
+#   question_tags(pos, tag)       one row per distinct tag of a question
+#   questions_fts                 FTS5 over question, options and explanation
+#
+# "pos" is the record number, as in the .index.json and .mcqpack formats, and
+# "data" holds the question exactly as it was written so read() round-trips.
+# Rows are inserted with executemany() in batches inside one transaction and
+# the secondary indexes and full-text index are built once, at close().
+#
+#   python mcq_sqlite.py query mcqs/all_mcqs.sqlite --search "binary tree" --difficulty Easy
+
+BATCH_SIZE = 5000
+
+SCHEMA = """
+CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE questions (
+    pos INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    domain TEXT,
+    category TEXT,
+    difficulty TEXT,
+    question TEXT NOT NULL,
+    options TEXT NOT NULL,
+    correct_answer INTEGER NOT NULL,
+    explanation TEXT,
+    tags TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE question_tags (pos INTEGER NOT NULL, tag TEXT NOT NULL);
+"""
+
+INDEXES = """
+CREATE INDEX idx_questions_id ON questions (id);
+CREATE INDEX idx_questions_filter ON questions (domain, category, difficulty);
+CREATE INDEX idx_questions_difficulty ON questions (difficulty);
+CREATE INDEX idx_question_tags ON question_tags (tag, pos);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE questions_fts USING fts5(
+    question, options, explanation, content='questions', content_rowid='pos'
+);
+INSERT INTO questions_fts (questions_fts) VALUES ('rebuild');
+"""
+
+
+def has_fts5() -> bool:
+    try:
+        sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE probe USING fts5(text)")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+class SqliteWriter(BankWriter):
+    """Bulk-load questions into a fresh SQLite database.
+
+    The database is built under a temporary name and moved into place at
+    close(), so readers never see a half-written bank.
+    """
+
+    extension = ".sqlite"
+
+    def __init__(self, output_dir: str, stem: str, metadata: Dict[str, Any]):
+        super().__init__(output_dir, stem, metadata)
+        self._building = self.path + ".tmp"
+        if os.path.exists(self._building):
+            os.remove(self._building)
+        self.db = sqlite3.connect(self._building, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode = OFF")
+        self.db.execute("PRAGMA synchronous = OFF")
+        self.db.executescript(SCHEMA)
+        self.db.execute("BEGIN")
+        self._questions: List[tuple] = []
+        self._tags: List[tuple] = []
+
+    def write(self, question: Dict[str, Any]) -> None:
+        tags = question.get("tags")
+        self._questions.append((
+            self.count,
+            str(question["id"]),
+            question.get("domain", self.metadata.get("domain")),
+            question.get("category"),
+            question.get("difficulty"),
+            question["question"],
+            json.dumps(question["options"], ensure_ascii=False),
+            question["correctAnswer"],
+            question.get("explanation"),
+            json.dumps(tags, ensure_ascii=False) if tags is not None else None,
+            mcq_records.ENCODER.line(question),
+        ))
+        self._tags.extend((self.count, tag) for tag in dict.fromkeys(tags or ()))
+        self.count += 1
+        if len(self._questions) >= BATCH_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        self.db.executemany("INSERT INTO questions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self._questions)
+        self.db.executemany("INSERT INTO question_tags VALUES (?, ?)", self._tags)
+        self._questions, self._tags = [], []
+
+    def _execute_all(self, script: str) -> None:
+        for statement in script.split(";"):
+            if statement.strip():
+                self.db.execute(statement)
+
+    def close(self) -> str:
+        if self.db is None:
+            return self.path
+        self._flush()
+        self.metadata["totalQuestions"] = self.count
+        self.db.executemany("INSERT INTO metadata VALUES (?, ?)",
+                            [(key, json.dumps(value, ensure_ascii=False)) for key, value in self.metadata.items()])
+        # executescript() would commit the open transaction; run statements one by one
+        self._execute_all(INDEXES)
+        if has_fts5():
+            self._execute_all(FTS_SCHEMA)
+        else:
+            print("⚠️  This SQLite build has no FTS5; full-text search is unavailable for", self.path)
+        self.db.execute("COMMIT")
+        self.db.close()
+        self.db = None
+        os.replace(self._building, self.path)
+        return self.path
+
+    @classmethod
+    def read(cls, path: str) -> Iterator[Dict[str, Any]]:
+        db = sqlite3.connect(path)
+        try:
+            for (data,) in db.execute("SELECT data FROM questions ORDER BY pos"):
+                yield json.loads(data)
+        finally:
+            db.close()
+
+    @classmethod
+    def combine(cls, output_dir: str, stem: str, metadata: Dict[str, Any], parts: List[str]) -> str:
+        """Copy the parts' rows across with ATTACH, renumbering positions."""
+        writer = cls(output_dir, stem, metadata)
+        writer.db.execute("COMMIT")  # ATTACH is not allowed inside a transaction
+        for part in parts:
+            writer.db.execute("ATTACH DATABASE ? AS part", (part,))
+            writer.db.execute("BEGIN")
+            writer.db.execute("INSERT INTO questions SELECT pos + ?, id, domain, category, difficulty, question, "
+                              "options, correct_answer, explanation, tags, data FROM part.questions ORDER BY pos",
+                              (writer.count,))
+            writer.db.execute("INSERT INTO question_tags SELECT pos + ?, tag FROM part.question_tags", (writer.count,))
+            writer.count += writer.db.execute("SELECT COUNT(*) FROM part.questions").fetchone()[0]
+            writer.db.execute("COMMIT")
+            writer.db.execute("DETACH DATABASE part")
+        writer.db.execute("BEGIN")
+        return writer.close()
+
+
+register_writer("sqlite", SqliteWriter)
+
+
+def fts_query(text: str) -> str:
+    """Quote every word so user input is matched literally (all words must appear)."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+def query(path: str, search: Optional[str] = None, domain: Optional[str] = None, category: Optional[str] = None,
+          difficulty: Optional[str] = None, tag: Optional[str] = None, offset: int = 0,
+          limit: int = 20) -> Dict[str, Any]:
+    """Filtered, optionally full-text ranked page of questions: ``{"matches", "questions"}``."""
+    clauses, params = [], []
+    source = "questions q"
+    order = "q.pos"
+    if search:
+        source = "questions_fts JOIN questions q ON q.pos = questions_fts.rowid"
+        clauses.append("questions_fts MATCH ?")
+        params.append(fts_query(search))
+        order = "questions_fts.rank, q.pos"
+    for column, value in (("domain", domain), ("category", category), ("difficulty", difficulty)):
+        if value is not None:
+            clauses.append(f"q.{column} = ?")
+            params.append(value)
+    if tag is not None:
+        clauses.append("q.pos IN (SELECT pos FROM question_tags WHERE tag = ?)")
+        params.append(tag)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        matches = db.execute(f"SELECT COUNT(*) FROM {source}{where}", params).fetchone()[0]
+        rows = db.execute(f"SELECT q.data FROM {source}{where} ORDER BY {order} LIMIT ? OFFSET ?",
+                          params + [limit, offset]).fetchall()
+    finally:
+        db.close()
+    return {"matches": matches, "questions": [json.loads(data) for (data,) in rows]}
+
+
+def build_database(source: str, output_dir: Optional[str] = None) -> str:
+    """Write <stem>.sqlite for an existing .json/.jsonl bank."""
+    metadata, questions = load_bank(source)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    with SqliteWriter(output_dir or os.path.dirname(os.path.abspath(source)), stem, metadata) as writer:
+        for question in questions:
+            writer.write(question)
+    return writer.path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build and query SQLite MCQ banks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="load existing .json/.jsonl banks into SQLite")
+    build.add_argument("sources", nargs="+")
+
+    search = commands.add_parser("query", help="filter and full-text search a bank")
+    search.add_argument("database")
+    search.add_argument("--search", help="words that must all appear in the question, options or explanation")
+    search.add_argument("--domain")
+    search.add_argument("--category")
+    search.add_argument("--difficulty")
+    search.add_argument("--tag")
+    search.add_argument("--offset", type=int, default=0)
+    search.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        for source in args.sources:
+            print(f"✅ Loaded {source} -> {build_database(source)}")
+    else:
+        result = query(args.database, args.search, args.domain, args.category, args.difficulty, args.tag,
+                       args.offset, args.limit)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
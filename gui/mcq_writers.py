@@ -0,0 +1,263 @@
+import json
+import os
+from collections import Counter
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Tuple
+
+import mcq_records
+
+# Output writers for generated MCQ banks.
+#
+# Every writer takes the output directory, a file stem (e.g. "python_mcqs") and
+# the bank metadata, accepts questions one at a time through write() and
+# finalizes its files in close(). The metadata's "totalQuestions" is filled in
+# with the real count when the writer is closed.
+#
+# combine() builds a bank from already-written banks of the same format (the
+# per-domain files making up all_mcqs). The default re-streams every question;
+# formats that can be joined byte-for-byte override it to splice instead.
+#
+# Questions may be plain dicts or mcq_records.Question objects; the JSON
+# writers serialize both with the selected mcq_records encoder.
+
+BANK_VERSION = "1.0.0"
+
+
+class BankWriter:
+    """Base class for question bank writers."""
+
+    extension = ""
+
+    def __init__(self, output_dir: str, stem: str, metadata: Dict[str, Any]):
+        self.path = self.output_path(output_dir, stem)
+        self.metadata = dict(metadata)
+        self.count = 0
+
+    def write(self, question: Mapping[str, Any]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> str:
+        raise NotImplementedError
+
+    @classmethod
+    def output_path(cls, output_dir: str, stem: str) -> str:
+        return os.path.join(output_dir, f"{stem}{cls.extension}")
+
+    @classmethod
+    def output_files(cls, output_dir: str, stem: str) -> List[str]:
+        """Every file this format writes for a bank."""
+        return [cls.output_path(output_dir, stem)]
+
+    @classmethod
+    def read(cls, path: str) -> Iterator[Dict[str, Any]]:
+        """Iterate the questions of a bank written in this format."""
+        return load_bank(path)[1]
+
+    @classmethod
+    def combine(cls, output_dir: str, stem: str, metadata: Dict[str, Any], parts: List[str]) -> str:
+        """Write the concatenation of ``parts`` as one bank and return its path."""
+        with cls(output_dir, stem, metadata) as writer:
+            for part in parts:
+                for question in cls.read(part):
+                    writer.write(question)
+        return writer.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JsonBankWriter(BankWriter):
+    """Pretty-printed ``{"metadata", "questions"}`` document (the original format).
+
+    The document needs the final count up front, so questions are buffered,
+    as compact Question records where they have the generated schema. The
+    output is byte-for-byte what json.dump(indent=2) writes for the bank.
+    """
+
+    extension = ".json"
+
+    def __init__(self, output_dir: str, stem: str, metadata: Dict[str, Any]):
+        super().__init__(output_dir, stem, metadata)
+        self.questions: List[Mapping[str, Any]] = []
+        self.encoder = mcq_records.ENCODER
+
+    def write(self, question: Mapping[str, Any]) -> None:
+        self.questions.append(mcq_records.compact(question))
+        self.count += 1
+
+    def close(self) -> str:
+        self.metadata["totalQuestions"] = self.count
+        skeleton = json.dumps({"metadata": self.metadata, "questions": []}, indent=2)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            if not self.questions:
+                f.write(skeleton)
+            else:
+                pretty = self.encoder.pretty
+                f.write(skeleton[:-len("]\n}")])
+                for i, question in enumerate(self.questions):
+                    f.write(("," if i else "") + "\n    " + pretty(question))
+                f.write(self.ARRAY_END.decode("ascii"))
+        self.questions = []
+        return self.path
+
+    # json.dump(indent=2) puts the questions array between these markers, with
+    # every element at the same indentation, so bodies can be joined verbatim.
+    ARRAY_START = b'\n  "questions": ['
+    ARRAY_END = b'\n  ]\n}'
+
+    @classmethod
+    def _array_body(cls, path: str) -> Tuple[int, int]:
+        """Byte range of the elements inside a bank's questions array, or (-1, -1)."""
+        with open(path, 'rb') as f:
+            head = b""
+            while cls.ARRAY_START not in head:
+                chunk = f.read(1 << 16)
+                if not chunk:
+                    return -1, -1
+                head += chunk
+            start = head.index(cls.ARRAY_START) + len(cls.ARRAY_START)
+            size = f.seek(0, os.SEEK_END)
+            if head[start:start + 3] == b"]\n}":  # empty array
+                return start, start
+            f.seek(size - len(cls.ARRAY_END))
+            if f.read() != cls.ARRAY_END:
+                return -1, -1
+            return start, size - len(cls.ARRAY_END)
+
+    @classmethod
+    def combine(cls, output_dir: str, stem: str, metadata: Dict[str, Any], parts: List[str]) -> str:
+        ranges = [cls._array_body(part) for part in parts]
+        if any(start < 0 for start, _ in ranges):
+            return super().combine(output_dir, stem, metadata, parts)
+
+        path = cls.output_path(output_dir, stem)
+        skeleton = json.dumps({"metadata": metadata, "questions": []}, indent=2).encode("utf-8")
+        bodies = [(part, start, end) for part, (start, end) in zip(parts, ranges) if end > start]
+        with open(path, 'wb') as out:
+            if not bodies:
+                out.write(skeleton)
+                return path
+            out.write(skeleton[:-len(b"]\n}")])
+            for i, (part, start, end) in enumerate(bodies):
+                if i:
+                    out.write(b",")
+                with open(part, 'rb') as f:
+                    f.seek(start)
+                    remaining = end - start
+                    while remaining:
+                        chunk = f.read(min(remaining, 1 << 20))
+                        out.write(chunk)
+                        remaining -= len(chunk)
+            out.write(cls.ARRAY_END)
+        return path
+
+
+class JsonlBankWriter(BankWriter):
+    """One compact question per line, streamed to disk as it is generated.
+
+    Bank-level information goes to a ``<stem>.meta.json`` sidecar: the
+    metadata header plus footer statistics (counts and histograms) that are
+    only known once the stream is complete.
+    """
+
+    extension = ".jsonl"
+
+    def __init__(self, output_dir: str, stem: str, metadata: Dict[str, Any]):
+        super().__init__(output_dir, stem, metadata)
+        self.meta_path = os.path.join(output_dir, f"{stem}.meta.json")
+        self.difficulties: Counter = Counter()
+        self.categories: Counter = Counter()
+        self.encoder = mcq_records.ENCODER
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    @classmethod
+    def output_files(cls, output_dir: str, stem: str) -> List[str]:
+        return [cls.output_path(output_dir, stem), os.path.join(output_dir, f"{stem}.meta.json")]
+
+    def write(self, question: Mapping[str, Any]) -> None:
+        self._file.write(self.encoder.line(question))
+        self._file.write('\n')
+        self.difficulties[question.get("difficulty")] += 1
+        self.categories[question.get("category")] += 1
+        self.count += 1
+
+    def close(self) -> str:
+        if self._file.closed:
+            return self.path
+        self._file.close()
+        self.metadata["totalQuestions"] = self.count
+        with open(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "metadata": self.metadata,
+                "format": "jsonl",
+                "file": os.path.basename(self.path),
+                "stats": {
+                    "totalQuestions": self.count,
+                    "difficultyHistogram": dict(sorted(self.difficulties.items())),
+                    "categoryHistogram": dict(sorted(self.categories.items())),
+                },
+            }, f, indent=2)
+        return self.path
+
+    @classmethod
+    def combine(cls, output_dir: str, stem: str, metadata: Dict[str, Any], parts: List[str]) -> str:
+        """Concatenate the parts' lines and merge their sidecar statistics."""
+        writer = cls(output_dir, stem, metadata)
+        for part in parts:
+            with open(part, 'rb') as f:
+                while True:
+                    chunk = f.read(1 << 20)
+                    if not chunk:
+                        break
+                    writer._file.buffer.write(chunk)
+
+            with open(part[:-len(cls.extension)] + ".meta.json", 'r', encoding='utf-8') as f:
+                stats = json.load(f)["stats"]
+            writer.count += stats["totalQuestions"]
+            writer.difficulties.update(stats["difficultyHistogram"])
+            writer.categories.update(stats["categoryHistogram"])
+        return writer.close()
+
+
+WRITERS: Dict[str, Callable[[str, str, Dict[str, Any]], BankWriter]] = {
+    "json": JsonBankWriter,
+    "jsonl": JsonlBankWriter,
+}
+
+
+def register_writer(name: str, writer: Callable[[str, str, Dict[str, Any]], BankWriter]) -> None:
+    """Make an output format available to open_writers() and the generators' --format flag."""
+    WRITERS[name] = writer
+
+
+def open_writers(formats: List[str], output_dir: str, stem: str, metadata: Dict[str, Any]) -> List[BankWriter]:
+    """Open one writer per requested output format."""
+    return [WRITERS[fmt](output_dir, stem, metadata) for fmt in formats]
+
+
+def load_bank(path: str) -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]:
+    """Return ``(metadata, questions)`` for a bank written as .json or .jsonl.
+
+    JSONL banks are read lazily, with metadata taken from the .meta.json sidecar
+    when there is one.
+    """
+    if path.endswith(".jsonl"):
+        meta_path = path[:-len(".jsonl")] + ".meta.json"
+        metadata: Dict[str, Any] = {}
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f).get("metadata", {})
+        return metadata, _iter_jsonl(path)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data.get("metadata", {}), iter(data["questions"])
+
+
+def _iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
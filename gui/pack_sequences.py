@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # fall back to a conservative length-based estimate
+    tiktoken = None
+
+from chat_datasets import GUI_DIR, row_messages
+
+# Sequence packing and training exports for the cs-mentor fine-tune
+#
+# cs_mentor_modelfile runs llama3 with num_ctx 4096, but the conversations in
+# training_data_chat.jsonl are a few hundred tokens each. This converter
+#
+#   1. streams the dataset once, rendering every conversation with the llama3
+#      chat template, counting its tokens and writing the per-row exports
+#      (chat.jsonl, instruction.jsonl, lora.jsonl);
+#   2. bin-packs the token counts first-fit-decreasing into --seq-len bins;
+#   3. seeks back to each packed conversation and writes packed.jsonl.
+#
+# Each packed record keeps the conversations' token lengths in "segments" so
+# the trainer can reset position ids and mask attention across boundaries;
+# every segment also starts with <|begin_of_text|> in "text".
+#
+# Token counts come from tiktoken's cl100k_base (the base of the llama3
+# vocabulary) when installed and its encoding can be loaded. Otherwise they
+# are estimated: one token per three letters of a word (with the space before
+# it), one per group of up to three digits, one per byte of every other
+# character, so symbols, indentation and non-ASCII text are never merged, plus
+# a 5% margin. That is meant to err high, but it is an estimate, not a bound:
+# install tiktoken when a packed sequence must not overflow the context window.
+
+DEFAULT_INPUT = os.path.join(GUI_DIR, "training_data_chat.jsonl")
+DEFAULT_OUTPUT_DIR = os.path.join(GUI_DIR, "finetune")
+DEFAULT_SEQ_LEN = 4096
+
+BEGIN_OF_TEXT = "<|begin_of_text|>"
+END_OF_TURN = "<|eot_id|>"
+HEADER = "<|start_header_id|>{role}<|end_header_id|>\n\n"
+# <|start_header_id|>, role, <|end_header_id|>, "\n\n" and <|eot_id|>
+MESSAGE_OVERHEAD = 5
+
+_PIECE = re.compile(r" ?[A-Za-z]+|\d{1,3}|.", re.DOTALL)
+ESTIMATE_MARGIN = 20  # add 1/20 of the estimate
+
+
+class TokenCounter:
+    def __init__(self, encoding: str = "cl100k_base"):
+        self.encoder = None
+        if tiktoken is not None:
+            try:
+                self.encoder = tiktoken.get_encoding(encoding)
+            # OSError covers a failed download (offline); the others a bad or unreadable encoding file
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"⚠️  Cannot load tiktoken encoding {encoding} ({e}); estimating token counts instead")
+        self.name = f"tiktoken:{encoding}" if self.encoder is not None else "estimate"
+
+    def count(self, text: str) -> int:
+        if self.encoder is not None:
+            return len(self.encoder.encode(text, disallowed_special=()))
+        total = 0
+        for piece in _PIECE.findall(text):
+            if piece[-1].isascii() and piece[-1].isalpha():
+                total += (len(piece.lstrip()) + 2) // 3
+            elif piece[-1].isascii() and piece[-1].isdigit():
+                total += 1
+            else:
+                total += len(piece.encode("utf-8"))
+        return total + (total + ESTIMATE_MARGIN - 1) // ESTIMATE_MARGIN
+
+    def conversation(self, messages: List[Dict[str, str]]) -> int:
+        return 1 + sum(self.count(m["content"]) + MESSAGE_OVERHEAD for m in messages)
+
+
+def render(messages: List[Dict[str, str]]) -> str:
+    """llama3 chat template for one conversation."""
+    return BEGIN_OF_TEXT + "".join(HEADER.format(role=m["role"]) + m["content"] + END_OF_TURN for m in messages)
+
+
+def exchanges(messages: List[Dict[str, str]]):
+    """(prompt, answer) pairs of a conversation."""
+    prompt = None
+    for message in messages:
+        if message["role"] == "user":
+            prompt = message["content"]
+        elif message["role"] == "assistant" and prompt is not None:
+            yield prompt, message["content"]
+            prompt = None
+
+
+def first_fit_decreasing(sizes: List[int], capacity: int) -> List[List[int]]:
+    """Bins of item indices; items larger than ``capacity`` get a bin of their own."""
+    bins: List[List[int]] = []
+    free: List[int] = []
+    for item in sorted(range(len(sizes)), key=lambda i: (-sizes[i], i)):
+        size = sizes[item]
+        for b, room in enumerate(free):
+            if size <= room:
+                bins[b].append(item)
+                free[b] -= size
+                break
+        else:
+            bins.append([item])
+            free.append(capacity - size)
+    return bins
+
+
+def convert(path: str, output_dir: str, seq_len: int, counter: TokenCounter) -> Dict[str, Any]:
+    os.makedirs(output_dir, exist_ok=True)
+    offsets: List[Tuple[int, int]] = []  # (byte offset, line number) per conversation
+    sizes: List[int] = []
+    exports = {name: open(os.path.join(output_dir, f"{name}.jsonl"), 'w', encoding='utf-8')
+               for name in ("chat", "instruction", "lora")}
+    try:
+        with open(path, 'rb') as f:
+            line_number = 0
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                line_number += 1
+                if not line.strip():
+                    continue
+                messages = row_messages(json.loads(line))
+                offsets.append((offset, line_number))
+                sizes.append(counter.conversation(messages))
+
+                exports["chat"].write(json.dumps({"messages": messages}, ensure_ascii=False) + "\n")
+                for prompt, answer in exchanges(messages):
+                    record = {"instruction": prompt, "input": "", "output": answer}
+                    exports["instruction"].write(json.dumps(record, ensure_ascii=False) + "\n")
+                exports["lora"].write(json.dumps({"text": render(messages)}, ensure_ascii=False) + "\n")
+    finally:
+        for export in exports.values():
+            export.close()
+
+    bins = first_fit_decreasing(sizes, seq_len)
+    with open(path, 'rb') as src, open(os.path.join(output_dir, "packed.jsonl"), 'w', encoding='utf-8') as dst:
+        for members in bins:
+            texts = []
+            for item in members:
+                src.seek(offsets[item][0])
+                texts.append(render(row_messages(json.loads(src.readline()))))
+            dst.write(json.dumps({
+                "text": "".join(texts),
+                "tokens": sum(sizes[item] for item in members),
+                "segments": [sizes[item] for item in members],
+                "lines": [offsets[item][1] for item in members],
+            }, ensure_ascii=False) + "\n")
+
+    total = sum(sizes)
+    return {
+        "tokenizer": counter.name,
+        "seqLen": seq_len,
+        "conversations": len(sizes),
+        "tokens": total,
+        "longest": max(sizes, default=0),
+        "oversize": sum(size > seq_len for size in sizes),
+        "packedSequences": len(bins),
+        "fill": round(total / (len(bins) * seq_len), 4) if bins else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pack chat conversations into full-context training sequences.")
+    parser.add_argument("dataset", nargs="?", default=DEFAULT_INPUT, help="chat or instruction-form JSONL")
+    parser.add_argument("--seq-len", type=int, default=DEFAULT_SEQ_LEN, help="tokens per packed sequence (num_ctx)")
+    parser.add_argument("--encoding", default="cl100k_base", help="tiktoken encoding, when tiktoken is installed")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    args = parser.parse_args(argv)
+
+    print(f"Packing {args.dataset} into {args.seq_len}-token sequences...")
+    stats = convert(args.dataset, args.output_dir, args.seq_len, TokenCounter(args.encoding))
+    with open(os.path.join(args.output_dir, "pack_stats.json"), 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2)
+
+    print(f"  {stats['conversations']} conversations, {stats['tokens']:,} tokens ({stats['tokenizer']})")
+    if stats["oversize"]:
+        print(f"⚠️  {stats['oversize']} conversations exceed {args.seq_len} tokens and were packed alone")
+    print(f"✅ {stats['packedSequences']} packed sequences, {stats['fill']:.1%} full "
+          f"(was {stats['conversations']} samples per epoch)")
+    print(f"📁 Exports saved to {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from domain_registry import REGISTRY
+from mcq_writers import WRITERS, load_bank
+
+# Stratified quiz assembly
+#
+# A bank is split once into pools of question positions per domain,
+# difficulty and category. Assembling an N-question quiz then costs O(N):
+#
+#   1. every difficulty gets floor(N * weight) slots from the domain's target
+#      distribution (metadata "difficultyDistribution", else the domain
+#      pack's generator weights, else the observed mix); the remaining slots
+#      are drawn from an alias table over the same weights;
+#   2. each difficulty's slots are filled by rejection sampling from its
+#      pool, skipping questions in the user's seen set. Only when a pool runs
+#      nearly dry does it fall back to one reservoir-sampling pass over it;
+#   3. slots a pool cannot fill move to the difficulties with questions left.
+#
+# Decks are quizzes pre-assembled with per-deck seeds. They are written one
+# per line to decks/<domain key>.decks.jsonl with the byte offset of every
+# deck in a small header file, so /api/mcqs/quiz/<domain> can serve one with
+# a single ranged read:
+#
+#   python quiz_assembler.py decks mcqs/question_bank.jsonl --count 500 --size 10
+#   python quiz_assembler.py quiz mcqs/question_bank.jsonl --domain Python --size 10 --seen seen.json
+
+GUI_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BANK = os.path.join(GUI_DIR, "mcqs", "question_bank.jsonl")
+DEFAULT_DECK_DIR = os.path.join(GUI_DIR, "mcqs", "decks")
+DEFAULT_SEED = 42
+
+
+def domain_key(domain: str) -> str:
+    """Deck file name for a domain: lowercase letters and digits ("React.js" -> "reactjs")."""
+    return re.sub(r"[^a-z0-9]", "", domain.lower())
+
+
+def deck_seed(seed: int, domain: str, deck: int) -> int:
+    digest = hashlib.sha256(f"{seed}:{domain}:{deck}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(1) draws from a fixed discrete distribution."""
+
+    def __init__(self, weights: Dict[str, float]):
+        self.keys = [key for key, weight in weights.items() if weight > 0]
+        if not self.keys:
+            raise ValueError("alias table needs at least one positive weight")
+        total = sum(weights[key] for key in self.keys)
+        n = len(self.keys)
+        scaled = [weights[key] * n / total for key in self.keys]
+        self.probability = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+
+    def draw(self, rng: random.Random) -> str:
+        column = rng.randrange(len(self.keys))
+        return self.keys[column if rng.random() < self.probability[column] else self.alias[column]]
+
+
+def reservoir_sample(items: Iterable[int], k: int, rng: random.Random) -> List[int]:
+    """k items chosen uniformly from a stream of unknown length (Algorithm R)."""
+    reservoir: List[int] = []
+    for seen, item in enumerate(items):
+        if seen < k:
+            reservoir.append(item)
+        else:
+            slot = rng.randrange(seen + 1)
+            if slot < k:
+                reservoir[slot] = item
+    return reservoir
+
+
+class QuizPools:
+    """Position pools of one domain's questions by difficulty and by difficulty x category."""
+
+    def __init__(self, domain: str, questions: List[Dict[str, Any]], distribution: Optional[Dict[str, float]] = None):
+        self.domain = domain
+        self.questions = questions
+        self.by_difficulty: Dict[str, List[int]] = defaultdict(list)
+        self.by_category: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        self.positions: Dict[str, List[int]] = defaultdict(list)  # question id -> positions
+        for position, question in enumerate(questions):
+            difficulty = question.get("difficulty")
+            self.by_difficulty[difficulty].append(position)
+            self.by_category[difficulty, question.get("category")].append(position)
+            self.positions[str(question["id"])].append(position)
+
+        observed = {difficulty: len(pool) for difficulty, pool in self.by_difficulty.items()}
+        self.distribution = {difficulty: weight for difficulty, weight in (distribution or observed).items()
+                             if weight > 0 and difficulty in self.by_difficulty} or observed
+        self.alias = AliasTable(self.distribution)
+
+    def _pool(self, difficulty: str, category: Optional[str]) -> List[int]:
+        if category is None:
+            return self.by_difficulty.get(difficulty, [])
+        return self.by_category.get((difficulty, category), [])
+
+    def _quotas(self, n: int, rng: random.Random) -> Counter:
+        total = sum(self.distribution.values())
+        quotas = Counter({difficulty: int(n * weight / total) for difficulty, weight in self.distribution.items()})
+        for _ in range(n - sum(quotas.values())):
+            quotas[self.alias.draw(rng)] += 1
+        return quotas
+
+    def assemble(self, n: int, rng: random.Random, seen: Optional[Set[str]] = None,
+                 category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Up to ``n`` distinct questions, none in ``seen``, following the difficulty distribution."""
+        seen = seen or set()
+        excluded: Set[int] = {position for question_id in seen for position in self.positions.get(question_id, ())}
+        excluded_by_difficulty: Counter = Counter()
+        for position in excluded:
+            question = self.questions[position]
+            if category is None or question.get("category") == category:
+                excluded_by_difficulty[question.get("difficulty")] += 1
+        available = {difficulty: len(self._pool(difficulty, category)) - excluded_by_difficulty[difficulty]
+                     for difficulty in self.distribution}
+
+        quotas = self._quotas(n, rng)
+        spill = 0
+        for difficulty in quotas:
+            if quotas[difficulty] > available[difficulty]:
+                spill += quotas[difficulty] - available[difficulty]
+                quotas[difficulty] = available[difficulty]
+        # Hand unfillable slots to the heaviest difficulties that still have questions
+        for difficulty in sorted(self.distribution, key=lambda d: -self.distribution[d]):
+            extra = min(spill, available[difficulty] - quotas[difficulty])
+            quotas[difficulty] += extra
+            spill -= extra
+
+        chosen: List[int] = []
+        for difficulty, k in quotas.items():
+            chosen.extend(self._sample(self._pool(difficulty, category), k, excluded, rng))
+        rng.shuffle(chosen)
+        return [self.questions[position] for position in chosen]
+
+    @staticmethod
+    def _sample(pool: List[int], k: int, excluded: Set[int], rng: random.Random) -> List[int]:
+        picked: List[int] = []
+        if k <= 0:
+            return picked
+        # Check the caller's seen set in place; copying it would cost O(|seen|) per bucket
+        chosen: Set[int] = set()
+        attempts = 0
+        while len(picked) < k and attempts < 4 * k + 16:
+            attempts += 1
+            position = pool[rng.randrange(len(pool))]
+            if position not in excluded and position not in chosen:
+                chosen.add(position)
+                picked.append(position)
+        if len(picked) < k:
+            rest = (p for p in pool if p not in excluded and p not in chosen)
+            picked += reservoir_sample(rest, k - len(picked), rng)
+        return picked
+
+
+def read_bank(path: str) -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]:
+    """``(metadata, questions)`` of a bank in any registered format."""
+    if path.endswith((".json", ".jsonl")):
+        return load_bank(path)
+    for writer in WRITERS.values():
+        if writer.extension and path.endswith(writer.extension):
+            return {}, writer.read(path)
+    raise ValueError(f"Unknown bank format: {path}")
+
+
+def target_distribution(domain: str, metadata: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    if metadata.get("domain") == domain and metadata.get("difficultyDistribution"):
+        return metadata["difficultyDistribution"]
+    try:
+        return REGISTRY[domain]["difficulty"]
+    except KeyError:
+        return None
+
+
+def load_pools(path: str) -> Dict[str, QuizPools]:
+    """Pools for every domain in a bank (per-domain banks take the domain from their metadata)."""
+    metadata, questions = read_bank(path)
+    grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for question in questions:
+        grouped[question.get("domain") or metadata.get("domain") or "General"].append(question)
+    return {domain: QuizPools(domain, items, target_distribution(domain, metadata))
+            for domain, items in grouped.items()}
+
+
+def build_decks(pools: QuizPools, count: int, size: int, seed: int, output_dir: str) -> str:
+    """Write ``count`` seeded decks for one domain; returns the header path.
+
+    Both files are written aside and swapped in deck first, header second;
+    the route checks the deck file's size against the header's last offset
+    and re-reads the header when it changes.
+    """
+    key = domain_key(pools.domain)
+    deck_path = os.path.join(output_dir, f"{key}.decks.jsonl")
+    offsets = [0]
+    with open(deck_path + ".tmp", 'wb') as f:
+        for deck in range(count):
+            rng = random.Random(deck_seed(seed, pools.domain, deck))
+            line = json.dumps({"deck": deck, "questions": pools.assemble(size, rng)},
+                              ensure_ascii=False, separators=(',', ':')).encode("utf-8") + b"\n"
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+
+    header_path = os.path.join(output_dir, f"{key}.decks.json")
+    with open(header_path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump({
+            "domain": pools.domain,
+            "file": os.path.basename(deck_path),
+            "count": count,
+            "size": size,
+            "seed": seed,
+            "difficultyDistribution": pools.distribution,
+            "offsets": offsets,
+        }, f, separators=(',', ':'))
+    os.replace(deck_path + ".tmp", deck_path)
+    os.replace(header_path + ".tmp", header_path)
+    return header_path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Assemble stratified quizzes from a question bank.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    quiz = commands.add_parser("quiz", help="print one quiz")
+    quiz.add_argument("bank", nargs="?", default=DEFAULT_BANK)
+    quiz.add_argument("--domain", required=True)
+    quiz.add_argument("--category")
+    quiz.add_argument("--size", type=int, default=10)
+    quiz.add_argument("--seed", type=int)
+    quiz.add_argument("--seen", help="JSON file with a list of question ids to leave out")
+
+    decks = commands.add_parser("decks", help="pre-generate seeded decks for every domain")
+    decks.add_argument("bank", nargs="?", default=DEFAULT_BANK)
+    decks.add_argument("--domains", nargs="+", help="limit to these domains (default: all in the bank)")
+    decks.add_argument("--count", type=int, default=500, help="decks per domain")
+    decks.add_argument("--size", type=int, default=10, help="questions per deck")
+    decks.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    decks.add_argument("--output-dir", default=DEFAULT_DECK_DIR)
+
+    args = parser.parse_args(argv)
+    pools = load_pools(args.bank)
+
+    if args.command == "quiz":
+        domain = next((d for d in pools if domain_key(d) == domain_key(args.domain)), None)
+        if domain is None:
+            print(f"❌ No {args.domain} questions in {args.bank} (found: {', '.join(pools)})")
+            return 1
+        seen: Set[str] = set()
+        if args.seen:
+            with open(args.seen, 'r', encoding='utf-8') as f:
+                seen = {str(question_id) for question_id in json.load(f)}
+        questions = pools[domain].assemble(args.size, random.Random(args.seed), seen, args.category)
+        print(json.dumps({"domain": domain, "questions": questions}, ensure_ascii=False, indent=2))
+        return 0
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    wanted = {domain_key(d) for d in args.domains} if args.domains else None
+    for domain, domain_pools in pools.items():
+        if wanted is None or domain_key(domain) in wanted:
+            path = build_decks(domain_pools, args.count, args.size, args.seed, args.output_dir)
+            print(f"✅ {domain}: {args.count} decks of {args.size} -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from build_chat_index import tokenize
+from chat_datasets import DEFAULT_DATASETS, GUI_DIR, iter_datasets
+from dedup_datasets import LSHIndex, MinHasher, shingle_hashes
+from eval_model import DEFAULT_MODEL, DEFAULT_URL, HttpError, HttpPool
+
+# Answer cache for the chat route (gui/answer_cache.json)
+#
+# Questions from the datasets and from the route's query log
+# (CHAT_QUERY_LOG=path) are normalized with the route's tokenizer, counted,
+# and clustered: a question joins the most frequent earlier question whose
+# word 3-shingle MinHash similarity is at least --threshold. Each cluster is
+# answered once, by the model (in batches of concurrent requests) or with
+# --source reference from the dataset answers, and every member question
+# is keyed to that answer:
+#
+#   keys      sha1(normalized question)[:16] -> index into answers
+#   answers   [{answer, question, hits, lastSeen, expiresAt}]
+#
+# app/api/chat/route.ts looks the question up before calling the model and
+# answers from the cache on an unexpired hit. The cache records the model,
+# system prompt and options it was built with; the route ignores a model
+# cache whose model or system prompt differs from its own, or that was built
+# with options (the route sends none). Re-running the warmer keeps unexpired
+# answers built the same way, and evicts the least recently asked clusters
+# (then the least frequent) beyond --max-entries.
+#
+#   python warm_answer_cache.py --queries logs/chat_queries.jsonl --max-entries 2000
+#   python warm_answer_cache.py --source reference --ttl-days 30
+
+CACHE_VERSION = 2
+KEY_CHARS = 16
+DEFAULT_OUTPUT = os.path.join(GUI_DIR, "answer_cache.json")
+DEFAULT_SYSTEM_PROMPT = (os.environ.get("OLLAMA_SYSTEM_PROMPT", "").strip() or
+                         "You are CS Mentor, an AI assistant specialized in computer science education and career "
+                         "guidance. You provide clear, concise, and accurate information about programming concepts, "
+                         "interview preparation, and career development in the tech industry.")
+
+
+def normalize(question: str) -> str:
+    """The route's normalized form: lowercase alphanumeric tokens joined by single spaces."""
+    return " ".join(tokenize(question))
+
+
+def cache_key(normalized: str) -> str:
+    """Same key as answerCacheKey() in app/api/chat/route.ts."""
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:KEY_CHARS]
+
+
+def iter_logged_queries(path: str) -> Iterator[Tuple[str, float]]:
+    """``(question, time)`` from a query log: JSON lines with "question" (and "time"), or plain text lines."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                row = json.loads(line)
+                question = row.get("question") or row.get("query") or row.get("prompt") or ""
+                yield question, float(row.get("time") or 0)
+            else:
+                yield line, 0.0
+
+
+class Question:
+    __slots__ = ("normalized", "text", "hits", "last_seen", "reference")
+
+    def __init__(self, normalized: str, text: str):
+        self.normalized = normalized
+        self.text = text
+        self.hits = 0
+        self.last_seen = 0.0
+        self.reference: Optional[str] = None
+
+
+def collect_questions(datasets: List[str], query_logs: List[str]) -> Dict[str, Question]:
+    questions: Dict[str, Question] = {}
+
+    def add(text: str, seen_at: float, reference: Optional[str] = None) -> None:
+        normalized = normalize(text)
+        if not normalized:
+            return
+        question = questions.get(normalized)
+        if question is None:
+            question = questions[normalized] = Question(normalized, text.strip())
+        question.hits += 1
+        question.last_seen = max(question.last_seen, seen_at)
+        if reference and question.reference is None:
+            question.reference = reference.strip()
+
+    for pair in iter_datasets(datasets):
+        # The route only sends the question itself, so instruction-form inputs are left out
+        if not pair["input"]:
+            add(pair["instruction"], 0.0, pair["output"])
+    for path in query_logs:
+        for text, seen_at in iter_logged_queries(path):
+            add(text, seen_at)
+    return questions
+
+
+def cluster_questions(questions: Dict[str, Question], threshold: float) -> List[List[Question]]:
+    """Greedy clusters, most frequent question first; each cluster's first member is its representative."""
+    hasher = MinHasher()
+    index = LSHIndex()
+    clusters: List[List[Question]] = []
+    for question in sorted(questions.values(), key=lambda q: (-q.hits, -q.last_seen, q.normalized)):
+        signature = hasher.signature(shingle_hashes(question.normalized))
+        match, score = index.best_match(signature)
+        if match >= 0 and score >= threshold:
+            clusters[match].append(question)
+        else:
+            index.add(signature)
+            clusters.append([question])
+    return clusters
+
+
+def load_cache(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except FileNotFoundError:
+        return None
+    return cache if cache.get("version") == CACHE_VERSION else None
+
+
+def reusable_answers(cache: Optional[Dict[str, Any]], model: str, system_prompt: Optional[str],
+                     options: Dict[str, Any], now: float) -> Dict[str, str]:
+    """key -> answer for unexpired entries of a cache built with the same model, prompt and options."""
+    if (not cache or cache.get("model") != model or cache.get("systemPrompt") != system_prompt
+            or cache.get("options") != options):
+        return {}
+    answers = cache["answers"]
+    return {key: answers[i]["answer"] for key, i in cache["keys"].items() if answers[i]["expiresAt"] > now}
+
+
+async def generate_answers(prompts: List[str], url: str, model: str, options: Dict[str, Any],
+                           system_prompt: str, concurrency: int, timeout: float) -> List[Optional[str]]:
+    """One non-streamed /api/chat call per prompt, ``concurrency`` at a time; None where a call failed."""
+    pool = HttpPool(url, concurrency)
+
+    async def answer(prompt: str) -> Optional[str]:
+        payload: Dict[str, Any] = {
+            "model": model,
+            "messages": [{"role": "system", "content": system_prompt}, {"role": "user", "content": prompt}],
+            "stream": False,
+        }
+        if options:
+            payload["options"] = options
+
+        async def call() -> Optional[str]:
+            async with pool.request("POST", "/api/chat", payload) as response:
+                body = await response.read()
+            if response.status != 200:
+                raise HttpError(f"HTTP {response.status}: {body[:200].decode('utf-8', 'replace')}")
+            return (json.loads(body).get("message") or {}).get("content", "").strip() or None
+
+        try:
+            return await asyncio.wait_for(call(), timeout)
+        except (asyncio.TimeoutError, OSError, HttpError, ValueError, asyncio.IncompleteReadError) as e:
+            print(f"⚠️  {prompt[:60]!r}: {'timeout' if isinstance(e, asyncio.TimeoutError) else e}")
+            return None
+
+    try:
+        return await asyncio.gather(*(answer(prompt) for prompt in prompts))
+    finally:
+        await pool.close()
+
+
+def build_cache(clusters: List[List[Question]], answers: Dict[int, str], model: str, system_prompt: Optional[str],
+                options: Dict[str, Any], ttl: float, max_entries: int, now: float,
+                expiries: Dict[int, float]) -> Dict[str, Any]:
+    answered = [i for i in range(len(clusters)) if i in answers]
+    # LRU: most recently asked first, then most frequent
+    answered.sort(key=lambda i: (-max(q.last_seen for q in clusters[i]), -sum(q.hits for q in clusters[i]), i))
+    entries: List[Dict[str, Any]] = []
+    keys: Dict[str, int] = {}
+    for i in answered[:max_entries]:
+        members = clusters[i]
+        for question in members:
+            keys[cache_key(question.normalized)] = len(entries)
+        entries.append({
+            "answer": answers[i],
+            "question": members[0].text,
+            "hits": sum(q.hits for q in members),
+            "lastSeen": max(q.last_seen for q in members),
+            "expiresAt": expiries.get(i, now + ttl),
+        })
+    return {
+        "version": CACHE_VERSION,
+        "model": model,
+        "systemPrompt": system_prompt,
+        "options": options,
+        "generatedAt": now,
+        "maxEntries": max_entries,
+        "answers": entries,
+        "keys": dict(sorted(keys.items())),
+    }
+
+
+def save_cache(cache: Dict[str, Any], path: str) -> None:
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(path + ".tmp", path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pre-generate answers for common chat questions.")
+    parser.add_argument("datasets", nargs="*", default=DEFAULT_DATASETS)
+    parser.add_argument("--queries", nargs="+", default=[], help="query logs written by the route (CHAT_QUERY_LOG)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--source", choices=["model", "reference"], default="model",
+                        help="answer clusters with the model, or with the dataset's reference answers")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--options", help="Ollama options as JSON; part of the cache's identity")
+    parser.add_argument("--system-prompt", default=DEFAULT_SYSTEM_PROMPT, help="defaults to the route's prompt")
+    parser.add_argument("--threshold", type=float, default=0.8, help="MinHash similarity to join a cluster")
+    parser.add_argument("--min-hits", type=int, default=1, help="skip clusters asked fewer times")
+    parser.add_argument("--max-entries", type=int, default=5000, help="answers kept (least recently asked evicted)")
+    parser.add_argument("--ttl-days", type=float, default=7.0)
+    parser.add_argument("--batch-size", type=int, default=32, help="clusters answered between cache saves")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--refresh", action="store_true", help="regenerate answers still valid in the cache")
+    args = parser.parse_args(argv)
+
+    options: Dict[str, Any] = json.loads(args.options) if args.options else {}
+    system_prompt: Optional[str] = args.system_prompt.strip()
+    # Reference answers are not tied to a model build, prompt or options; they serve whatever the route uses
+    if args.source == "reference":
+        model, system_prompt, options = "*", None, {}
+    else:
+        model = args.model
+        if options:
+            print("⚠️  The chat route sends no model options, so it will not serve a cache built with --options")
+        if system_prompt != DEFAULT_SYSTEM_PROMPT:
+            print("⚠️  --system-prompt differs from the route's; it serves this cache only with a matching "
+                  "OLLAMA_SYSTEM_PROMPT")
+    now = time.time()
+    ttl = args.ttl_days * 86400
+
+    questions = collect_questions(args.datasets, args.queries)
+    clusters = [c for c in cluster_questions(questions, args.threshold) if sum(q.hits for q in c) >= args.min_hits]
+    print(f"📊 {len(questions)} distinct questions in {len(clusters)} clusters")
+
+    existing = load_cache(args.output)
+    reused = {} if args.refresh else reusable_answers(existing, model, system_prompt, options, now)
+    previous_expiry = {}
+    if existing and reused:
+        previous_expiry = {key: existing["answers"][i]["expiresAt"] for key, i in existing["keys"].items()}
+
+    answers: Dict[int, str] = {}
+    expiries: Dict[int, float] = {}
+    pending: List[int] = []
+    for i, members in enumerate(clusters):
+        key = next((cache_key(q.normalized) for q in members if cache_key(q.normalized) in reused), None)
+        if key is not None:
+            answers[i] = reused[key]
+            expiries[i] = previous_expiry[key]
+        elif args.source == "reference":
+            reference = next((q.reference for q in members if q.reference), None)
+            if reference:
+                answers[i] = reference
+        else:
+            pending.append(i)
+    print(f"♻️  {len(expiries)} answers reused from {args.output}" if expiries else "🆕 No reusable answers cached")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    failed = 0
+    for start in range(0, len(pending), args.batch_size):
+        batch = pending[start:start + args.batch_size]
+        prompts = [clusters[i][0].text for i in batch]
+        results = asyncio.run(generate_answers(prompts, args.url, model, options, system_prompt,
+                                               args.concurrency, args.timeout))
+        for i, answer in zip(batch, results):
+            if answer:
+                answers[i] = answer
+            else:
+                failed += 1
+        save_cache(build_cache(clusters, answers, model, system_prompt, options, ttl, args.max_entries, now,
+                               expiries), args.output)
+        print(f"⏱️  {min(start + len(batch), len(pending))}/{len(pending)} clusters answered")
+
+    cache = build_cache(clusters, answers, model, system_prompt, options, ttl, args.max_entries, now, expiries)
+    save_cache(cache, args.output)
+    print(f"✅ Cached {len(cache['answers'])} answers under {len(cache['keys'])} question keys -> {args.output}")
+    if failed:
+        print(f"❌ {failed} clusters could not be answered; re-run to retry them")
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
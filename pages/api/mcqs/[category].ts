@@ -1,6 +1,7 @@
 import { NextApiRequest, NextApiResponse } from 'next';
 import path from 'path';
-import { promises as fs } from 'fs';
+import { createReadStream, promises as fs } from 'fs';
+import readline from 'readline';
 
 interface MCQQuestion {
   id: string;
@@ -11,9 +12,11 @@ interface MCQQuestion {
   category?: string;
   difficulty?: string;
   tags?: string[];
+  domain?: string;
 }
 
 interface MCQData {
+  metadata?: Record<string, unknown>;
   questions: MCQQuestion[];
 }
 
@@ -29,6 +32,90 @@ interface APIErrorResponse {
   file?: string;
 }
 
+async function fileExists(filePath: string): Promise<boolean> {
+  try {
+    await fs.access(filePath);
+    return true;
+  } catch {
+    return false;
+  }
+}
+
+async function modifiedTime(filePath: string): Promise<number | null> {
+  try {
+    return (await fs.stat(filePath)).mtimeMs;
+  } catch {
+    return null;
+  }
+}
+
+// Serve the JSONL bank unless a newer JSON bank sits next to it: a
+// --format json rebuild leaves an older .jsonl from a previous run behind.
+async function preferJsonl(jsonlPath: string, jsonPath: string): Promise<boolean> {
+  const jsonlTime = await modifiedTime(jsonlPath);
+  if (jsonlTime === null) return false;
+  const jsonTime = await modifiedTime(jsonPath);
+  return jsonTime === null || jsonlTime >= jsonTime;
+}
+
+function parsePageParam(value: string | string[] | undefined): number | undefined {
+  if (typeof value !== 'string') return undefined;
+  const parsed = Number.parseInt(value, 10);
+  return Number.isFinite(parsed) && parsed >= 0 ? parsed : undefined;
+}
+
+// Per-domain files of the canonical store written by gui/ingest_banks.py
+// (<dir>/<domain key>.jsonl). Opt-in: the store's questions carry global ids
+// and deduplicated counts, so it is only served when MCQ_STORE_DIR is set.
+const storeDir = process.env.MCQ_STORE_DIR
+  ? path.resolve(process.cwd(), process.env.MCQ_STORE_DIR)
+  : null;
+
+function domainKey(value: string): string {
+  return value.toLowerCase().replace(/[^a-z0-9]/g, '');
+}
+
+// Read a JSONL bank (one question per line) without loading the whole file,
+// stopping as soon as the requested page has been collected.
+async function readJsonlQuestions(filePath: string, offset = 0, limit?: number): Promise<MCQQuestion[]> {
+  const stream = createReadStream(filePath, { encoding: 'utf8' });
+  const lines = readline.createInterface({ input: stream, crlfDelay: Infinity });
+  const questions: MCQQuestion[] = [];
+  let index = 0;
+
+  try {
+    for await (const line of lines) {
+      if (!line.trim()) continue;
+      if (index++ < offset) continue;
+      questions.push(JSON.parse(line) as MCQQuestion);
+      if (limit !== undefined && questions.length >= limit) break;
+    }
+  } finally {
+    lines.close();
+    stream.destroy();
+  }
+
+  return questions;
+}
+
+// JSONL banks keep their metadata block in a <stem>.meta.json sidecar
+// (written by gui/mcq_writers.py), so JSONL responses carry the same
+// { metadata, questions } shape as the JSON banks.
+async function readJsonlMetadata(jsonlPath: string): Promise<Record<string, unknown> | undefined> {
+  const metaPath = jsonlPath.replace(/\.jsonl$/, '.meta.json');
+  if (!(await fileExists(metaPath))) return undefined;
+  const sidecar = JSON.parse(await fs.readFile(metaPath, 'utf8'));
+  return sidecar?.metadata;
+}
+
+async function readJsonlBank(jsonlPath: string, offset: number, limit?: number): Promise<MCQData> {
+  const [metadata, questions] = await Promise.all([
+    readJsonlMetadata(jsonlPath),
+    readJsonlQuestions(jsonlPath, offset, limit)
+  ]);
+  return metadata ? { metadata, questions } : { questions };
+}
+
 export default async function handler(
   req: NextApiRequest,
   res: NextApiResponse<MCQData | APIErrorResponse>
@@ -40,6 +127,8 @@ export default async function handler(
   }
 
   const { category } = req.query;
+  const offset = parsePageParam(req.query.offset) ?? 0;
+  const limit = parsePageParam(req.query.limit);
 
   // Validate category parameter
   if (!category || Array.isArray(category)) {
@@ -71,11 +160,44 @@ export default async function handler(
     // Get the filename from the map or use the category name
     const filename = filenameMap[safeCategory] || `${safeCategory}.json`;
     const filePath = path.join(process.cwd(), 'gui', 'mcqs', filename);
+    const jsonlPath = filePath.replace(/\.json$/, '.jsonl');
+    const storePath = storeDir ? path.join(storeDir, `${domainKey(safeCategory)}.jsonl`) : null;
+
+    // Serve from the canonical store when it is configured and has this domain.
+    // Every page then comes from the store, even one past its end.
+    if (storePath && (await fileExists(storePath))) {
+      try {
+        return res.status(200).json(await readJsonlBank(storePath, offset, limit));
+      } catch (error) {
+        console.error(`Error parsing question store: ${storePath}`, error);
+        return res.status(500).json({
+          error: 'Error parsing questions data',
+          details: error instanceof Error ? error.message : 'Unknown error',
+          debug: {
+            filePath: storePath
+          }
+        });
+      }
+    }
+
+    // Prefer the streamed JSONL bank when the generator's latest run produced one
+    if (jsonlPath !== filePath && (await preferJsonl(jsonlPath, filePath))) {
+      try {
+        return res.status(200).json(await readJsonlBank(jsonlPath, offset, limit));
+      } catch (error) {
+        console.error(`Error parsing JSONL file: ${jsonlPath}`, error);
+        return res.status(500).json({
+          error: 'Error parsing questions data',
+          details: error instanceof Error ? error.message : 'Unknown error',
+          debug: {
+            filePath: jsonlPath
+          }
+        });
+      }
+    }
 
     // Check if the file exists
-    try {
-      await fs.access(filePath);
-    } catch (error) {
+    if (!(await fileExists(filePath))) {
       console.error(`File not found: ${filePath}`);
       const errorResponse: APIErrorResponse = { 
         error: `No questions found for category: ${category}`,
@@ -121,6 +243,10 @@ export default async function handler(
     }
 
     // Send the response
+    if (offset > 0 || limit !== undefined) {
+      const end = limit !== undefined ? offset + limit : undefined;
+      data = { ...data, questions: data.questions.slice(offset, end) };
+    }
     res.status(200).json(data);
   } catch (error) {
     console.error('Error loading MCQs:', error);
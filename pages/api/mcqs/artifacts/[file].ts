@@ -0,0 +1,107 @@
+import { NextApiRequest, NextApiResponse } from 'next';
+import path from 'path';
+import { createReadStream, promises as fs } from 'fs';
+
+// Serves the content-addressed bank artifacts published by gui/mcq_artifacts.py.
+// A hashed file name never changes content, so responses are cached as
+// immutable; the pre-compressed variant matching Accept-Encoding is sent as is.
+// manifest.json (bank -> current file and ETag) is always revalidated.
+
+interface ArtifactEntry {
+  domain: string | null;
+  file: string;
+  etag: string;
+  size: number;
+  encodings: Record<string, { file: string; size: number }>;
+}
+
+interface ArtifactManifest {
+  version: number;
+  artifacts: Record<string, ArtifactEntry>;
+}
+
+// Artifacts are streamed from disk; the combined bank is larger than the default 4MB limit
+export const config = {
+  api: { responseLimit: false },
+};
+
+const ARTIFACT_DIR = path.join(process.cwd(), 'gui', 'mcqs', 'artifacts');
+const MANIFEST_FILE = 'manifest.json';
+const IMMUTABLE = 'public, max-age=31536000, immutable';
+// Preferred first
+const ENCODINGS = ['br', 'gzip'];
+
+function acceptedEncoding(header: string | undefined, available: string[]): string | null {
+  const accepted = new Set(
+    (header ?? '')
+      .split(',')
+      .map((part) => part.trim().split(';'))
+      .filter(([, q]) => !q || Number.parseFloat(q.split('=')[1]) > 0)
+      .map(([name]) => name.toLowerCase())
+  );
+  return ENCODINGS.find((encoding) => available.includes(encoding) && accepted.has(encoding)) ?? null;
+}
+
+function matchesEtag(header: string | undefined, etag: string): boolean {
+  return !!header && header.split(',').some((value) => value.trim() === etag || value.trim() === '*');
+}
+
+export default async function handler(req: NextApiRequest, res: NextApiResponse) {
+  if (req.method !== 'GET' && req.method !== 'HEAD') {
+    res.setHeader('Allow', ['GET', 'HEAD']);
+    return res.status(405).json({ error: `Method ${req.method} Not Allowed` });
+  }
+
+  const { file } = req.query;
+  if (!file || Array.isArray(file)) {
+    return res.status(400).json({ error: 'Artifact name is required and must be a string' });
+  }
+
+  let manifest: ArtifactManifest;
+  try {
+    manifest = JSON.parse(await fs.readFile(path.join(ARTIFACT_DIR, MANIFEST_FILE), 'utf8'));
+  } catch {
+    return res.status(404).json({ error: 'No artifacts have been published' });
+  }
+
+  if (file === MANIFEST_FILE) {
+    res.setHeader('Cache-Control', 'no-cache');
+    return res.status(200).json(manifest);
+  }
+
+  // Only names listed in the manifest are served, which also rules out path traversal
+  const entry = Object.values(manifest.artifacts).find((artifact) => artifact.file === file);
+  if (!entry) {
+    return res.status(404).json({ error: `Unknown artifact: ${file}` });
+  }
+
+  const encoding = acceptedEncoding(req.headers['accept-encoding'], Object.keys(entry.encodings));
+  const etag = encoding ? `${entry.etag.slice(0, -1)}-${encoding}"` : entry.etag;
+
+  res.setHeader('Cache-Control', IMMUTABLE);
+  res.setHeader('ETag', etag);
+  res.setHeader('Vary', 'Accept-Encoding');
+  res.setHeader('Content-Type', 'application/json; charset=utf-8');
+
+  if (matchesEtag(req.headers['if-none-match'], etag)) {
+    return res.status(304).end();
+  }
+
+  const variant = encoding ? entry.encodings[encoding] : { file: entry.file, size: entry.size };
+  if (encoding) {
+    res.setHeader('Content-Encoding', encoding);
+  }
+  res.setHeader('Content-Length', String(variant.size));
+
+  if (req.method === 'HEAD') {
+    return res.status(200).end();
+  }
+
+  res.status(200);
+  createReadStream(path.join(ARTIFACT_DIR, variant.file))
+    .on('error', (error) => {
+      console.error(`Error streaming artifact ${variant.file}:`, error);
+      res.destroy(error);
+    })
+    .pipe(res);
+}
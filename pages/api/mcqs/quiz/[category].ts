@@ -0,0 +1,113 @@
+import { NextApiRequest, NextApiResponse } from 'next';
+import path from 'path';
+import { promises as fs } from 'fs';
+
+// Serves one pre-assembled quiz deck (built by gui/quiz_assembler.py decks).
+// The header lists the byte offset of every deck, so a request reads exactly
+// one deck instead of the whole bank. Headers are cached until the header
+// file changes, and a deck file whose size disagrees with its header's last
+// offset (a rebuild in progress) is not read.
+
+interface DeckHeader {
+  domain: string;
+  file: string;
+  count: number;
+  size: number;
+  offsets: number[];
+}
+
+interface CachedHeader {
+  mtimeMs: number;
+  bytes: number;
+  header: DeckHeader;
+}
+
+interface QuizResponse {
+  domain: string;
+  deck: number;
+  questions: unknown[];
+}
+
+class DeckMismatchError extends Error {}
+
+const DECK_DIR = path.join(process.cwd(), 'gui', 'mcqs', 'decks');
+const headers = new Map<string, CachedHeader>();
+
+async function loadHeader(key: string): Promise<DeckHeader> {
+  const headerPath = path.join(DECK_DIR, `${key}.decks.json`);
+  const { mtimeMs, size } = await fs.stat(headerPath);
+  const cached = headers.get(key);
+  if (cached && cached.mtimeMs === mtimeMs && cached.bytes === size) {
+    return cached.header;
+  }
+  const header = JSON.parse(await fs.readFile(headerPath, 'utf8')) as DeckHeader;
+  headers.set(key, { mtimeMs, bytes: size, header });
+  return header;
+}
+
+async function readDeck(header: DeckHeader, deck: number): Promise<{ questions: unknown[] }> {
+  const file = await fs.open(path.join(DECK_DIR, header.file), 'r');
+  try {
+    // Checked on the open file, so a deck swapped in after this point cannot be misread
+    const { size } = await file.stat();
+    if (size !== header.offsets[header.count]) {
+      throw new DeckMismatchError(`${header.file} is ${size} bytes, its header expects ${header.offsets[header.count]}`);
+    }
+    const start = header.offsets[deck];
+    const length = header.offsets[deck + 1] - start;
+    const buffer = Buffer.alloc(length);
+    await file.read(buffer, 0, length, start);
+    return JSON.parse(buffer.toString('utf8'));
+  } finally {
+    await file.close();
+  }
+}
+
+export default async function handler(
+  req: NextApiRequest,
+  res: NextApiResponse<QuizResponse | { error: string }>
+) {
+  if (req.method !== 'GET') {
+    res.setHeader('Allow', ['GET']);
+    return res.status(405).json({ error: `Method ${req.method} Not Allowed` });
+  }
+
+  const { category } = req.query;
+  if (!category || Array.isArray(category)) {
+    return res.status(400).json({ error: 'Category is required and must be a string' });
+  }
+
+  // Deck files are named by the domain's lowercase letters and digits ("system design" -> "systemdesign")
+  const key = category.toLowerCase().replace(/[^a-z0-9]/g, '');
+  if (!key) {
+    return res.status(400).json({ error: 'Invalid category' });
+  }
+
+  let header: DeckHeader;
+  try {
+    header = await loadHeader(key);
+  } catch {
+    return res.status(404).json({ error: `No quiz decks found for category: ${category}` });
+  }
+  if (!(header.count > 0)) {
+    return res.status(404).json({ error: `No quiz decks found for category: ${category}` });
+  }
+
+  const requested = typeof req.query.deck === 'string' ? Number.parseInt(req.query.deck, 10) : NaN;
+  const deck = Number.isInteger(requested)
+    ? ((requested % header.count) + header.count) % header.count
+    : Math.floor(Math.random() * header.count);
+
+  try {
+    const { questions } = await readDeck(header, deck);
+    res.status(200).json({ domain: header.domain, deck, questions });
+  } catch (error) {
+    if (error instanceof DeckMismatchError) {
+      console.warn(`Quiz decks for ${key} are being rebuilt: ${error.message}`);
+      res.setHeader('Retry-After', '1');
+      return res.status(503).json({ error: 'Quiz decks are being rebuilt, try again shortly' });
+    }
+    console.error(`Error reading quiz deck ${deck} for ${key}:`, error);
+    res.status(500).json({ error: 'Failed to load quiz deck' });
+  }
+}